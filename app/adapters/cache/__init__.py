@@ -0,0 +1,13 @@
+__all__ = [
+    "TTLLRUCache",
+    "CachedMovieGateway",
+    "CachedUserGateway",
+    "CachedFavoriteGateway",
+    "SingleFlight",
+    "TTLCount",
+]
+
+from .lru import TTLLRUCache
+from .gateway import CachedMovieGateway, CachedUserGateway, CachedFavoriteGateway
+from .single_flight import SingleFlight
+from .count import TTLCount
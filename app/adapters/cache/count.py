@@ -0,0 +1,32 @@
+import time
+from typing import Callable, Optional
+
+from app.application.protocols.cache import CountCache
+
+
+class TTLCount(CountCache):
+    """
+    Row count of one table, kept between exact counts by the inserts and deletes of this worker.
+
+    The exact count is taken again once it is `ttl` seconds old, which also picks up
+    the changes made by other workers and by imports.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._count: Optional[int] = None
+        self._expires_at = 0.0
+
+    def get(self) -> Optional[int]:
+        if self._count is None or self._expires_at <= self._clock():
+            return None
+        return self._count
+
+    def set(self, count: int) -> None:
+        self._count = count
+        self._expires_at = self._clock() + self.ttl
+
+    def add(self, delta: int) -> None:
+        if self._count is not None:
+            self._count = max(self._count + delta, 0)
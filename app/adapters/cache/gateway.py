@@ -0,0 +1,319 @@
+from functools import partial
+from typing import Optional
+
+from app.application.models import (
+    FavoritesInclude,
+    MovieCreate,
+    Movie,
+    MovieUpdate,
+    PopularMovie,
+    User,
+    UserCreate,
+    UserSummary,
+    UserUpdate,
+)
+from app.application.models.favorite import AddFavoriteResult
+from app.application.protocols.cache import CountCache, EntityCache
+from app.application.protocols.coalescing import RequestCoalescer
+from app.application.protocols.database import (
+    CommitHooks,
+    MovieDatabaseGateway,
+    UserDatabaseGateway,
+    FavoriteDatabaseGateway,
+)
+from app.application.read_only import consistent_reads
+
+
+class CachedMovieGateway(MovieDatabaseGateway):
+    """
+    Read-through cache in front of a movie gateway.
+
+    Concurrent misses of the same movie or page share one query of the wrapped gateway.
+    Users embed their favorite movies, so any movie change drops the cached users as well.
+    The movie count is adjusted by every committed insert and delete instead of being dropped.
+    Rows that fill the cache are read from the primary even in read-only use cases.
+    Cached entries and flights are dropped again once the write commits, as a concurrent
+    read may have loaded the rows committed before it in between.
+    """
+
+    def __init__(
+            self,
+            gateway: MovieDatabaseGateway,
+            movie_cache: EntityCache[Movie],
+            user_cache: EntityCache[User],
+            movie_flights: RequestCoalescer,
+            user_flights: RequestCoalescer,
+            movie_count: CountCache,
+            commit_hooks: CommitHooks,
+    ):
+        self.gateway = gateway
+        self.movie_cache = movie_cache
+        self.user_cache = user_cache
+        self.movie_flights = movie_flights
+        self.user_flights = user_flights
+        self.movie_count = movie_count
+        self.commit_hooks = commit_hooks
+
+    async def add_movie(self, movie_data: MovieCreate) -> Movie:
+        movie = await self.gateway.add_movie(movie_data)
+        self._clear_flights()
+        self.commit_hooks.after_commit(partial(self.movie_count.add, 1))
+        return movie
+
+    async def add_movies(self, movies_data: list[MovieCreate]) -> list[Movie]:
+        movies = await self.gateway.add_movies(movies_data)
+        self._clear_flights()
+        self.commit_hooks.after_commit(partial(self.movie_count.add, len(movies)))
+        return movies
+
+    async def get_movies(self, skip: int, limit: int) -> list[Movie]:
+        return await self.movie_flights.run(
+            ("page", skip, limit), lambda: self.gateway.get_movies(skip, limit),
+        )
+
+    async def get_movies_after(self, after_id: Optional[int], limit: int) -> list[Movie]:
+        return await self.movie_flights.run(
+            ("after", after_id, limit), lambda: self.gateway.get_movies_after(after_id, limit),
+        )
+
+    async def get_movie_by_id(self, movie_id: int) -> Optional[Movie]:
+        movie = self.movie_cache.get(movie_id)
+        if movie is not None:
+            return movie
+        return await self.movie_flights.run(movie_id, lambda: self._load_movie(movie_id))
+
+    async def get_movies_by_ids(self, movie_ids: list[int]) -> list[Movie]:
+        movies: dict[int, Movie] = {}
+        for movie_id in movie_ids:
+            movie = self.movie_cache.get(movie_id)
+            if movie is not None:
+                movies[movie_id] = movie
+        misses = [movie_id for movie_id in movie_ids if movie_id not in movies]
+        if misses:
+            generation = self.movie_cache.generation()
+            with consistent_reads():
+                loaded = await self.gateway.get_movies_by_ids(misses)
+            for movie in loaded:
+                self.movie_cache.set(movie.id, movie, generation)
+                movies[movie.id] = movie
+        return [movies[movie_id] for movie_id in movie_ids if movie_id in movies]
+
+    async def count_movies(self, exact: bool = False) -> int:
+        count = None if exact else self.movie_count.get()
+        if count is not None:
+            return count
+        return await self.movie_flights.run(("count", exact), self._count_movies)
+
+    async def _count_movies(self) -> int:
+        count = await self.gateway.count_movies(exact=True)
+        self.movie_count.set(count)
+        return count
+
+    async def _load_movie(self, movie_id: int) -> Optional[Movie]:
+        # a write committed while the row was loading invalidates it, so the old row is not kept
+        generation = self.movie_cache.generation()
+        with consistent_reads():
+            movie = await self.gateway.get_movie_by_id(movie_id)
+        if movie is not None:
+            self.movie_cache.set(movie_id, movie, generation)
+        return movie
+
+    async def get_popular_movies(self, skip: int, limit: int) -> list[PopularMovie]:
+        return await self.movie_flights.run(
+            ("popular", skip, limit), lambda: self.gateway.get_popular_movies(skip, limit),
+        )
+
+    async def update_movie(self, movie_id: int, movie_data: MovieUpdate) -> Optional[Movie]:
+        movie = await self.gateway.update_movie(movie_id, movie_data)
+        self._invalidate(movie_id)
+        return movie
+
+    async def delete_movie_by_id(self, movie_id: int) -> Optional[Movie]:
+        movie = await self.gateway.delete_movie_by_id(movie_id)
+        self._invalidate(movie_id)
+        if movie is not None:
+            self.commit_hooks.after_commit(partial(self.movie_count.add, -1))
+        return movie
+
+    def _invalidate(self, movie_id: int) -> None:
+        self._drop_cached(movie_id)
+        self.commit_hooks.after_commit(partial(self._drop_cached, movie_id))
+
+    def _drop_cached(self, movie_id: int) -> None:
+        self.movie_cache.invalidate(movie_id)
+        self.user_cache.clear()
+        self.movie_flights.clear()
+        self.user_flights.clear()
+
+    def _clear_flights(self) -> None:
+        self.movie_flights.clear()
+        self.commit_hooks.after_commit(self.movie_flights.clear)
+
+
+class CachedUserGateway(UserDatabaseGateway):
+    def __init__(
+            self,
+            gateway: UserDatabaseGateway,
+            user_cache: EntityCache[User],
+            user_flights: RequestCoalescer,
+            user_count: CountCache,
+            commit_hooks: CommitHooks,
+    ):
+        self.gateway = gateway
+        self.user_cache = user_cache
+        self.user_flights = user_flights
+        self.user_count = user_count
+        self.commit_hooks = commit_hooks
+
+    async def add_user(self, user_data: UserCreate) -> Optional[User]:
+        user = await self.gateway.add_user(user_data)
+        self.user_flights.clear()
+        self.commit_hooks.after_commit(self.user_flights.clear)
+        if user is not None:
+            self.commit_hooks.after_commit(partial(self.user_count.add, 1))
+        return user
+
+    async def get_users(
+            self,
+            skip: int,
+            limit: int,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        return await self.user_flights.run(
+            ("page", skip, limit, include), lambda: self.gateway.get_users(skip, limit, include),
+        )
+
+    async def get_users_after(
+            self,
+            after_id: Optional[int],
+            limit: int,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        return await self.user_flights.run(
+            ("after", after_id, limit, include), lambda: self.gateway.get_users_after(after_id, limit, include),
+        )
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        user = self.user_cache.get(user_id)
+        if user is not None:
+            return user
+        return await self.user_flights.run(user_id, lambda: self._load_user(user_id))
+
+    async def get_users_by_ids(
+            self,
+            user_ids: list[int],
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        users: dict[int, UserSummary] = {}
+        for user_id in user_ids:
+            user = self.user_cache.get(user_id)
+            if user is not None:
+                users[user_id] = user.project(include)
+        misses = [user_id for user_id in user_ids if user_id not in users]
+        if misses:
+            generation = self.user_cache.generation()
+            with consistent_reads():
+                loaded = await self.gateway.get_users_by_ids(misses, include)
+            for user in loaded:
+                if isinstance(user, User):
+                    self.user_cache.set(user.id, user, generation)
+                users[user.id] = user
+        return [users[user_id] for user_id in user_ids if user_id in users]
+
+    async def count_users(self, exact: bool = False) -> int:
+        count = None if exact else self.user_count.get()
+        if count is not None:
+            return count
+        return await self.user_flights.run(("count", exact), self._count_users)
+
+    async def _count_users(self) -> int:
+        count = await self.gateway.count_users(exact=True)
+        self.user_count.set(count)
+        return count
+
+    async def _load_user(self, user_id: int) -> Optional[User]:
+        generation = self.user_cache.generation()
+        with consistent_reads():
+            user = await self.gateway.get_user_by_id(user_id)
+        if user is not None:
+            self.user_cache.set(user_id, user, generation)
+        return user
+
+    async def user_exists(self, user_id: int) -> bool:
+        if self.user_cache.get(user_id) is not None:
+            return True
+        return await self.gateway.user_exists(user_id)
+
+    async def update_user(
+            self,
+            user_id: int,
+            user_data: UserUpdate,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> Optional[UserSummary]:
+        user = await self.gateway.update_user(user_id, user_data, include)
+        self._invalidate(user_id)
+        return user
+
+    async def delete_user_by_id(self, user_id: int) -> Optional[UserSummary]:
+        user = await self.gateway.delete_user_by_id(user_id)
+        self._invalidate(user_id)
+        if user is not None:
+            self.commit_hooks.after_commit(partial(self.user_count.add, -1))
+        return user
+
+    def _invalidate(self, user_id: int) -> None:
+        # dropped again after commit, like the movies of CachedMovieGateway
+        self._drop_cached(user_id)
+        self.commit_hooks.after_commit(partial(self._drop_cached, user_id))
+
+    def _drop_cached(self, user_id: int) -> None:
+        self.user_cache.invalidate(user_id)
+        self.user_flights.clear()
+
+
+class CachedFavoriteGateway(FavoriteDatabaseGateway):
+    def __init__(
+            self,
+            gateway: FavoriteDatabaseGateway,
+            user_cache: EntityCache[User],
+            user_flights: RequestCoalescer,
+            commit_hooks: CommitHooks,
+    ):
+        self.gateway = gateway
+        self.user_cache = user_cache
+        self.user_flights = user_flights
+        self.commit_hooks = commit_hooks
+
+    async def add_favorite_movie(self, user_id: int, movie_id: int) -> AddFavoriteResult:
+        result = await self.gateway.add_favorite_movie(user_id, movie_id)
+        if result is AddFavoriteResult.ADDED:
+            self._invalidate(user_id)
+        return result
+
+    async def delete_favorite_movie(self, user_id: int, movie_id: int) -> None:
+        await self.gateway.delete_favorite_movie(user_id, movie_id)
+        self._invalidate(user_id)
+
+    async def get_favorites(self, user_id: int, after_id: Optional[int], limit: int) -> list[Movie]:
+        return await self.gateway.get_favorites(user_id, after_id, limit)
+
+    async def get_favorite_ids(self, user_id: int) -> list[int]:
+        return await self.gateway.get_favorite_ids(user_id)
+
+    async def add_favorite_movies(self, user_id: int, movie_ids: list[int]) -> Optional[list[int]]:
+        missing = await self.gateway.add_favorite_movies(user_id, movie_ids)
+        self._invalidate(user_id)
+        return missing
+
+    async def delete_favorite_movies(self, user_id: int, movie_ids: list[int]) -> None:
+        await self.gateway.delete_favorite_movies(user_id, movie_ids)
+        self._invalidate(user_id)
+
+    def _invalidate(self, user_id: int) -> None:
+        # dropped again after commit, like the movies of CachedMovieGateway
+        self._drop_cached(user_id)
+        self.commit_hooks.after_commit(partial(self._drop_cached, user_id))
+
+    def _drop_cached(self, user_id: int) -> None:
+        self.user_cache.invalidate(user_id)
+        self.user_flights.clear()
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, TypeVar
+
+from app.application.models.cache import CacheStats
+from app.application.protocols.cache import EntityCache
+
+T = TypeVar("T")
+
+
+class TTLLRUCache(EntityCache[T]):
+    """
+    In-process LRU cache with a per-entry time to live.
+
+    Meant to be shared by every request of one worker, it is not thread safe.
+    A `max_size` of zero disables caching while keeping the counters.
+    One generation counter covers all keys: a load that overlapped any invalidation
+    is not stored, as it may have read the row from before the write.
+    """
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, T]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Optional[T]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._expirations += 1
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def set(self, key: Hashable, value: T, generation: Optional[int] = None) -> None:
+        if self.max_size <= 0 or generation is not None and generation != self._generation:
+            return
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def generation(self) -> int:
+        return self._generation
+
+    def invalidate(self, key: Hashable) -> None:
+        self._generation += 1
+        if self._entries.pop(key, None) is not None:
+            self._invalidations += 1
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            max_size=self.max_size,
+            ttl=self.ttl,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            invalidations=self._invalidations,
+        )
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from app.application.models.coalescing import CoalescingStats
+from app.application.protocols.coalescing import RequestCoalescer
+
+T = TypeVar("T")
+
+
+class SingleFlight(RequestCoalescer):
+    """
+    Runs one load per key at a time, concurrent callers of the same key await its result.
+
+    Meant to be shared by every request of one worker. Callers that joined a flight get
+    the result or the exception of the caller that started it; if that caller is cancelled,
+    they run the load themselves.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        self._queries = 0
+        self._coalesced = 0
+
+    async def run(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._coalesced += 1
+            # unlike awaiting the future, wait does not cancel the flight when this caller is cancelled
+            await asyncio.wait([flight])
+            if flight.cancelled():
+                self._coalesced -= 1
+                return await self.run(key, load)
+            return flight.result()
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self._queries += 1
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # mark the exception as retrieved, callers that joined still get it from the future
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def clear(self) -> None:
+        """
+        Forget flights in progress, so callers arriving after a write start a fresh load.
+        """
+        self._flights.clear()
+
+    def stats(self) -> CoalescingStats:
+        return CoalescingStats(in_flight=len(self._flights), queries=self._queries, coalesced=self._coalesced)
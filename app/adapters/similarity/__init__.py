@@ -0,0 +1,9 @@
+__all__ = [
+    "TopKSimilarityIndex",
+    "SimilarityTrackingFavoriteGateway",
+    "SimilarityTrackingMovieGateway",
+    "SimilarityTrackingUserGateway",
+]
+
+from .index import TopKSimilarityIndex
+from .gateway import SimilarityTrackingFavoriteGateway, SimilarityTrackingMovieGateway, SimilarityTrackingUserGateway
@@ -0,0 +1,176 @@
+from functools import partial
+from typing import Iterable, Optional
+
+from app.application.models import (
+    FavoritesInclude,
+    Movie,
+    MovieCreate,
+    MovieUpdate,
+    PopularMovie,
+    User,
+    UserCreate,
+    UserSummary,
+    UserUpdate,
+)
+from app.application.models.favorite import AddFavoriteResult
+from app.application.protocols.database import (
+    CommitHooks,
+    FavoriteDatabaseGateway,
+    MovieDatabaseGateway,
+    UserDatabaseGateway,
+)
+from app.application.protocols.similarity import SimilarityIndex
+
+
+class SimilarityTrackingFavoriteGateway(FavoriteDatabaseGateway):
+    """
+    Marks the movies whose favorites change, so the similarity index recomputes them.
+
+    Movies are marked once the change commits, a refresh in between would read the old favorites.
+    """
+
+    def __init__(self, gateway: FavoriteDatabaseGateway, index: SimilarityIndex, commit_hooks: CommitHooks):
+        self.gateway = gateway
+        self.index = index
+        self.commit_hooks = commit_hooks
+
+    async def add_favorite_movie(self, user_id: int, movie_id: int) -> AddFavoriteResult:
+        result = await self.gateway.add_favorite_movie(user_id, movie_id)
+        if result is AddFavoriteResult.ADDED:
+            self._mark_changed([movie_id])
+        return result
+
+    async def delete_favorite_movie(self, user_id: int, movie_id: int) -> None:
+        await self.gateway.delete_favorite_movie(user_id, movie_id)
+        self._mark_changed([movie_id])
+
+    async def get_favorites(self, user_id: int, after_id: Optional[int], limit: int) -> list[Movie]:
+        return await self.gateway.get_favorites(user_id, after_id, limit)
+
+    async def get_favorite_ids(self, user_id: int) -> list[int]:
+        return await self.gateway.get_favorite_ids(user_id)
+
+    async def add_favorite_movies(self, user_id: int, movie_ids: list[int]) -> Optional[list[int]]:
+        missing = await self.gateway.add_favorite_movies(user_id, movie_ids)
+        if missing is not None:
+            self._mark_changed(set(movie_ids).difference(missing))
+        return missing
+
+    async def delete_favorite_movies(self, user_id: int, movie_ids: list[int]) -> None:
+        await self.gateway.delete_favorite_movies(user_id, movie_ids)
+        self._mark_changed(movie_ids)
+
+    def _mark_changed(self, movie_ids: Iterable[int]) -> None:
+        self.commit_hooks.after_commit(partial(self.index.mark_changed, list(movie_ids)))
+
+
+class SimilarityTrackingMovieGateway(MovieDatabaseGateway):
+    """
+    Marks deleted movies, so the similarity index drops them from the rows of other movies.
+    """
+
+    def __init__(self, gateway: MovieDatabaseGateway, index: SimilarityIndex, commit_hooks: CommitHooks):
+        self.gateway = gateway
+        self.index = index
+        self.commit_hooks = commit_hooks
+
+    async def add_movie(self, movie_data: MovieCreate) -> Movie:
+        return await self.gateway.add_movie(movie_data)
+
+    async def add_movies(self, movies_data: list[MovieCreate]) -> list[Movie]:
+        return await self.gateway.add_movies(movies_data)
+
+    async def get_movies(self, skip: int, limit: int) -> list[Movie]:
+        return await self.gateway.get_movies(skip, limit)
+
+    async def get_movies_after(self, after_id: Optional[int], limit: int) -> list[Movie]:
+        return await self.gateway.get_movies_after(after_id, limit)
+
+    async def get_movie_by_id(self, movie_id: int) -> Optional[Movie]:
+        return await self.gateway.get_movie_by_id(movie_id)
+
+    async def get_movies_by_ids(self, movie_ids: list[int]) -> list[Movie]:
+        return await self.gateway.get_movies_by_ids(movie_ids)
+
+    async def count_movies(self, exact: bool = False) -> int:
+        return await self.gateway.count_movies(exact)
+
+    async def get_popular_movies(self, skip: int, limit: int) -> list[PopularMovie]:
+        return await self.gateway.get_popular_movies(skip, limit)
+
+    async def update_movie(self, movie_id: int, movie_data: MovieUpdate) -> Optional[Movie]:
+        return await self.gateway.update_movie(movie_id, movie_data)
+
+    async def delete_movie_by_id(self, movie_id: int) -> Optional[Movie]:
+        movie = await self.gateway.delete_movie_by_id(movie_id)
+        if movie is not None:
+            self.commit_hooks.after_commit(partial(self.index.mark_changed, [movie_id]))
+        return movie
+
+
+class SimilarityTrackingUserGateway(UserDatabaseGateway):
+    """
+    Marks the favorite movies of deleted users, their favorites go with the user.
+    """
+
+    def __init__(
+            self,
+            gateway: UserDatabaseGateway,
+            favorite_gateway: FavoriteDatabaseGateway,
+            index: SimilarityIndex,
+            commit_hooks: CommitHooks,
+    ):
+        self.gateway = gateway
+        self.favorite_gateway = favorite_gateway
+        self.index = index
+        self.commit_hooks = commit_hooks
+
+    async def add_user(self, user_data: UserCreate) -> Optional[User]:
+        return await self.gateway.add_user(user_data)
+
+    async def get_users(
+            self,
+            skip: int,
+            limit: int,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        return await self.gateway.get_users(skip, limit, include)
+
+    async def get_users_after(
+            self,
+            after_id: Optional[int],
+            limit: int,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        return await self.gateway.get_users_after(after_id, limit, include)
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return await self.gateway.get_user_by_id(user_id)
+
+    async def get_users_by_ids(
+            self,
+            user_ids: list[int],
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        return await self.gateway.get_users_by_ids(user_ids, include)
+
+    async def count_users(self, exact: bool = False) -> int:
+        return await self.gateway.count_users(exact)
+
+    async def user_exists(self, user_id: int) -> bool:
+        return await self.gateway.user_exists(user_id)
+
+    async def update_user(
+            self,
+            user_id: int,
+            user_data: UserUpdate,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> Optional[UserSummary]:
+        return await self.gateway.update_user(user_id, user_data, include)
+
+    async def delete_user_by_id(self, user_id: int) -> Optional[UserSummary]:
+        favorite_ids = await self.favorite_gateway.get_favorite_ids(user_id)
+        user = await self.gateway.delete_user_by_id(user_id)
+        if user is not None and favorite_ids:
+            self.commit_hooks.after_commit(partial(self.index.mark_changed, favorite_ids))
+        return user
@@ -0,0 +1,86 @@
+from array import array
+from typing import Iterable, Optional
+
+from app.adapters.similarity.matrix import Neighbors
+from app.application.models.similarity import SimilarityStats
+from app.application.protocols.similarity import SimilarityIndex
+
+
+class TopKSimilarityIndex(SimilarityIndex):
+    """
+    In-process index of the `top_k` most similar movies of every movie.
+
+    Meant to be shared by every request of one worker, a lookup is a single dict access.
+    Favorites changes only mark movies as changed, a refresher recomputes them in the background.
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self._neighbors: dict[int, Neighbors] = {}
+        self._changed: set[int] = set()
+        self._builds = 0
+        self._last_build_seconds: Optional[float] = None
+        self._refreshed_movies = 0
+
+    def neighbors(self, movie_id: int) -> list[tuple[int, float]]:
+        row = self._neighbors.get(movie_id)
+        if row is None:
+            return []
+        return list(zip(*row))
+
+    def mark_changed(self, movie_ids: Iterable[int]) -> None:
+        self._changed.update(movie_ids)
+
+    def take_changed(self) -> set[int]:
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def replace(self, neighbors: dict[int, Neighbors], seconds: float) -> None:
+        self._neighbors = neighbors
+        self._builds += 1
+        self._last_build_seconds = seconds
+
+    def set_neighbors(self, movie_id: int, row: Neighbors) -> None:
+        if len(row[0]):
+            self._neighbors[movie_id] = row
+        else:
+            self._neighbors.pop(movie_id, None)
+        self._refreshed_movies += 1
+
+    def set_similarity(self, movie_id: int, neighbor_id: int, score: float) -> None:
+        """
+        Put `neighbor_id` into the row of `movie_id` with a new score, a zero score takes it out.
+
+        The row is patched rather than recomputed, so a neighbor pushed out earlier
+        is only considered again by the next full build.
+        """
+        scores = [item for item in self.neighbors(movie_id) if item[0] != neighbor_id]
+        if score > 0:
+            scores.append((neighbor_id, score))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        del scores[self.top_k:]
+        if scores:
+            self._neighbors[movie_id] = (
+                array("q", [item[0] for item in scores]), array("d", [item[1] for item in scores]),
+            )
+        else:
+            self._neighbors.pop(movie_id, None)
+
+    def remove_movie(self, movie_id: int) -> None:
+        """
+        Drop a movie nobody has in favorites anymore from its own row and from every row it is in.
+        """
+        self._neighbors.pop(movie_id, None)
+        for other_id in [other_id for other_id, row in self._neighbors.items() if movie_id in row[0]]:
+            self.set_similarity(other_id, movie_id, 0)
+        self._refreshed_movies += 1
+
+    def stats(self) -> SimilarityStats:
+        return SimilarityStats(
+            movies=len(self._neighbors),
+            top_k=self.top_k,
+            builds=self._builds,
+            last_build_seconds=self._last_build_seconds,
+            refreshed_movies=self._refreshed_movies,
+            pending_movies=len(self._changed),
+        )
@@ -0,0 +1,106 @@
+import heapq
+import math
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+# neighbor movie ids and their similarities, most similar first
+Neighbors = tuple[array, array]
+
+
+def cosine(both: int, first: int, second: int) -> float:
+    """
+    Cosine similarity of two movies liked by `first` and `second` users, `both` of them liked the two.
+    """
+    return both / math.sqrt(first * second)
+
+
+def top_k(scores: Iterable[tuple[int, float]], k: int) -> Neighbors:
+    # ties go to the lower movie id, so builds are reproducible
+    best = heapq.nlargest(k, scores, key=lambda item: (item[1], -item[0]))
+    return array("q", [movie_id for movie_id, _ in best]), array("d", [score for _, score in best])
+
+
+@dataclass
+class FavoritesMatrix:
+    """
+    The users by movies favorites matrix in compressed sparse row form.
+
+    The movies of the i-th user are `movie_ids[user_offsets[i]:user_offsets[i + 1]]`.
+    Two flat arrays of 8-byte integers keep it compact and cheap to send to another process.
+    """
+
+    user_offsets: array = field(default_factory=lambda: array("q", [0]))
+    movie_ids: array = field(default_factory=lambda: array("q"))
+    last_user_id: Optional[int] = None
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[tuple[int, int]]) -> "FavoritesMatrix":
+        matrix = cls()
+        matrix.add(pairs)
+        return matrix
+
+    def add(self, pairs: Iterable[tuple[int, int]]) -> None:
+        """
+        Append (user_id, movie_id) pairs, they must come ordered by user across calls.
+        """
+        for user_id, movie_id in pairs:
+            if user_id != self.last_user_id:
+                self.user_offsets.append(self.user_offsets[-1])
+                self.last_user_id = user_id
+            self.movie_ids.append(movie_id)
+            self.user_offsets[-1] += 1
+
+
+def top_neighbors(matrix: FavoritesMatrix, k: int) -> dict[int, Neighbors]:
+    """
+    Find the `k` most similar movies of every movie by cosine similarity of their favorites.
+
+    Movies are numbered densely and transposed into a movies by users matrix, then
+    co-occurrences are counted one movie at a time, so memory stays linear in favorites.
+    CPU bound, meant to run in a worker process.
+    """
+    user_offsets = matrix.user_offsets
+    dense_ids: dict[int, int] = {}
+    movie_ids = array("q")
+    columns = array("q")
+    for movie_id in matrix.movie_ids:
+        column = dense_ids.get(movie_id)
+        if column is None:
+            column = dense_ids[movie_id] = len(movie_ids)
+            movie_ids.append(movie_id)
+        columns.append(column)
+
+    popularity = array("q", bytes(8 * len(movie_ids)))
+    for column in columns:
+        popularity[column] += 1
+    movie_offsets = array("q", [0])
+    for count in popularity:
+        movie_offsets.append(movie_offsets[-1] + count)
+    fill = array("q", movie_offsets[:-1])
+    movie_users = array("q", bytes(8 * len(columns)))
+    for user in range(len(user_offsets) - 1):
+        for position in range(user_offsets[user], user_offsets[user + 1]):
+            column = columns[position]
+            movie_users[fill[column]] = user
+            fill[column] += 1
+
+    both = array("q", bytes(8 * len(movie_ids)))
+    neighbors: dict[int, Neighbors] = {}
+    for movie in range(len(movie_ids)):
+        touched = []
+        for user in movie_users[movie_offsets[movie]:movie_offsets[movie + 1]]:
+            for other in columns[user_offsets[user]:user_offsets[user + 1]]:
+                if other != movie:
+                    if not both[other]:
+                        touched.append(other)
+                    both[other] += 1
+        if not touched:
+            continue
+        liked = popularity[movie]
+        neighbors[movie_ids[movie]] = top_k(
+            ((movie_ids[other], cosine(both[other], liked, popularity[other])) for other in touched), k,
+        )
+        for other in touched:
+            both[other] = 0
+    return neighbors
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.similarity.index import TopKSimilarityIndex
+from app.adapters.similarity.matrix import FavoritesMatrix, Neighbors, cosine, top_k, top_neighbors
+from app.adapters.sqlalchemy_db.similarity import load_favorites_matrix, movie_cooccurrences
+
+logger = logging.getLogger("app.similarity")
+
+
+def new_executor() -> Executor:
+    # a forked child would inherit the event loop and open connections of the worker
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+
+class SimilarityRefresher:
+    """
+    Keeps a similarity index of one worker up to date in the background.
+
+    The whole index is rebuilt from the favorites table every `rebuild_interval` seconds,
+    the CPU bound part runs in a separate process so requests are not held up.
+    In between, every `refresh_interval` seconds the movies whose favorites changed through
+    this worker are recomputed from the database one by one. Changes made through other
+    workers are picked up by the next rebuild.
+
+    Every worker keeps its own index, so each of them scans the favorites table and
+    runs a rebuild process once per `rebuild_interval`.
+    """
+
+    def __init__(
+            self,
+            index: TopKSimilarityIndex,
+            session_maker: async_sessionmaker[AsyncSession],
+            refresh_interval: float,
+            rebuild_interval: float,
+    ):
+        self.index = index
+        self.session_maker = session_maker
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self._executor: Optional[Executor] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._executor = new_executor()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_rebuild = loop.time()
+        while True:
+            if loop.time() >= next_rebuild:
+                next_rebuild = loop.time() + self.rebuild_interval
+                await self._guarded(self.rebuild())
+            await self._guarded(self.refresh())
+            await asyncio.sleep(self.refresh_interval)
+
+    @staticmethod
+    async def _guarded(job) -> None:
+        try:
+            await job
+        except Exception:
+            logger.exception("Similarity index update failed")
+
+    async def rebuild(self) -> None:
+        started = time.perf_counter()
+        async with self.session_maker() as session:
+            matrix = await load_favorites_matrix(session)
+        neighbors = {}
+        if matrix.movie_ids:
+            neighbors = await self._top_neighbors(matrix)
+        seconds = time.perf_counter() - started
+        self.index.replace(neighbors, seconds)
+        logger.info(
+            "Similarity index built from %d favorites, %d movies in %.2fs", len(matrix.movie_ids), len(neighbors),
+            seconds,
+        )
+
+    async def _top_neighbors(self, matrix: FavoritesMatrix) -> dict[int, Neighbors]:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, top_neighbors, matrix, self.index.top_k)
+        except BrokenProcessPool:
+            # the rebuild process died (e.g. killed for memory), a broken pool rejects every later job
+            logger.warning("Similarity rebuild process died, starting a new one")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = new_executor()
+            return await loop.run_in_executor(self._executor, top_neighbors, matrix, self.index.top_k)
+
+    async def refresh(self) -> None:
+        changed = self.index.take_changed()
+        if not changed:
+            return
+        async with self.session_maker() as session:
+            for movie_id in changed:
+                await self._refresh_movie(session, movie_id)
+
+    async def _refresh_movie(self, session: AsyncSession, movie_id: int) -> None:
+        before = {neighbor_id for neighbor_id, _ in self.index.neighbors(movie_id)}
+        liked, cooccurrences = await movie_cooccurrences(session, movie_id)
+        if not liked:
+            # deleted, or taken out of every favorites list
+            self.index.remove_movie(movie_id)
+            return
+        scores = [(other_id, cosine(both, liked, other_liked)) for other_id, both, other_liked in cooccurrences]
+        self.index.set_neighbors(movie_id, top_k(scores, self.index.top_k))
+        for other_id, score in scores:
+            self.index.set_similarity(other_id, movie_id, score)
+        for other_id in before.difference(other_id for other_id, _ in scores):
+            self.index.set_similarity(other_id, movie_id, 0)
@@ -0,0 +1,35 @@
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.protocols.database import CommitHooks
+
+
+class SessionCommitHooks(CommitHooks):
+    """
+    Collects callbacks to run when the transaction of one session commits.
+
+    A callback added while no transaction is open runs at once: a gateway that
+    committed on its own has already made its change visible.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._callbacks: list[Callable[[], None]] = []
+        event.listen(session.sync_session, "after_commit", self._run)
+        event.listen(session.sync_session, "after_rollback", self._drop)
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        if self.session.in_transaction():
+            self._callbacks.append(callback)
+        else:
+            callback()
+
+    def _run(self, session: Any) -> None:
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def _drop(self, session: Any) -> None:
+        self._callbacks.clear()
@@ -1,13 +1,58 @@
-from typing import Optional
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
 
-from sqlalchemy import select, delete
+from sqlalchemy import Row, func, select, delete, insert, literal, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import selectinload
 
 from app.adapters.sqlalchemy_db import models
-from app.application.models import MovieCreate, Movie, MovieUpdate, User, UserCreate, UserUpdate
-from app.application.protocols.database import MovieDatabaseGateway, UserDatabaseGateway, FavoriteDatabaseGateway
+from app.adapters.sqlalchemy_db.movie_stats import (
+    decrement_favorites_count,
+    decrement_favorites_counts,
+    decrement_user_favorites_counts,
+    increment_favorites_count,
+    increment_favorites_counts,
+)
+from app.application.models import (
+    FavoritesInclude,
+    MovieCreate,
+    Movie,
+    MovieUpdate,
+    PopularMovie,
+    User,
+    UserCreate,
+    UserSummary,
+    UserUpdate,
+    UserWithFavoriteIds,
+)
+from app.application.models.favorite import AddFavoriteResult
+from app.application.protocols.database import (
+    MovieDatabaseGateway,
+    MovieExportGateway,
+    UserDatabaseGateway,
+    FavoriteDatabaseGateway,
+    UsernameTakenError,
+)
+
+MOVIE_INSERT_CHUNK_SIZE = 500
+# bound parameters of one IN (...) lookup, well below the SQLite limit
+ID_LOOKUP_CHUNK_SIZE = 500
+MOVIE_COLUMNS = (models.Movie.id, models.Movie.title, models.Movie.description, models.Movie.version)
+USER_COLUMNS = (models.User.id, models.User.username, models.User.version)
+
+
+def movie_from_row(row: Sequence[Any]) -> Movie:
+    """
+    Build a movie from a row of `MOVIE_COLUMNS`, unpacked by position as named access is several times slower.
+    """
+    movie_id, title, description, version = row
+    return Movie(id=movie_id, title=title, description=description, version=version)
+
+
+def chunked(ids: list[int], size: int) -> Iterator[list[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
 
 
 class MovieSqlaGateway(MovieDatabaseGateway):
@@ -23,11 +68,35 @@ class MovieSqlaGateway(MovieDatabaseGateway):
         await self.session.commit()
         return Movie.model_validate(new_movie)
 
+    async def add_movies(self, movies_data: list[MovieCreate]) -> list[Movie]:
+        query = insert(models.Movie).returning(
+            models.Movie.id,
+            models.Movie.title,
+            models.Movie.description,
+            models.Movie.version,
+            sort_by_parameter_order=True,
+        )
+        movies = []
+        for start in range(0, len(movies_data), MOVIE_INSERT_CHUNK_SIZE):
+            chunk = movies_data[start:start + MOVIE_INSERT_CHUNK_SIZE]
+            result = await self.session.execute(
+                query,
+                [{"title": movie.title, "description": movie.description} for movie in chunk],
+            )
+            movies.extend(Movie.model_validate(row) for row in result.all())
+        return movies
+
     async def get_movies(self, skip: int, limit: int) -> list[Movie]:
-        query = select(models.Movie).offset(skip).limit(limit)
+        query = select(*MOVIE_COLUMNS).order_by(models.Movie.id).offset(skip).limit(limit)
         result = await self.session.execute(query)
-        movies = [Movie.model_validate(movie) for movie in result.scalars().all()]
-        return movies
+        return [movie_from_row(row) for row in result.all()]
+
+    async def get_movies_after(self, after_id: Optional[int], limit: int) -> list[Movie]:
+        query = select(*MOVIE_COLUMNS).order_by(models.Movie.id).limit(limit)
+        if after_id is not None:
+            query = query.where(models.Movie.id > after_id)
+        result = await self.session.execute(query)
+        return [movie_from_row(row) for row in result.all()]
 
     async def get_movie_by_id(self, movie_id: int) -> Optional[Movie]:
         query = select(models.Movie).where(models.Movie.id == movie_id)
@@ -37,28 +106,89 @@ class MovieSqlaGateway(MovieDatabaseGateway):
             return Movie.model_validate(movie)
         return None
 
+    async def get_movies_by_ids(self, movie_ids: list[int]) -> list[Movie]:
+        movies: dict[int, Movie] = {}
+        for chunk in chunked(movie_ids, ID_LOOKUP_CHUNK_SIZE):
+            result = await self.session.execute(select(*MOVIE_COLUMNS).where(models.Movie.id.in_(chunk)))
+            for row in result.all():
+                movie = movie_from_row(row)
+                movies[movie.id] = movie
+        return [movies[movie_id] for movie_id in movie_ids if movie_id in movies]
+
+    async def count_movies(self, exact: bool = False) -> int:
+        return await self.session.scalar(select(func.count()).select_from(models.Movie))
+
+    async def get_popular_movies(self, skip: int, limit: int) -> list[PopularMovie]:
+        query = (
+            select(
+                models.Movie.id,
+                models.Movie.title,
+                models.Movie.description,
+                models.Movie.version,
+                models.MovieStats.favorites_count,
+            )
+            .join(models.MovieStats, models.MovieStats.movie_id == models.Movie.id)
+            .where(models.MovieStats.favorites_count > 0)
+            .order_by(models.MovieStats.favorites_count.desc(), models.MovieStats.movie_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return [PopularMovie.model_validate(row) for row in result.all()]
+
     async def update_movie(self, movie_id: int, movie_data: MovieUpdate) -> Optional[Movie]:
+        values: dict[str, Any] = {"version": models.Movie.version + 1}
+        if movie_data.title:
+            values["title"] = movie_data.title
+        if movie_data.description:
+            values["description"] = movie_data.description
         result = await self.session.execute(
-            select(models.Movie).
-            where(models.Movie.id == movie_id)
+            update(models.Movie)
+            .where(models.Movie.id == movie_id)
+            .values(values)
+            .returning(*MOVIE_COLUMNS)
+            .execution_options(synchronize_session=False)
         )
-        movie = result.scalars().first()
-        if not movie:
+        row = result.first()
+        if row is None:
             return None
-        if movie_data.title:
-            movie.title = movie_data.title
-        if movie_data.description:
-            movie.description = movie_data.description
-        return Movie.model_validate(movie)
+        return movie_from_row(row)
 
     async def delete_movie_by_id(self, movie_id: int) -> Optional[Movie]:
+        # favorites and movie_stats of the movie go with it through ON DELETE CASCADE
         result = await self.session.execute(
-            select(models.Movie).where(models.Movie.id == movie_id))
-        movie = result.scalars().first()
-        if not movie:
+            delete(models.Movie)
+            .where(models.Movie.id == movie_id)
+            .returning(*MOVIE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        if row is None:
             return None
-        await self.session.delete(movie)
-        return Movie.model_validate(movie)
+        return movie_from_row(row)
+
+
+class MovieSqlaExportGateway(MovieExportGateway):
+    """
+    Streams the movie catalog through a server-side cursor.
+
+    The response body is sent after request dependencies are closed,
+    so the gateway opens a session of its own for the lifetime of the stream.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession]):
+        self.session_maker = session_maker
+
+    async def stream_movies(self, chunk_size: int) -> AsyncIterator[list[Movie]]:
+        query = (
+            select(models.Movie.id, models.Movie.title, models.Movie.description, models.Movie.version)
+            .order_by(models.Movie.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async with self.session_maker() as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield [Movie.model_validate(row) for row in rows]
 
 
 class UserSqlaGateway(UserDatabaseGateway):
@@ -78,11 +208,27 @@ class UserSqlaGateway(UserDatabaseGateway):
             await self.session.rollback()
             return None
 
-    async def get_users(self, skip: int, limit: int) -> list[User]:
-        query = select(models.User).options(selectinload(models.User.favorites)).offset(skip).limit(limit)
+    async def get_users(
+            self,
+            skip: int,
+            limit: int,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        query = select(*USER_COLUMNS).order_by(models.User.id).offset(skip).limit(limit)
         result = await self.session.execute(query)
-        users = [User.model_validate(user) for user in result.scalars().all()]
-        return users
+        return await self._build_users(result.all(), include)
+
+    async def get_users_after(
+            self,
+            after_id: Optional[int],
+            limit: int,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        query = select(*USER_COLUMNS).order_by(models.User.id).limit(limit)
+        if after_id is not None:
+            query = query.where(models.User.id > after_id)
+        result = await self.session.execute(query)
+        return await self._build_users(result.all(), include)
 
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
         query = select(models.User).where(models.User.id == user_id).options(selectinload(models.User.favorites))
@@ -92,42 +238,214 @@ class UserSqlaGateway(UserDatabaseGateway):
             return User.model_validate(user)
         return None
 
-    async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
-        result = await self.session.execute(
-            select(models.User).
-            where(models.User.id == user_id)
-            .options(selectinload(models.User.favorites))
+    async def get_users_by_ids(
+            self,
+            user_ids: list[int],
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        users: dict[int, UserSummary] = {}
+        for chunk in chunked(user_ids, ID_LOOKUP_CHUNK_SIZE):
+            result = await self.session.execute(select(*USER_COLUMNS).where(models.User.id.in_(chunk)))
+            for user in await self._build_users(result.all(), include):
+                users[user.id] = user
+        return [users[user_id] for user_id in user_ids if user_id in users]
+
+    async def count_users(self, exact: bool = False) -> int:
+        return await self.session.scalar(select(func.count()).select_from(models.User))
+
+    async def user_exists(self, user_id: int) -> bool:
+        result = await self.session.execute(select(models.User.id).where(models.User.id == user_id))
+        return result.scalar() is not None
+
+    async def update_user(
+            self,
+            user_id: int,
+            user_data: UserUpdate,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> Optional[UserSummary]:
+        query = (
+            update(models.User)
+            .where(models.User.id == user_id)
+            .values(username=user_data.username, version=models.User.version + 1)
+            .returning(*USER_COLUMNS)
+            .execution_options(synchronize_session=False)
         )
-        user = result.scalars().first()
-        if not user:
+        try:
+            result = await self.session.execute(query)
+        except IntegrityError:
+            await self.session.rollback()
+            raise UsernameTakenError(user_data.username)
+        row = result.first()
+        if row is None:
             return None
-        user.username = user_data.username
-        return User.model_validate(user)
+        users = await self._build_users([row], include)
+        return users[0]
 
-    async def delete_user_by_id(self, user_id: int) -> Optional[User]:
+    async def delete_user_by_id(self, user_id: int) -> Optional[UserSummary]:
+        # favorites of the user go with it through ON DELETE CASCADE, their counters are taken back first
+        await decrement_user_favorites_counts(self.session, user_id)
         result = await self.session.execute(
-            select(models.User).where(models.User.id == user_id)
-            .options(selectinload(models.User.favorites))
+            delete(models.User)
+            .where(models.User.id == user_id)
+            .returning(*USER_COLUMNS)
+            .execution_options(synchronize_session=False)
         )
-        user = result.scalars().first()
-        if not user:
+        row = result.first()
+        if row is None:
             return None
-        await self.session.delete(user)
-        return User.model_validate(user)
+        deleted_id, username, version = row
+        return UserSummary(id=deleted_id, username=username, version=version)
+
+    async def _build_users(self, rows: Sequence[Row], include: FavoritesInclude) -> list[UserSummary]:
+        if include is FavoritesInclude.FULL:
+            return await self._with_favorites(rows)
+        if include is FavoritesInclude.IDS:
+            return await self._with_favorite_ids(rows)
+        return [UserSummary(id=user_id, username=username, version=version) for user_id, username, version in rows]
+
+    async def _with_favorite_ids(self, rows: Sequence[Row]) -> list[UserWithFavoriteIds]:
+        """
+        Build users with the ids of their favorites, read from the favorites table alone.
+        """
+        favorite_ids: dict[int, list[int]] = {user_id: [] for user_id, _, _ in rows}
+        if favorite_ids:
+            result = await self.session.execute(
+                select(models.Favorite.user_id, models.Favorite.movie_id)
+                .where(models.Favorite.user_id.in_(favorite_ids))
+                .order_by(models.Favorite.user_id, models.Favorite.movie_id)
+            )
+            for user_id, movie_id in result.all():
+                favorite_ids[user_id].append(movie_id)
+        return [
+            UserWithFavoriteIds(id=user_id, username=username, version=version, favorite_ids=favorite_ids[user_id])
+            for user_id, username, version in rows
+        ]
+
+    async def _with_favorites(self, rows: Sequence[Row]) -> list[User]:
+        """
+        Build users from plain column rows, loading the favorites of the whole page in one query.
+
+        Popular movies are shared by many users of a page, each of them is built once.
+        """
+        favorites: dict[int, list[Movie]] = {user_id: [] for user_id, _, _ in rows}
+        movies: dict[int, Movie] = {}
+        if favorites:
+            result = await self.session.execute(
+                select(models.Favorite.user_id, *MOVIE_COLUMNS)
+                .join(models.Movie, models.Movie.id == models.Favorite.movie_id)
+                .where(models.Favorite.user_id.in_(favorites))
+                .order_by(models.Favorite.user_id, models.Favorite.movie_id)
+            )
+            for user_id, *movie_row in result.all():
+                movie = movies.get(movie_row[0])
+                if movie is None:
+                    movie = movies[movie_row[0]] = movie_from_row(movie_row)
+                favorites[user_id].append(movie)
+        return [
+            User(id=user_id, username=username, version=version, favorites=favorites[user_id])
+            for user_id, username, version in rows
+        ]
 
 
 class FavoriteSqlaGateway(FavoriteDatabaseGateway):
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def add_favorite_movie(self, user_id: int, movie_id: int) -> None:
-        self.session.add(models.Favorite(user_id=user_id, movie_id=movie_id))
-        await self.session.commit()
+    async def add_favorite_movie(self, user_id: int, movie_id: int) -> AddFavoriteResult:
+        query = (
+            sqlite_insert(models.Favorite)
+            .values(user_id=user_id, movie_id=movie_id)
+            .on_conflict_do_nothing()
+        )
+        try:
+            result = await self.session.execute(query)
+            if result.rowcount:
+                await increment_favorites_count(self.session, movie_id)
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            return await self._missing_reference(user_id)
+        if not result.rowcount:
+            return AddFavoriteResult.ALREADY_PRESENT
+        return AddFavoriteResult.ADDED
+
+    async def _missing_reference(self, user_id: int) -> AddFavoriteResult:
+        result = await self.session.execute(select(models.User.id).where(models.User.id == user_id))
+        if result.scalar() is None:
+            return AddFavoriteResult.USER_NOT_FOUND
+        return AddFavoriteResult.MOVIE_NOT_FOUND
 
     async def delete_favorite_movie(self, user_id: int, movie_id: int) -> None:
-        await self.session.execute(
+        result = await self.session.execute(
             delete(models.Favorite).where(
                 models.Favorite.user_id == user_id,
                 models.Favorite.movie_id == movie_id
             )
         )
+        if result.rowcount:
+            await decrement_favorites_count(self.session, movie_id)
+
+    async def get_favorites(self, user_id: int, after_id: Optional[int], limit: int) -> list[Movie]:
+        query = (
+            select(models.Movie.id, models.Movie.title, models.Movie.description, models.Movie.version)
+            .join(models.Favorite, models.Favorite.movie_id == models.Movie.id)
+            .where(models.Favorite.user_id == user_id)
+            .order_by(models.Favorite.movie_id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            query = query.where(models.Favorite.movie_id > after_id)
+        result = await self.session.execute(query)
+        return [Movie.model_validate(row) for row in result.all()]
+
+    async def get_favorite_ids(self, user_id: int) -> list[int]:
+        result = await self.session.execute(
+            select(models.Favorite.movie_id)
+            .where(models.Favorite.user_id == user_id)
+            .order_by(models.Favorite.movie_id)
+        )
+        return list(result.scalars().all())
+
+    async def add_favorite_movies(self, user_id: int, movie_ids: list[int]) -> Optional[list[int]]:
+        """
+        Add many favorites with a single INSERT ... SELECT that skips unknown movies and existing pairs.
+
+        Returns the ids that do not belong to any movie, the caller decides whether to keep the rest.
+        Returns None and rolls back when the user does not exist.
+        """
+        if not movie_ids:
+            return []
+        existing_movies = select(literal(user_id), models.Movie.id).where(models.Movie.id.in_(movie_ids))
+        query = (
+            sqlite_insert(models.Favorite)
+            .from_select(["user_id", "movie_id"], existing_movies)
+            .on_conflict_do_nothing()
+            .returning(models.Favorite.movie_id)
+        )
+        try:
+            result = await self.session.execute(query)
+        except IntegrityError:
+            # the user was deleted after the caller checked it
+            await self.session.rollback()
+            return None
+        inserted = list(result.scalars().all())
+        if inserted:
+            await increment_favorites_counts(self.session, inserted)
+        not_inserted = set(movie_ids).difference(inserted)
+        if not not_inserted:
+            return []
+        # rows skipped as already present are fine, only unknown movies are reported
+        result = await self.session.execute(select(models.Movie.id).where(models.Movie.id.in_(not_inserted)))
+        return sorted(not_inserted.difference(result.scalars().all()))
+
+    async def delete_favorite_movies(self, user_id: int, movie_ids: list[int]) -> None:
+        if not movie_ids:
+            return
+        result = await self.session.execute(
+            delete(models.Favorite)
+            .where(models.Favorite.user_id == user_id, models.Favorite.movie_id.in_(movie_ids))
+            .returning(models.Favorite.movie_id)
+        )
+        deleted = list(result.scalars().all())
+        if deleted:
+            await decrement_favorites_counts(self.session, deleted)
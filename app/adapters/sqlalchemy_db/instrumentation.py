@@ -0,0 +1,42 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+
+
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                          executemany: bool) -> None:
+    if query_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                         executemany: bool) -> None:
+    stats = query_stats.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    stats.count += 1
+    stats.duration += time.perf_counter() - started.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Count statements and sum their execution time into the `query_stats` of the current context.
+
+    Nothing is recorded outside of a context that set `query_stats`.
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
@@ -26,6 +26,17 @@ if config.config_file_name is not None:
 from app.adapters.sqlalchemy_db.models.base import Base
 target_metadata = Base.metadata
 
+# tables managed by hand in migrations (e.g. FTS5 virtual tables
+# and their shadow tables) are invisible to autogenerate
+UNMANAGED_TABLE_PREFIXES = ("movies_fts",)
+
+
+def include_name(name, type_, parent_names) -> bool:
+    if type_ == "table":
+        return not name.startswith(UNMANAGED_TABLE_PREFIXES)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -48,6 +59,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -57,7 +69,7 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,51 @@
+"""Add movies full-text search
+
+Revision ID: 9c3e5f27d1a4
+Revises: 4a1039579b71
+Create Date: 2026-10-18 10:15:12.408311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e5f27d1a4'
+down_revision: Union[str, None] = '4a1039579b71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE movies_fts USING fts5("
+        "title, description, content='movies', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER movies_fts_after_insert AFTER INSERT ON movies BEGIN "
+        "INSERT INTO movies_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER movies_fts_after_delete AFTER DELETE ON movies BEGIN "
+        "INSERT INTO movies_fts(movies_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER movies_fts_after_update AFTER UPDATE OF title, description ON movies BEGIN "
+        "INSERT INTO movies_fts(movies_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO movies_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+        "END"
+    )
+    op.execute("INSERT INTO movies_fts(movies_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER movies_fts_after_update")
+    op.execute("DROP TRIGGER movies_fts_after_delete")
+    op.execute("DROP TRIGGER movies_fts_after_insert")
+    op.execute("DROP TABLE movies_fts")
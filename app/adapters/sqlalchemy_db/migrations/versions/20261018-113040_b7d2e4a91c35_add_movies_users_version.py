@@ -0,0 +1,29 @@
+"""Add movies and users version
+
+Revision ID: b7d2e4a91c35
+Revises: 9c3e5f27d1a4
+Create Date: 2026-10-18 11:30:40.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4a91c35'
+down_revision: Union[str, None] = '9c3e5f27d1a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('movies', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('users', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    # plain DROP COLUMN (SQLite 3.35+), a batch table copy would drop the movies_fts triggers
+    op.drop_column('users', 'version')
+    op.drop_column('movies', 'version')
@@ -0,0 +1,38 @@
+"""Add movie_stats table
+
+Revision ID: d41f8a6c2e97
+Revises: b7d2e4a91c35
+Create Date: 2026-10-18 12:45:12.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f8a6c2e97'
+down_revision: Union[str, None] = 'b7d2e4a91c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('movie_stats',
+    sa.Column('movie_id', sa.Integer(), nullable=False),
+    sa.Column('favorites_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['movie_id'], ['movies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('movie_id')
+    )
+    op.create_index('ix_movie_stats_favorites_count', 'movie_stats', [sa.text('favorites_count DESC'), 'movie_id'],
+                    unique=False)
+    op.execute(
+        "INSERT INTO movie_stats (movie_id, favorites_count) "
+        "SELECT movie_id, COUNT(*) FROM favorites GROUP BY movie_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_movie_stats_favorites_count', table_name='movie_stats')
+    op.drop_table('movie_stats')
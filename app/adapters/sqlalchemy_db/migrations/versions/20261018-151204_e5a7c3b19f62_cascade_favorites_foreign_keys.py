@@ -0,0 +1,51 @@
+"""Cascade favorites foreign keys, index favorites.movie_id
+
+Revision ID: e5a7c3b19f62
+Revises: d41f8a6c2e97
+Create Date: 2026-10-18 15:12:04.217354
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c3b19f62'
+down_revision: Union[str, None] = 'd41f8a6c2e97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def favorites_table(ondelete: Optional[str]) -> sa.Table:
+    return sa.Table('favorites', sa.MetaData(),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('movie_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['movie_id'], ['movies.id'], ondelete=ondelete),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete=ondelete),
+    sa.PrimaryKeyConstraint('user_id', 'movie_id')
+    )
+
+
+def upgrade() -> None:
+    # movies deleted so far left their favorites behind
+    op.execute(
+        "DELETE FROM favorites "
+        "WHERE movie_id NOT IN (SELECT id FROM movies) OR user_id NOT IN (SELECT id FROM users)"
+    )
+    op.execute("DELETE FROM movie_stats")
+    op.execute(
+        "INSERT INTO movie_stats (movie_id, favorites_count) "
+        "SELECT movie_id, COUNT(*) FROM favorites GROUP BY movie_id"
+    )
+    # SQLite can not alter a foreign key, the table is copied into a new one with the cascading keys;
+    # only favorites is recreated, movies keeps its full-text search triggers
+    with op.batch_alter_table('favorites', copy_from=favorites_table('CASCADE'), recreate='always') as batch_op:
+        batch_op.create_index(batch_op.f('ix_favorites_movie_id'), ['movie_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_favorites_movie_id'), table_name='favorites')
+    with op.batch_alter_table('favorites', copy_from=favorites_table(None), recreate='always'):
+        pass
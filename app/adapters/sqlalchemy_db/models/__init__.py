@@ -2,10 +2,11 @@ __all__ = (
     "Base",
     "User",
     "Movie",
-    "Favorite"
-
+    "Favorite",
+    "MovieStats",
 )
 from .base import Base
 from .user import User
 from .movie import Movie
 from .favorite import Favorite
+from .movie_stats import MovieStats
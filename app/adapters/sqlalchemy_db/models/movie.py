@@ -14,6 +14,7 @@ class Movie(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String, index=True)
     description: Mapped[str] = mapped_column(String, nullable=True)
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
     users: Mapped[list["User"]] = relationship(
         "User", secondary="favorites", back_populates="favorites"
     )
@@ -0,0 +1,13 @@
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.adapters.sqlalchemy_db.models import Base
+
+
+class MovieStats(Base):
+    __tablename__ = "movie_stats"
+    movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    favorites_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    __table_args__ = (
+        Index("ix_movie_stats_favorites_count", favorites_count.desc(), movie_id),
+    )
@@ -13,6 +13,7 @@ class User(Base):
     __tablename__ = "users"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     username: Mapped[str] = mapped_column(String, unique=True, index=True)
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
     favorites: Mapped[list["Movie"]] = relationship(
         "Movie", secondary="favorites", back_populates="users"
     )
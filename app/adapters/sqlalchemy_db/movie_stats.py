@@ -0,0 +1,66 @@
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.sqlalchemy_db import models
+
+
+async def increment_favorites_count(session: AsyncSession, movie_id: int) -> None:
+    query = sqlite_insert(models.MovieStats).values(movie_id=movie_id, favorites_count=1)
+    await session.execute(query.on_conflict_do_update(
+        index_elements=[models.MovieStats.movie_id],
+        set_={"favorites_count": models.MovieStats.favorites_count + 1},
+    ))
+
+
+async def decrement_favorites_count(session: AsyncSession, movie_id: int) -> None:
+    await session.execute(
+        update(models.MovieStats)
+        .where(models.MovieStats.movie_id == movie_id)
+        .values(favorites_count=models.MovieStats.favorites_count - 1)
+    )
+
+
+async def increment_favorites_counts(session: AsyncSession, movie_ids: list[int]) -> None:
+    query = sqlite_insert(models.MovieStats).values(
+        [{"movie_id": movie_id, "favorites_count": 1} for movie_id in movie_ids]
+    )
+    await session.execute(query.on_conflict_do_update(
+        index_elements=[models.MovieStats.movie_id],
+        set_={"favorites_count": models.MovieStats.favorites_count + 1},
+    ))
+
+
+async def decrement_favorites_counts(session: AsyncSession, movie_ids: list[int]) -> None:
+    await session.execute(
+        update(models.MovieStats)
+        .where(models.MovieStats.movie_id.in_(movie_ids))
+        .values(favorites_count=models.MovieStats.favorites_count - 1)
+    )
+
+
+async def decrement_user_favorites_counts(session: AsyncSession, user_id: int) -> None:
+    """
+    Take back the favorites of a user that is about to be deleted.
+    """
+    user_movies = select(models.Favorite.movie_id).where(models.Favorite.user_id == user_id)
+    await session.execute(
+        update(models.MovieStats)
+        .where(models.MovieStats.movie_id.in_(user_movies))
+        .values(favorites_count=models.MovieStats.favorites_count - 1)
+    )
+
+
+async def rebuild_movie_stats(session: AsyncSession) -> int:
+    """
+    Recompute every counter from the favorites table, returns the number of movies with favorites.
+    """
+    await session.execute(delete(models.MovieStats))
+    counts = (
+        select(models.Favorite.movie_id, func.count())
+        .group_by(models.Favorite.movie_id)
+    )
+    result = await session.execute(
+        insert(models.MovieStats).from_select(["movie_id", "favorites_count"], counts)
+    )
+    return result.rowcount
@@ -0,0 +1,59 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from app.application.models.pool import PoolStats
+from app.application.protocols.pool import PoolMonitor
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait for a connection.
+
+    The wait includes opening a new connection when the pool has to grow.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+
+class SqlaPoolMonitor(PoolMonitor):
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    def stats(self) -> PoolStats:
+        pool = self.engine.pool
+        stats = PoolStats(pool_class=type(pool).__name__)
+        if isinstance(pool, QueuePool):
+            stats.size = pool.size()
+            stats.max_overflow = pool._max_overflow
+            stats.checked_in = pool.checkedin()
+            stats.checked_out = pool.checkedout()
+            stats.overflow = pool.overflow()
+        if isinstance(pool, InstrumentedQueuePool):
+            stats.checkouts = pool.checkouts
+            stats.timeouts = pool.timeouts
+            stats.wait_time_total = pool.wait_time_total
+            stats.wait_time_max = pool.wait_time_max
+            if pool.checkouts:
+                stats.wait_time_avg = pool.wait_time_total / pool.checkouts
+        return stats
@@ -0,0 +1,81 @@
+import itertools
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Delete, Engine, Insert, Update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from app.application.read_only import in_read_only_use_case
+
+
+class ReplicaSelector(ABC):
+    def __init__(self, replicas: Sequence[AsyncEngine]):
+        if not replicas:
+            raise ValueError("At least one replica engine is required")
+        self.replicas = list(replicas)
+
+    @abstractmethod
+    def choose(self) -> AsyncEngine:
+        raise NotImplementedError
+
+
+class RoundRobinSelector(ReplicaSelector):
+    def __init__(self, replicas: Sequence[AsyncEngine]):
+        super().__init__(replicas)
+        self._next = itertools.cycle(self.replicas)
+
+    def choose(self) -> AsyncEngine:
+        return next(self._next)
+
+
+class LeastConnectionsSelector(ReplicaSelector):
+    """
+    Picks the replica with the fewest checked out connections, the first one wins a tie.
+    """
+
+    def choose(self) -> AsyncEngine:
+        return min(self.replicas, key=checked_out)
+
+
+def checked_out(engine: AsyncEngine) -> int:
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        return pool.checkedout()
+    return 0
+
+
+REPLICA_SELECTORS: dict[str, type[ReplicaSelector]] = {
+    "round_robin": RoundRobinSelector,
+    "least_connections": LeastConnectionsSelector,
+}
+
+
+class RoutingSession(Session):
+    """
+    Session that runs the statements of read-only use cases on a replica.
+
+    Everything else goes to the primary bind, and once the session has written
+    it stays there, so a request always reads its own writes.
+    A session sticks to the replica it picked first.
+    """
+
+    def __init__(self, *args: Any, replicas: ReplicaSelector, read_only: bool = False, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.read_only = read_only
+        self.wrote = False
+        self._replica: Optional[AsyncEngine] = None
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kw: Any) -> Any:
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.wrote = True
+        if self.wrote or not (self.read_only or in_read_only_use_case()):
+            return super().get_bind(mapper, clause=clause, **kw)
+        return self.replica_bind()
+
+    def replica_bind(self) -> Engine:
+        if self._replica is None:
+            self._replica = self.replicas.choose()
+        return self._replica.sync_engine
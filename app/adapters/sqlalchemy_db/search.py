@@ -0,0 +1,51 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.models import Movie
+from app.application.protocols.database import MovieSearchGateway
+
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def to_match_expression(query: str) -> str:
+    """
+    Turn free text into an FTS5 query matching every word.
+
+    Each word is quoted so that FTS5 operators and punctuation typed
+    by the user are searched for literally instead of being parsed.
+    """
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in query.split())
+
+
+class MovieSqliteSearchGateway(MovieSearchGateway):
+    """
+    Full-text search backed by the `movies_fts` FTS5 table.
+
+    The table is created and kept in sync with `movies` by triggers in the migrations.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def search_movies(self, query: str, skip: int, limit: int) -> list[Movie]:
+        match = to_match_expression(query)
+        if not match:
+            return []
+        result = await self.session.execute(
+            text(
+                "SELECT movies.id, movies.title, movies.description, movies.version "
+                "FROM movies_fts JOIN movies ON movies.id = movies_fts.rowid "
+                "WHERE movies_fts MATCH :match "
+                "ORDER BY bm25(movies_fts, :title_weight, :description_weight), movies.id "
+                "LIMIT :limit OFFSET :skip"
+            ),
+            {
+                "match": match,
+                "title_weight": TITLE_WEIGHT,
+                "description_weight": DESCRIPTION_WEIGHT,
+                "limit": limit,
+                "skip": skip,
+            },
+        )
+        return [Movie.model_validate(row) for row in result.all()]
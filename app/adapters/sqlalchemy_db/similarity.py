@@ -0,0 +1,46 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.adapters.similarity.matrix import FavoritesMatrix
+from app.adapters.sqlalchemy_db import models
+
+FAVORITES_READ_CHUNK_SIZE = 10_000
+
+
+async def load_favorites_matrix(session: AsyncSession) -> FavoritesMatrix:
+    """
+    Read the whole favorites table into a compact matrix, streamed in chunks.
+    """
+    query = (
+        select(models.Favorite.user_id, models.Favorite.movie_id)
+        .order_by(models.Favorite.user_id, models.Favorite.movie_id)
+        .execution_options(yield_per=FAVORITES_READ_CHUNK_SIZE)
+    )
+    matrix = FavoritesMatrix()
+    result = await session.stream(query)
+    async for rows in result.partitions():
+        matrix.add(rows)
+    return matrix
+
+
+async def movie_cooccurrences(session: AsyncSession, movie_id: int) -> tuple[int, list[tuple[int, int, int]]]:
+    """
+    Count the users who liked `movie_id` and, for every other movie they liked,
+    how many of them liked it and how many users liked it overall.
+    """
+    liked = await session.scalar(
+        select(models.MovieStats.favorites_count).where(models.MovieStats.movie_id == movie_id)
+    )
+    if not liked:
+        return 0, []
+    other = aliased(models.Favorite)
+    result = await session.execute(
+        select(other.movie_id, func.count(), models.MovieStats.favorites_count)
+        .select_from(models.Favorite)
+        .join(other, other.user_id == models.Favorite.user_id)
+        .join(models.MovieStats, models.MovieStats.movie_id == other.movie_id)
+        .where(models.Favorite.movie_id == movie_id, other.movie_id != movie_id)
+        .group_by(other.movie_id, models.MovieStats.favorites_count)
+    )
+    return liked, [(other_id, both, other_liked) for other_id, both, other_liked in result.all()]
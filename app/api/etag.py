@@ -0,0 +1,63 @@
+import hashlib
+from typing import Iterable, Iterator, Optional, Union
+
+from fastapi import Request, Response
+
+from app.application.models import Movie, User, UserSummary, UserWithFavoriteIds
+
+
+def movie_etag(movie: Movie) -> str:
+    return f'"movie-{movie.id}-{movie.version}"'
+
+
+def user_etag(user: UserSummary) -> str:
+    """
+    Users embed their favorite movies, so the tag covers the versions of those movies too.
+    """
+    return weak_etag(entity_versions(user))
+
+
+def collection_etag(items: Iterable[Union[Movie, UserSummary]]) -> str:
+    return weak_etag(version for item in items for version in entity_versions(item))
+
+
+def entity_versions(item: Union[Movie, UserSummary]) -> Iterator[tuple[int, int]]:
+    yield item.id, item.version
+    if isinstance(item, User):
+        for movie in item.favorites:
+            yield movie.id, movie.version
+    elif isinstance(item, UserWithFavoriteIds):
+        # only the ids are shown, movie edits do not change this representation
+        for movie_id in item.favorite_ids:
+            yield movie_id, 0
+
+
+def weak_etag(versions: Iterable[tuple[int, int]]) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    for entity_id, version in versions:
+        digest.update(f"{entity_id}:{version};".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Weak comparison of the `If-None-Match` header against the current tag, as RFC 9110 requires for GET.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+
+def not_modified_response(etag: str, response: Optional[Response] = None) -> Response:
+    """
+    Build a bodiless 304 carrying the tag and any headers already set on the endpoint `response`.
+    """
+    not_modified = Response(status_code=304)
+    if response is not None:
+        not_modified.headers.update(response.headers)
+    not_modified.headers["ETag"] = etag
+    return not_modified
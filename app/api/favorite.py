@@ -1,23 +1,38 @@
-from typing import Annotated
+from typing import Annotated, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
-from app.application.favorite import add_favorite, is_movie_in_list, delete_favorite
+from app.api.etag import collection_etag, is_not_modified, not_modified_response
+from app.api.route import ReleasingRoute
+from app.application.cursor import InvalidCursorError, next_cursor
+from app.application.favorite import (
+    MoviesNotFoundError,
+    add_favorite,
+    is_movie_in_list,
+    delete_favorite,
+    get_favorites_page,
+    patch_favorites,
+    replace_favorites,
+)
 from app.application.models import Movie
-from app.application.models.favorite import AddFavoriteResponse, DeleteFavoriteResponse
-from app.application.movie import get_movie_data
-from app.application.protocols.database import UserDatabaseGateway, MovieDatabaseGateway, FavoriteDatabaseGateway, UoW
+from app.application.models.favorite import (
+    AddFavoriteResponse,
+    AddFavoriteResult,
+    DeleteFavoriteResponse,
+    FavoritesChangeResponse,
+    FavoritesPatch,
+    FavoritesReplace,
+)
+from app.application.protocols.database import UserDatabaseGateway, FavoriteDatabaseGateway, UoW
 from app.application.user import get_user_data
 
-favorites_router = APIRouter()
+favorites_router = APIRouter(route_class=ReleasingRoute)
 
 
 @favorites_router.post("/{user_id}/favorites/{movie_id}", response_model=AddFavoriteResponse)
 async def add_to_favorites(
         user_id: int,
         movie_id: int,
-        user_database: Annotated[UserDatabaseGateway, Depends()],
-        movie_database: Annotated[MovieDatabaseGateway, Depends()],
         favorite_database: Annotated[FavoriteDatabaseGateway, Depends()],
 ) -> AddFavoriteResponse:
     """
@@ -29,15 +44,13 @@ async def add_to_favorites(
     Raises:
         HTTPException: If the user or movie is not found, or the movie is already in favorites.
     """
-    user = await get_user_data(user_id, user_database)
-    if not user:
+    result = await add_favorite(user_id, movie_id, favorite_database)
+    if result is AddFavoriteResult.USER_NOT_FOUND:
         raise HTTPException(status_code=404, detail="User not found for specified user_id.")
-    movie = await get_movie_data(movie_id, movie_database)
-    if not movie:
+    if result is AddFavoriteResult.MOVIE_NOT_FOUND:
         raise HTTPException(status_code=404, detail="Movie not found for specified movie_id.")
-    if is_movie_in_list(user.favorites, movie_id):
+    if result is AddFavoriteResult.ALREADY_PRESENT:
         raise HTTPException(status_code=409, detail="Movie is already in favorites.")
-    await add_favorite(user_id, movie_id, favorite_database)
     return AddFavoriteResponse(detail="Movie added to favorites")
 
 
@@ -70,18 +83,98 @@ async def delete_from_favorites(
 @favorites_router.get("/{user_id}/favorites", response_model=list[Movie])
 async def get_user_favorites(
         user_id: int,
-        database: Annotated[UserDatabaseGateway, Depends()]
-) -> list[Movie]:
+        request: Request,
+        response: Response,
+        user_database: Annotated[UserDatabaseGateway, Depends()],
+        favorite_database: Annotated[FavoriteDatabaseGateway, Depends()],
+        limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+        cursor: Optional[str] = None,
+) -> Union[list[Movie], Response]:
     """
-    Retrieve a user's favorite movies.
+    Retrieve a page of a user's favorite movies ordered by movie ID.
+
+    Pass the `X-Next-Cursor` header of the previous page as `cursor` to read the next page.
+    Answers 304 when `If-None-Match` matches the weak ETag of the page.
 
     Returns:
         list[Movie]: List of the user's favorite movies.
 
     Raises:
-        HTTPException: If the user is not found.
+        HTTPException: If the cursor is malformed or the user is not found.
     """
-    user = await get_user_data(user_id, database)
-    if not user:
+    try:
+        movies = await get_favorites_page(user_id, cursor, limit, favorite_database, user_database)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if movies is None:
         raise HTTPException(status_code=404, detail="User not found for specified user_id.")
-    return user.favorites
+    next_page = next_cursor([movie.id for movie in movies], limit)
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
+    etag = collection_etag(movies)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, response)
+    response.headers["ETag"] = etag
+    return movies
+
+
+@favorites_router.put("/{user_id}/favorites", response_model=FavoritesChangeResponse)
+async def replace_user_favorites(
+        user_id: int,
+        favorites: FavoritesReplace,
+        user_database: Annotated[UserDatabaseGateway, Depends()],
+        favorite_database: Annotated[FavoriteDatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+) -> FavoritesChangeResponse:
+    """
+    Replace a user's favorites with the given set of movies.
+
+    Only the difference with the current favorites is written, in a single transaction.
+
+    Returns:
+        FavoritesChangeResponse: IDs of the movies that were added and removed.
+
+    Raises:
+        HTTPException: If the user or any of the movies is not found.
+    """
+    try:
+        change = await replace_favorites(user_id, favorites.movie_ids, favorite_database, user_database, uow)
+    except MoviesNotFoundError as e:
+        raise HTTPException(status_code=404, detail=movies_not_found_detail(e.movie_ids))
+    if change is None:
+        raise HTTPException(status_code=404, detail="User not found for specified user_id.")
+    return change
+
+
+@favorites_router.patch("/{user_id}/favorites", response_model=FavoritesChangeResponse)
+async def patch_user_favorites(
+        user_id: int,
+        favorites: FavoritesPatch,
+        user_database: Annotated[UserDatabaseGateway, Depends()],
+        favorite_database: Annotated[FavoriteDatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+) -> FavoritesChangeResponse:
+    """
+    Add and remove several favorite movies of a user at once.
+
+    Movies already in favorites are not added again and movies not in favorites are not removed.
+
+    Returns:
+        FavoritesChangeResponse: IDs of the movies that were actually added and removed.
+
+    Raises:
+        HTTPException: If the user or any of the added movies is not found.
+    """
+    try:
+        change = await patch_favorites(
+            user_id, favorites.add, favorites.remove, favorite_database, user_database, uow,
+        )
+    except MoviesNotFoundError as e:
+        raise HTTPException(status_code=404, detail=movies_not_found_detail(e.movie_ids))
+    if change is None:
+        raise HTTPException(status_code=404, detail="User not found for specified user_id.")
+    return change
+
+
+def movies_not_found_detail(movie_ids: list[int]) -> str:
+    return "Movies not found for specified movie_ids: " + ", ".join(map(str, movie_ids)) + "."
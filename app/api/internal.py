@@ -0,0 +1,70 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from app.api.depends_stub import Stub
+from app.application.models import Movie, User
+from app.application.models.cache import CacheStatsResponse
+from app.application.models.coalescing import CoalescingStatsResponse
+from app.application.models.pool import PoolStats
+from app.application.models.similarity import SimilarityStats
+from app.application.protocols.cache import EntityCache
+from app.application.protocols.coalescing import RequestCoalescer
+from app.application.protocols.pool import PoolMonitor
+from app.application.protocols.similarity import SimilarityIndex
+
+internal_router = APIRouter()
+
+
+@internal_router.get("/cache", response_model=CacheStatsResponse)
+async def get_cache_stats(
+        movie_cache: Annotated[EntityCache[Movie], Depends(Stub(EntityCache, entity="movie"))],
+        user_cache: Annotated[EntityCache[User], Depends(Stub(EntityCache, entity="user"))],
+) -> CacheStatsResponse:
+    """
+    Report hit, miss and eviction counters of the entity caches of this worker.
+
+    Returns:
+        CacheStatsResponse: Counters of the movie and user caches.
+    """
+    return CacheStatsResponse(movies=movie_cache.stats(), users=user_cache.stats())
+
+
+@internal_router.get("/coalescing", response_model=CoalescingStatsResponse)
+async def get_coalescing_stats(
+        movie_flights: Annotated[RequestCoalescer, Depends(Stub(RequestCoalescer, entity="movie"))],
+        user_flights: Annotated[RequestCoalescer, Depends(Stub(RequestCoalescer, entity="user"))],
+) -> CoalescingStatsResponse:
+    """
+    Report how many reads of this worker ran a query and how many shared the query of a concurrent identical read.
+
+    Returns:
+        CoalescingStatsResponse: Counters of movie and user reads, `coalesced` is the number of queries saved.
+    """
+    return CoalescingStatsResponse(movies=movie_flights.stats(), users=user_flights.stats())
+
+
+@internal_router.get("/pool", response_model=PoolStats)
+async def get_pool_stats(
+        pool_monitor: Annotated[PoolMonitor, Depends()],
+) -> PoolStats:
+    """
+    Report connection pool occupancy and checkout wait times of this worker.
+
+    Returns:
+        PoolStats: Pool size, checked out connections, overflow and wait times.
+    """
+    return pool_monitor.stats()
+
+
+@internal_router.get("/similarity", response_model=SimilarityStats)
+async def get_similarity_stats(
+        index: Annotated[SimilarityIndex, Depends()],
+) -> SimilarityStats:
+    """
+    Report the size and freshness of the similarity index of this worker.
+
+    Returns:
+        SimilarityStats: Indexed movies, builds and movies waiting for a refresh.
+    """
+    return index.stats()
@@ -1,12 +1,33 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from app.application.models import Movie, MovieCreate, MovieUpdate, DeleteMovieResponse
-from app.application.movie import add_movie, get_movies_data, get_movie_data, update_movie, delete_movie_by_id
-from app.application.protocols.database import MovieDatabaseGateway, UoW
+from app.api.etag import collection_etag, is_not_modified, movie_etag, not_modified_response
+from app.api.responses import ORJSONModelResponse
+from app.api.route import ReleasingRoute
+from app.application.cursor import InvalidCursorError, next_cursor
+from app.application.ids import MAX_IDS, InvalidIdsError, missing_ids, parse_ids
+from app.application.models import Movie, MovieCreate, MovieUpdate, PopularMovie, ScoredMovie, DeleteMovieResponse
+from app.application.movie import (
+    add_movie,
+    add_movies,
+    count_movies_data,
+    get_movies_by_ids_data,
+    get_movies_data,
+    get_movies_page,
+    get_movie_data,
+    get_popular_movies_data,
+    search_movies_data,
+    stream_movies_data,
+    update_movie,
+    delete_movie_by_id,
+)
+from app.application.protocols.database import MovieDatabaseGateway, MovieExportGateway, MovieSearchGateway, UoW
+from app.application.protocols.similarity import SimilarityIndex
+from app.application.recommendation import get_similar_movies
 
-movie_router = APIRouter()
+movie_router = APIRouter(route_class=ReleasingRoute)
 
 
 @movie_router.post("/", response_model=Movie)
@@ -24,30 +45,161 @@ async def create_new_movie(
     return movie
 
 
+@movie_router.post("/bulk", response_model=list[Movie])
+async def create_new_movies(
+        movies_data: list[MovieCreate],
+        database: Annotated[MovieDatabaseGateway, Depends()],
+        uow: Annotated[UoW, Depends()],
+) -> list[Movie]:
+    """
+    Create a batch of movies in a single transaction.
+
+    Returns:
+        list[Movie]: The created movie objects in the order they were sent.
+    """
+    movies = await add_movies(movies_data, database, uow)
+    return movies
+
+
 @movie_router.get("/", response_model=list[Movie])
 async def get_movies(
+        request: Request,
+        response: Response,
         database: Annotated[MovieDatabaseGateway, Depends()],
         skip: int = 0,
         limit: int = 10,
-) -> list[Movie]:
+        cursor: Optional[str] = None,
+        ids: Optional[str] = None,
+        total: bool = False,
+        exact: bool = False,
+) -> Union[list[Movie], Response]:
     """
-    Retrieve a list of movies with optional pagination.
+    Retrieve a list of movies ordered by ID with optional pagination.
+
+    Pass the `X-Next-Cursor` header of the previous page as `cursor` to
+    read the next page without the cost of skipping rows.
+    Pass comma separated `ids` to get those movies in the same order instead of a page,
+    ids that do not exist are listed in the `X-Missing-Ids` header.
+    Pass `total=true` to get the number of movies in the `X-Total-Count` header. It is kept
+    in memory and recounted every `COUNT_CACHE_TTL` seconds, `exact=true` counts the table instead.
+    Answers 304 when `If-None-Match` matches the weak ETag of the page.
 
     Returns:
         list[Movie]: List of movie objects.
+
+    Raises:
+        HTTPException: If the cursor or ids are malformed, or combined with skip.
+    """
+    if ids is not None:
+        if skip or cursor is not None:
+            raise HTTPException(status_code=400, detail="Ids can not be combined with skip or cursor.")
+        try:
+            movie_ids = parse_ids(ids)
+        except InvalidIdsError:
+            raise HTTPException(status_code=400, detail=f"Ids must be 1 to {MAX_IDS} comma separated integers.")
+        movies = await get_movies_by_ids_data(movie_ids, database)
+        missing = missing_ids(movie_ids, [movie.id for movie in movies])
+        if missing:
+            response.headers["X-Missing-Ids"] = ",".join(map(str, missing))
+    elif cursor is None:
+        movies = await get_movies_data(skip, limit, database)
+    elif skip:
+        raise HTTPException(status_code=400, detail="Cursor can not be combined with skip.")
+    else:
+        try:
+            movies = await get_movies_page(cursor, limit, database)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    next_page = next_cursor([movie.id for movie in movies], limit) if ids is None else None
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
+    if total or exact:
+        response.headers["X-Total-Count"] = str(await count_movies_data(exact, database))
+    etag = collection_etag(movies)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, response)
+    response.headers["ETag"] = etag
+    return ORJSONModelResponse(movies, headers=response.headers)
+
+
+@movie_router.get("/export", response_class=StreamingResponse)
+async def export_movies(
+        request: Request,
+        database: Annotated[MovieExportGateway, Depends()],
+        chunk_size: Annotated[int, Query(ge=1, le=10_000)] = 1000,
+) -> StreamingResponse:
+    """
+    Stream the whole movie catalog as newline-delimited JSON.
+
+    Movies are read from the database and flushed to the client
+    `chunk_size` rows at a time. The export stops when the client disconnects.
+
+    Returns:
+        StreamingResponse: One JSON encoded movie per line.
+    """
+
+    async def ndjson_lines() -> AsyncIterator[bytes]:
+        async for movies in stream_movies_data(chunk_size, database):
+            if await request.is_disconnected():
+                break
+            yield b"".join(movie.model_dump_json().encode() + b"\n" for movie in movies)
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@movie_router.get("/popular", response_model=list[PopularMovie])
+async def get_popular_movies(
+        database: Annotated[MovieDatabaseGateway, Depends()],
+        skip: Annotated[int, Query(ge=0)] = 0,
+        limit: Annotated[int, Query(ge=1, le=100)] = 10,
+) -> list[PopularMovie]:
     """
-    movies = await get_movies_data(skip, limit, database)
+    Retrieve the movies added to favorites by the most users.
+
+    Returns:
+        list[PopularMovie]: Movies with their favorites count, most popular first.
+    """
+    movies = await get_popular_movies_data(skip, limit, database)
+    return movies
+
+
+@movie_router.get("/search", response_model=list[Movie])
+async def search_movies(
+        q: Annotated[str, Query(min_length=1, max_length=200)],
+        request: Request,
+        response: Response,
+        database: Annotated[MovieSearchGateway, Depends()],
+        skip: Annotated[int, Query(ge=0)] = 0,
+        limit: Annotated[int, Query(ge=1, le=100)] = 10,
+) -> Union[list[Movie], Response]:
+    """
+    Search movies by words of their title and description.
+
+    Movies are ranked by relevance, matches in the title weigh more than in the description.
+
+    Returns:
+        list[Movie]: Page of matching movies, best match first.
+    """
+    movies = await search_movies_data(q, skip, limit, database)
+    etag = collection_etag(movies)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, response)
+    response.headers["ETag"] = etag
     return movies
 
 
 @movie_router.get("/{movie_id}", response_model=Movie)
 async def get_movie(
         movie_id: int,
+        request: Request,
+        response: Response,
         database: Annotated[MovieDatabaseGateway, Depends()],
-) -> Movie:
+) -> Union[Movie, Response]:
     """
     Retrieve a specific movie by its ID.
 
+    Answers 304 without a body when `If-None-Match` matches the movie's ETag.
+
     Returns:
         Movie: The requested movie object.
 
@@ -57,9 +209,38 @@ async def get_movie(
     movie = await get_movie_data(movie_id, database)
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found for specified movie_id.")
+    etag = movie_etag(movie)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
     return movie
 
 
+@movie_router.get("/{movie_id}/similar", response_model=list[ScoredMovie])
+async def get_similar(
+        movie_id: int,
+        index: Annotated[SimilarityIndex, Depends()],
+        database: Annotated[MovieDatabaseGateway, Depends()],
+        limit: Annotated[int, Query(ge=1, le=100)] = 10,
+) -> list[ScoredMovie]:
+    """
+    Retrieve the movies most often added to favorites together with this one.
+
+    Movies are ranked by cosine similarity of the users who added them to favorites.
+    The list is empty until the similarity index of the worker is built.
+
+    Returns:
+        list[ScoredMovie]: Similar movies with their similarity, most similar first.
+
+    Raises:
+        HTTPException: If the movie is not found.
+    """
+    movies = await get_similar_movies(movie_id, limit, index, database)
+    if movies is None:
+        raise HTTPException(status_code=404, detail="Movie not found for specified movie_id.")
+    return movies
+
+
 @movie_router.patch("/{movie_id}", response_model=Movie)
 async def update_movie_data(
         movie_id: int,
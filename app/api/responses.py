@@ -0,0 +1,17 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic_core import to_jsonable_python
+
+
+class ORJSONModelResponse(JSONResponse):
+    """
+    JSON response rendered by orjson straight from already built pydantic models.
+
+    Returning it from an endpoint skips the `response_model` validation pass,
+    so the content has to be validated when the models are built.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=to_jsonable_python)
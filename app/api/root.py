@@ -2,6 +2,7 @@ from fastapi import APIRouter
 
 from .favorite import favorites_router
 from .index import index_router
+from .internal import internal_router
 from .movie import movie_router
 from .user import users_router
 
@@ -24,6 +25,11 @@ root_router.include_router(
     prefix="/users",
     tags=["favorites"]
 )
+root_router.include_router(
+    internal_router,
+    prefix="/internal",
+    tags=["internal"]
+)
 root_router.include_router(
     index_router,
 )
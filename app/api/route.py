@@ -0,0 +1,67 @@
+import asyncio
+import functools
+from contextlib import AsyncExitStack
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+request_resources: ContextVar[Optional[AsyncExitStack]] = ContextVar("request_resources", default=None)
+
+
+def release_after_endpoint(callback: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Schedule `callback` to run as soon as the current endpoint returns.
+
+    Outside of a `ReleasingRoute` there is nothing to hook into,
+    so the callback is left to the caller's own cleanup.
+    """
+    stack = request_resources.get()
+    if stack is not None:
+        stack.push_async_callback(callback)
+
+
+def _release_on_return(endpoint: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    is_coroutine = asyncio.iscoroutinefunction(endpoint)
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs: Any) -> Any:
+        try:
+            if is_coroutine:
+                return await endpoint(**kwargs)
+            return await run_in_threadpool(endpoint, **kwargs)
+        finally:
+            stack = request_resources.get()
+            if stack is not None:
+                await stack.aclose()
+
+    wrapper.__release_on_return__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+class ReleasingRoute(APIRoute):
+    """
+    Route that frees request-scoped resources, like database sessions, right after the endpoint returns.
+
+    FastAPI tears yield dependencies down only after the response is serialized,
+    so without this a session would hold its pooled connection for the whole request.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        call = self.dependant.call
+        if call is not None and not getattr(call, "__release_on_return__", False):
+            self.dependant.call = _release_on_return(call)
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            async with AsyncExitStack() as stack:
+                token = request_resources.set(stack)
+                try:
+                    return await handler(request)
+                finally:
+                    request_resources.reset(token)
+
+        return route_handler
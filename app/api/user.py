@@ -1,13 +1,45 @@
-from typing import Annotated
-
-from fastapi import APIRouter, Depends, HTTPException
-
-from app.application.models import User, UserCreate, UserUpdate
+from typing import Annotated, Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from app.api.etag import collection_etag, is_not_modified, not_modified_response, user_etag
+from app.api.responses import ORJSONModelResponse
+from app.api.route import ReleasingRoute
+from app.application.cursor import InvalidCursorError, next_cursor
+from app.application.ids import MAX_IDS, InvalidIdsError, missing_ids, parse_ids
+from app.application.models import (
+    FavoritesInclude,
+    ScoredMovie,
+    User,
+    UserCreate,
+    UserSummary,
+    UserUpdate,
+    UserWithFavoriteIds,
+)
 from app.application.models.user import DeleteUserResponse
-from app.application.protocols.database import UserDatabaseGateway, UoW
-from app.application.user import add_user, get_users_data, get_user_data, update_user, delete_user_by_id
-
-users_router = APIRouter()
+from app.application.protocols.database import (
+    FavoriteDatabaseGateway,
+    MovieDatabaseGateway,
+    UserDatabaseGateway,
+    UoW,
+    UsernameTakenError,
+)
+from app.application.protocols.similarity import SimilarityIndex
+from app.application.recommendation import get_recommendations
+from app.application.user import (
+    add_user,
+    count_users_data,
+    get_users_by_ids_data,
+    get_users_data,
+    get_users_page,
+    get_user_data,
+    update_user,
+    delete_user_by_id,
+)
+
+users_router = APIRouter(route_class=ReleasingRoute)
+
+UserResponse = Union[User, UserWithFavoriteIds, UserSummary]
 
 
 @users_router.post("/", response_model=User)
@@ -30,32 +62,86 @@ async def create_new_user(
     return user
 
 
-@users_router.get("/", response_model=list[User])
+@users_router.get("/", response_model=list[UserResponse])
 async def get_users(
+        request: Request,
+        response: Response,
         database: Annotated[UserDatabaseGateway, Depends()],
         skip: int = 0,
         limit: int = 10,
-) -> list[User]:
+        cursor: Optional[str] = None,
+        include: FavoritesInclude = FavoritesInclude.FULL,
+        ids: Optional[str] = None,
+        total: bool = False,
+        exact: bool = False,
+) -> Union[list[UserSummary], Response]:
     """
-    Retrieve a list of users.
+    Retrieve a list of users ordered by ID.
+
+    Pass the `X-Next-Cursor` header of the previous page as `cursor` to
+    read the next page without the cost of skipping rows.
+    Pass comma separated `ids` to get those users in the same order instead of a page,
+    ids that do not exist are listed in the `X-Missing-Ids` header.
+    Pass `total=true` to get the number of users in the `X-Total-Count` header. It is kept
+    in memory and recounted every `COUNT_CACHE_TTL` seconds, `exact=true` counts the table instead.
+    `include` picks how favorites are shown: `full` movies, their `ids` only or `none`,
+    only the requested data is loaded.
+    Answers 304 when `If-None-Match` matches the weak ETag of the page.
 
     Returns:
-        list[User]: List of users.
-    """
-    users = await get_users_data(skip, limit, database)
-    return users
+        list[UserResponse]: List of users.
 
-
-@users_router.get("/{user_id}", response_model=User)
+    Raises:
+        HTTPException: If the cursor or ids are malformed, or combined with skip.
+    """
+    if ids is not None:
+        if skip or cursor is not None:
+            raise HTTPException(status_code=400, detail="Ids can not be combined with skip or cursor.")
+        try:
+            user_ids = parse_ids(ids)
+        except InvalidIdsError:
+            raise HTTPException(status_code=400, detail=f"Ids must be 1 to {MAX_IDS} comma separated integers.")
+        users = await get_users_by_ids_data(user_ids, include, database)
+        missing = missing_ids(user_ids, [user.id for user in users])
+        if missing:
+            response.headers["X-Missing-Ids"] = ",".join(map(str, missing))
+    elif cursor is None:
+        users = await get_users_data(skip, limit, include, database)
+    elif skip:
+        raise HTTPException(status_code=400, detail="Cursor can not be combined with skip.")
+    else:
+        try:
+            users = await get_users_page(cursor, limit, include, database)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    next_page = next_cursor([user.id for user in users], limit) if ids is None else None
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
+    if total or exact:
+        response.headers["X-Total-Count"] = str(await count_users_data(exact, database))
+    etag = collection_etag(users)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, response)
+    response.headers["ETag"] = etag
+    return ORJSONModelResponse(users, headers=response.headers)
+
+
+@users_router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
         user_id: int,
+        request: Request,
+        response: Response,
         database: Annotated[UserDatabaseGateway, Depends()],
-) -> User:
+        include: FavoritesInclude = FavoritesInclude.FULL,
+) -> Union[UserSummary, Response]:
     """
     Retrieve a user by ID.
 
+    `include` picks how favorites are shown: `full` movies, their `ids` only or `none`.
+    Answers 304 without a body when `If-None-Match` matches the user's ETag.
+
     Returns:
-        User: The user object if found.
+        UserResponse: The user object if found.
 
     Raises:
         HTTPException: If the user is not found.
@@ -63,26 +149,64 @@ async def get_user(
     user = await get_user_data(user_id, database)
     if not user:
         raise HTTPException(status_code=404, detail="User not found for specified user_id.")
+    user = user.project(include)
+    etag = user_etag(user)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
     return user
 
 
-@users_router.patch("/{user_id}", response_model=User)
+@users_router.get("/{user_id}/recommendations", response_model=list[ScoredMovie])
+async def get_user_recommendations(
+        user_id: int,
+        index: Annotated[SimilarityIndex, Depends()],
+        database: Annotated[UserDatabaseGateway, Depends()],
+        favorite_database: Annotated[FavoriteDatabaseGateway, Depends()],
+        movie_database: Annotated[MovieDatabaseGateway, Depends()],
+        limit: Annotated[int, Query(ge=1, le=100)] = 10,
+) -> list[ScoredMovie]:
+    """
+    Recommend movies liked by users who share the user's favorites.
+
+    Every movie similar to a favorite scores its similarity, scores add up over favorites.
+
+    Returns:
+        list[ScoredMovie]: Recommended movies with their score, best first.
+
+    Raises:
+        HTTPException: If the user is not found.
+    """
+    movies = await get_recommendations(user_id, limit, index, database, favorite_database, movie_database)
+    if movies is None:
+        raise HTTPException(status_code=404, detail="User not found for specified user_id.")
+    return movies
+
+
+@users_router.patch("/{user_id}", response_model=UserResponse)
 async def update_user_data(
         user_id: int,
         user_data: UserUpdate,
         database: Annotated[UserDatabaseGateway, Depends()],
         uow: Annotated[UoW, Depends()],
-) -> User:
+        include: FavoritesInclude = FavoritesInclude.FULL,
+) -> UserSummary:
     """
     Update an existing user's data.
 
+    `include` picks how favorites of the updated user are shown: `full` movies, their `ids` only or `none`,
+    only the requested data is loaded.
+
     Returns:
-        User: The updated user object.
+        UserResponse: The updated user object.
 
     Raises:
-        HTTPException: If the user is not found.
+        HTTPException: If the user is not found or the username is taken.
     """
-    updated_user = await update_user(user_id, user_data, database, uow)
+    try:
+        updated_user = await update_user(user_id, user_data, include, database, uow)
+    except UsernameTakenError:
+        raise HTTPException(status_code=409, detail="User with that username already exists.")
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found for specified user_id.")
     return updated_user
@@ -0,0 +1,34 @@
+import base64
+import binascii
+from typing import Optional
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        prefix, _, value = base64.urlsafe_b64decode(padded).decode().partition(":")
+        last_id = int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError(cursor) from e
+    if prefix != "id":
+        raise InvalidCursorError(cursor)
+    return last_id
+
+
+def next_cursor(ids: list[int], limit: int) -> Optional[str]:
+    """
+    Build the cursor pointing after the last item of a page.
+
+    A short page means there is nothing left to read, so no cursor is returned.
+    """
+    if not ids or len(ids) < limit:
+        return None
+    return encode_cursor(ids[-1])
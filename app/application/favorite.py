@@ -1,13 +1,25 @@
+from typing import Optional
+
+from app.application.cursor import decode_cursor
+from app.application.models.favorite import AddFavoriteResult, FavoritesChangeResponse
 from app.application.models.movie import Movie
-from app.application.protocols.database import FavoriteDatabaseGateway, UoW
+from app.application.protocols.database import FavoriteDatabaseGateway, UserDatabaseGateway, UoW
+from app.application.read_only import read_only
+
+
+class MoviesNotFoundError(LookupError):
+    def __init__(self, movie_ids: list[int]):
+        super().__init__(movie_ids)
+        self.movie_ids = movie_ids
 
 
 async def add_favorite(
         user_id: int,
         movie_id: int,
         database: FavoriteDatabaseGateway,
-) -> None:
-    await database.add_favorite_movie(user_id, movie_id)
+) -> AddFavoriteResult:
+    result = await database.add_favorite_movie(user_id, movie_id)
+    return result
 
 
 def is_movie_in_list(movies: list[Movie], movie_id: int) -> bool:
@@ -22,3 +34,74 @@ async def delete_favorite(
 ) -> None:
     await database.delete_favorite_movie(user_id, movie_id)
     await uow.commit()
+
+
+@read_only
+async def get_favorites_page(
+        user_id: int,
+        cursor: Optional[str],
+        limit: int,
+        favorite_database: FavoriteDatabaseGateway,
+        user_database: UserDatabaseGateway,
+) -> Optional[list[Movie]]:
+    after_id = decode_cursor(cursor) if cursor else None
+    movies = await favorite_database.get_favorites(user_id, after_id, limit)
+    if not movies and not await user_database.user_exists(user_id):
+        return None
+    return movies
+
+
+async def replace_favorites(
+        user_id: int,
+        movie_ids: list[int],
+        favorite_database: FavoriteDatabaseGateway,
+        user_database: UserDatabaseGateway,
+        uow: UoW,
+) -> Optional[FavoritesChangeResponse]:
+    if not await user_database.user_exists(user_id):
+        return None
+    current = set(await favorite_database.get_favorite_ids(user_id))
+    target = set(movie_ids)
+    return await apply_favorites_change(
+        user_id, sorted(target - current), sorted(current - target), favorite_database, uow,
+    )
+
+
+async def patch_favorites(
+        user_id: int,
+        add: list[int],
+        remove: list[int],
+        favorite_database: FavoriteDatabaseGateway,
+        user_database: UserDatabaseGateway,
+        uow: UoW,
+) -> Optional[FavoritesChangeResponse]:
+    if not await user_database.user_exists(user_id):
+        return None
+    current = set(await favorite_database.get_favorite_ids(user_id))
+    return await apply_favorites_change(
+        user_id, sorted(set(add) - current), sorted(current.intersection(remove)), favorite_database, uow,
+    )
+
+
+async def apply_favorites_change(
+        user_id: int,
+        added: list[int],
+        removed: list[int],
+        database: FavoriteDatabaseGateway,
+        uow: UoW,
+) -> Optional[FavoritesChangeResponse]:
+    """
+    Write a computed difference as one bulk insert and one bulk delete in a single transaction.
+
+    Nothing is kept when any of the added movies does not exist.
+    Returns None when the user was deleted after the caller checked it.
+    """
+    missing = await database.add_favorite_movies(user_id, added)
+    if missing is None:
+        return None
+    if missing:
+        await uow.rollback()
+        raise MoviesNotFoundError(missing)
+    await database.delete_favorite_movies(user_id, removed)
+    await uow.commit()
+    return FavoritesChangeResponse(added=added, removed=removed)
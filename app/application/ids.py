@@ -0,0 +1,24 @@
+MAX_IDS = 1000
+
+
+class InvalidIdsError(ValueError):
+    pass
+
+
+def parse_ids(value: str) -> list[int]:
+    """
+    Parse a comma separated list of ids, a repeated id is kept at its first position only.
+    """
+    try:
+        ids = [int(item) for item in value.split(",") if item.strip()]
+    except ValueError as e:
+        raise InvalidIdsError(value) from e
+    ids = list(dict.fromkeys(ids))
+    if not ids or len(ids) > MAX_IDS:
+        raise InvalidIdsError(value)
+    return ids
+
+
+def missing_ids(ids: list[int], found_ids: list[int]) -> list[int]:
+    found = set(found_ids)
+    return [entity_id for entity_id in ids if entity_id not in found]
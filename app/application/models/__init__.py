@@ -2,11 +2,16 @@ __all__ = [
     "Movie",
     "MovieCreate",
     "MovieUpdate",
+    "PopularMovie",
+    "ScoredMovie",
     "DeleteMovieResponse",
+    "FavoritesInclude",
     "User",
     "UserCreate",
+    "UserSummary",
     "UserUpdate",
+    "UserWithFavoriteIds",
 ]
 
-from .movie import Movie, MovieCreate, MovieUpdate, DeleteMovieResponse
-from .user import User, UserCreate, UserUpdate
+from .movie import Movie, MovieCreate, MovieUpdate, PopularMovie, ScoredMovie, DeleteMovieResponse
+from .user import FavoritesInclude, User, UserCreate, UserSummary, UserUpdate, UserWithFavoriteIds
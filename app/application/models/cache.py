@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class CacheStats(BaseModel):
+    size: int
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class CacheStatsResponse(BaseModel):
+    movies: CacheStats
+    users: CacheStats
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class CoalescingStats(BaseModel):
+    in_flight: int
+    queries: int
+    coalesced: int
+
+
+class CoalescingStatsResponse(BaseModel):
+    movies: CoalescingStats
+    users: CoalescingStats
@@ -1,4 +1,13 @@
-from pydantic import BaseModel
+from enum import Enum
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class AddFavoriteResult(Enum):
+    ADDED = "added"
+    ALREADY_PRESENT = "already_present"
+    USER_NOT_FOUND = "user_not_found"
+    MOVIE_NOT_FOUND = "movie_not_found"
 
 
 class AddFavoriteResponse(BaseModel):
@@ -7,3 +16,23 @@ class AddFavoriteResponse(BaseModel):
 
 class DeleteFavoriteResponse(BaseModel):
     detail: str
+
+
+class FavoritesReplace(BaseModel):
+    movie_ids: list[int] = Field(..., json_schema_extra={"example": [101, 102, 103]})
+
+
+class FavoritesPatch(BaseModel):
+    add: list[int] = Field(default_factory=list, json_schema_extra={"example": [104]})
+    remove: list[int] = Field(default_factory=list, json_schema_extra={"example": [101]})
+
+    @model_validator(mode="after")
+    def check_disjoint(self) -> "FavoritesPatch":
+        if set(self.add) & set(self.remove):
+            raise ValueError("A movie can not be both added and removed.")
+        return self
+
+
+class FavoritesChangeResponse(BaseModel):
+    added: list[int] = Field(..., json_schema_extra={"example": [104]})
+    removed: list[int] = Field(..., json_schema_extra={"example": [101]})
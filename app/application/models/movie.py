@@ -17,8 +17,17 @@ class Movie(BaseModel):
     id: int = Field(..., json_schema_extra={"example": 101})
     title: str = Field(..., json_schema_extra={"example": "Inception"})
     description: Optional[str] = Field(None, json_schema_extra={"example": "A mind-bending thriller"})
+    version: int = Field(1, exclude=True)
     model_config = ConfigDict(from_attributes=True)
 
 
+class PopularMovie(Movie):
+    favorites_count: int = Field(..., json_schema_extra={"example": 42})
+
+
+class ScoredMovie(Movie):
+    score: float = Field(..., json_schema_extra={"example": 0.42})
+
+
 class DeleteMovieResponse(BaseModel):
     detail: str
@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    pool_class: str
+    size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+    wait_time_avg: float = 0.0
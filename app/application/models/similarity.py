@@ -0,0 +1,12 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SimilarityStats(BaseModel):
+    movies: int
+    top_k: int
+    builds: int
+    last_build_seconds: Optional[float] = None
+    refreshed_movies: int
+    pending_movies: int
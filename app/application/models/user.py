@@ -1,8 +1,16 @@
+from enum import Enum
+
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.application.models import Movie
 
 
+class FavoritesInclude(str, Enum):
+    NONE = "none"
+    IDS = "ids"
+    FULL = "full"
+
+
 class UserCreate(BaseModel):
     username: str = Field(..., json_schema_extra={"example": "MNK"})
 
@@ -11,12 +19,35 @@ class UserUpdate(BaseModel):
     username: str = Field(..., json_schema_extra={"example": "new_username"})
 
 
-class User(BaseModel):
+class UserSummary(BaseModel):
     id: int = Field(..., json_schema_extra={"example": 1})
     username: str = Field(..., json_schema_extra={"example": "MNK"})
-    favorites: list[Movie] = Field(default_factory=list)
+    version: int = Field(1, exclude=True)
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserWithFavoriteIds(UserSummary):
+    favorite_ids: list[int] = Field(default_factory=list, json_schema_extra={"example": [101, 102]})
+
+
+class User(UserSummary):
+    favorites: list[Movie] = Field(default_factory=list)
+
+    def project(self, include: FavoritesInclude) -> UserSummary:
+        """
+        Narrow the user down to the favorites representation asked for.
+        """
+        if include is FavoritesInclude.FULL:
+            return self
+        if include is FavoritesInclude.IDS:
+            return UserWithFavoriteIds(
+                id=self.id,
+                username=self.username,
+                version=self.version,
+                favorite_ids=[movie.id for movie in self.favorites],
+            )
+        return UserSummary(id=self.id, username=self.username, version=self.version)
+
+
 class DeleteUserResponse(BaseModel):
     detail: str
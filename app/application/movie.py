@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from app.application.models import MovieCreate, Movie, MovieUpdate
-from app.application.protocols.database import MovieDatabaseGateway, UoW
+from app.application.cursor import decode_cursor
+from app.application.models import MovieCreate, Movie, MovieUpdate, PopularMovie
+from app.application.protocols.database import MovieDatabaseGateway, MovieExportGateway, MovieSearchGateway, UoW
+from app.application.read_only import read_only
 
 
 async def add_movie(
@@ -12,6 +14,17 @@ async def add_movie(
     return created_movie
 
 
+async def add_movies(
+        movies_data: list[MovieCreate],
+        database: MovieDatabaseGateway,
+        uow: UoW,
+) -> list[Movie]:
+    created_movies = await database.add_movies(movies_data)
+    await uow.commit()
+    return created_movies
+
+
+@read_only
 async def get_movies_data(
         skip: int,
         limit: int,
@@ -21,6 +34,65 @@ async def get_movies_data(
     return movies
 
 
+@read_only
+async def count_movies_data(
+        exact: bool,
+        database: MovieDatabaseGateway,
+) -> int:
+    count = await database.count_movies(exact)
+    return count
+
+
+@read_only
+async def get_movies_page(
+        cursor: Optional[str],
+        limit: int,
+        database: MovieDatabaseGateway,
+) -> list[Movie]:
+    after_id = decode_cursor(cursor) if cursor else None
+    movies = await database.get_movies_after(after_id, limit)
+    return movies
+
+
+async def stream_movies_data(
+        chunk_size: int,
+        database: MovieExportGateway,
+) -> AsyncIterator[list[Movie]]:
+    async for movies in database.stream_movies(chunk_size):
+        yield movies
+
+
+@read_only
+async def get_movies_by_ids_data(
+        movie_ids: list[int],
+        database: MovieDatabaseGateway,
+) -> list[Movie]:
+    movies = await database.get_movies_by_ids(movie_ids)
+    return movies
+
+
+@read_only
+async def get_popular_movies_data(
+        skip: int,
+        limit: int,
+        database: MovieDatabaseGateway,
+) -> list[PopularMovie]:
+    movies = await database.get_popular_movies(skip, limit)
+    return movies
+
+
+@read_only
+async def search_movies_data(
+        query: str,
+        skip: int,
+        limit: int,
+        database: MovieSearchGateway,
+) -> list[Movie]:
+    movies = await database.search_movies(query, skip, limit)
+    return movies
+
+
+@read_only
 async def get_movie_data(
         movie_id: int,
         database: MovieDatabaseGateway,
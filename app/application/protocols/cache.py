@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import Generic, Hashable, Optional, TypeVar
+
+from app.application.models.cache import CacheStats
+
+T = TypeVar("T")
+
+
+class EntityCache(ABC, Generic[T]):
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[T]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: Hashable, value: T, generation: Optional[int] = None) -> None:
+        """
+        Store `value`, unless the cache was invalidated since `generation` was read.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def generation(self) -> int:
+        """
+        Returns a number that changes on every invalidation, read it before loading a value to `set`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def invalidate(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        raise NotImplementedError
+
+
+class CountCache(ABC):
+    @abstractmethod
+    def get(self) -> Optional[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, count: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add(self, delta: int) -> None:
+        raise NotImplementedError
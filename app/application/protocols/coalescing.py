@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from app.application.models.coalescing import CoalescingStats
+
+T = TypeVar("T")
+
+
+class RequestCoalescer(ABC):
+    @abstractmethod
+    async def run(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> CoalescingStats:
+        raise NotImplementedError
@@ -1,7 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Callable, Optional
 
-from app.application.models import MovieCreate, Movie, MovieUpdate, UserCreate, User, UserUpdate
+from app.application.models import (
+    FavoritesInclude,
+    MovieCreate,
+    Movie,
+    MovieUpdate,
+    PopularMovie,
+    UserCreate,
+    User,
+    UserSummary,
+    UserUpdate,
+)
+from app.application.models.favorite import AddFavoriteResult
+
+
+class UsernameTakenError(ValueError):
+    def __init__(self, username: str):
+        super().__init__(f"Username {username!r} is taken")
+        self.username = username
 
 
 class UoW(ABC):
@@ -13,20 +30,59 @@ class UoW(ABC):
     async def flush(self) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def rollback(self) -> None:
+        raise NotImplementedError
+
+
+class CommitHooks(ABC):
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run `callback` once the current transaction commits, it is dropped if the transaction rolls back.
+        """
+        raise NotImplementedError
+
 
 class MovieDatabaseGateway(ABC):
     @abstractmethod
     async def add_movie(self, movie_data: MovieCreate) -> Movie:
         raise NotImplementedError
 
+    @abstractmethod
+    async def add_movies(self, movies_data: list[MovieCreate]) -> list[Movie]:
+        raise NotImplementedError
+
     @abstractmethod
     async def get_movies(self, skip: int, limit: int) -> list[Movie]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_movies_after(self, after_id: Optional[int], limit: int) -> list[Movie]:
+        raise NotImplementedError
+
     @abstractmethod
     async def get_movie_by_id(self, movie_id: int) -> Optional[Movie]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_movies_by_ids(self, movie_ids: list[int]) -> list[Movie]:
+        """
+        Returns the movies found, in the order of `movie_ids`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count_movies(self, exact: bool = False) -> int:
+        """
+        Returns the number of movies, an implementation may serve a recent estimate unless `exact`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_popular_movies(self, skip: int, limit: int) -> list[PopularMovie]:
+        raise NotImplementedError
+
     @abstractmethod
     async def update_movie(self, movie_id: int, movie_data: MovieUpdate) -> Optional[Movie]:
         raise NotImplementedError
@@ -36,13 +92,39 @@ class MovieDatabaseGateway(ABC):
         raise NotImplementedError
 
 
+class MovieExportGateway(ABC):
+    @abstractmethod
+    def stream_movies(self, chunk_size: int) -> AsyncIterator[list[Movie]]:
+        raise NotImplementedError
+
+
+class MovieSearchGateway(ABC):
+    @abstractmethod
+    async def search_movies(self, query: str, skip: int, limit: int) -> list[Movie]:
+        raise NotImplementedError
+
+
 class UserDatabaseGateway(ABC):
     @abstractmethod
     async def add_user(self, user_data: UserCreate) -> Optional[User]:
         raise NotImplementedError
 
     @abstractmethod
-    async def get_users(self, skip: int, limit: int) -> list[User]:
+    async def get_users(
+            self,
+            skip: int,
+            limit: int,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_users_after(
+            self,
+            after_id: Optional[int],
+            limit: int,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
         raise NotImplementedError
 
     @abstractmethod
@@ -50,19 +132,66 @@ class UserDatabaseGateway(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
+    async def get_users_by_ids(
+            self,
+            user_ids: list[int],
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> list[UserSummary]:
+        """
+        Returns the users found, in the order of `user_ids`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count_users(self, exact: bool = False) -> int:
+        """
+        Returns the number of users, an implementation may serve a recent estimate unless `exact`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def user_exists(self, user_id: int) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_user(
+            self,
+            user_id: int,
+            user_data: UserUpdate,
+            include: FavoritesInclude = FavoritesInclude.FULL,
+    ) -> Optional[UserSummary]:
+        """
+        Raises:
+            UsernameTakenError: If another user has the requested username.
+        """
         raise NotImplementedError
 
     @abstractmethod
-    async def delete_user_by_id(self, user_id: int) -> Optional[User]:
+    async def delete_user_by_id(self, user_id: int) -> Optional[UserSummary]:
         raise NotImplementedError
 
 
 class FavoriteDatabaseGateway(ABC):
     @abstractmethod
-    async def add_favorite_movie(self, user_id: int, movie_id: int) -> None:
+    async def add_favorite_movie(self, user_id: int, movie_id: int) -> AddFavoriteResult:
         raise NotImplementedError
 
     @abstractmethod
     async def delete_favorite_movie(self, user_id: int, movie_id: int) -> None:
         raise NotImplementedError
+
+    @abstractmethod
+    async def get_favorites(self, user_id: int, after_id: Optional[int], limit: int) -> list[Movie]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_favorite_ids(self, user_id: int) -> list[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_favorite_movies(self, user_id: int, movie_ids: list[int]) -> Optional[list[int]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_favorite_movies(self, user_id: int, movie_ids: list[int]) -> None:
+        raise NotImplementedError
@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+
+from app.application.models.pool import PoolStats
+
+
+class PoolMonitor(ABC):
+    @abstractmethod
+    def stats(self) -> PoolStats:
+        raise NotImplementedError
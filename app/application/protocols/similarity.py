@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import Iterable
+
+from app.application.models.similarity import SimilarityStats
+
+
+class SimilarityIndex(ABC):
+    @abstractmethod
+    def neighbors(self, movie_id: int) -> list[tuple[int, float]]:
+        """
+        Returns the most similar movies with their cosine similarity, most similar first.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_changed(self, movie_ids: Iterable[int]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> SimilarityStats:
+        raise NotImplementedError
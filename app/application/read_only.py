@@ -0,0 +1,44 @@
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_read_only: ContextVar[bool] = ContextVar("read_only", default=False)
+
+
+def read_only(use_case: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+    """
+    Mark a use case that never writes, so the database adapter may serve it from a replica.
+    """
+
+    @functools.wraps(use_case)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        token = _read_only.set(True)
+        try:
+            return await use_case(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+
+    return wrapper
+
+
+def in_read_only_use_case() -> bool:
+    return _read_only.get()
+
+
+@contextmanager
+def consistent_reads() -> Iterator[None]:
+    """
+    Read from the primary database inside a read-only use case.
+
+    For rows that outlive the request, like cache fills: a lagging replica would keep
+    a row from before a write for the whole cache TTL.
+    """
+    token = _read_only.set(False)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
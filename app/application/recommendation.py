@@ -0,0 +1,76 @@
+from collections import defaultdict
+from typing import Optional
+
+from app.application.models import ScoredMovie
+from app.application.protocols.database import FavoriteDatabaseGateway, MovieDatabaseGateway, UserDatabaseGateway
+from app.application.protocols.similarity import SimilarityIndex
+from app.application.read_only import read_only
+
+
+def recommend(favorite_ids: list[int], index: SimilarityIndex) -> list[tuple[int, float]]:
+    """
+    Score movies by the sum of their similarities to the favorites, favorites themselves are left out.
+
+    Returns every candidate, best first.
+    """
+    favorites = set(favorite_ids)
+    scores: dict[int, float] = defaultdict(float)
+    for favorite_id in favorite_ids:
+        for movie_id, score in index.neighbors(favorite_id):
+            if movie_id not in favorites:
+                scores[movie_id] += score
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+async def scored_movies(
+        scores: list[tuple[int, float]],
+        limit: int,
+        database: MovieDatabaseGateway,
+) -> list[ScoredMovie]:
+    """
+    Load the movies of the best `limit` scores.
+
+    Movies deleted since the index last saw them are skipped and the next scores take their place.
+    """
+    movies: list[ScoredMovie] = []
+    start = 0
+    while len(movies) < limit and start < len(scores):
+        batch = dict(scores[start:start + limit - len(movies)])
+        start += len(batch)
+        for movie in await database.get_movies_by_ids(list(batch)):
+            movies.append(ScoredMovie(
+                id=movie.id,
+                title=movie.title,
+                description=movie.description,
+                version=movie.version,
+                score=round(batch[movie.id], 6),
+            ))
+    return movies
+
+
+@read_only
+async def get_similar_movies(
+        movie_id: int,
+        limit: int,
+        index: SimilarityIndex,
+        database: MovieDatabaseGateway,
+) -> Optional[list[ScoredMovie]]:
+    movie = await database.get_movie_by_id(movie_id)
+    if movie is None:
+        return None
+    return await scored_movies(index.neighbors(movie_id), limit, database)
+
+
+@read_only
+async def get_recommendations(
+        user_id: int,
+        limit: int,
+        index: SimilarityIndex,
+        user_database: UserDatabaseGateway,
+        favorite_database: FavoriteDatabaseGateway,
+        movie_database: MovieDatabaseGateway,
+) -> Optional[list[ScoredMovie]]:
+    if not await user_database.user_exists(user_id):
+        return None
+    favorite_ids = await favorite_database.get_favorite_ids(user_id)
+    return await scored_movies(recommend(favorite_ids, index), limit, movie_database)
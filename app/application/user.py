@@ -1,7 +1,9 @@
 from typing import Optional
 
-from app.application.models import User, UserCreate, UserUpdate
+from app.application.cursor import decode_cursor
+from app.application.models import FavoritesInclude, User, UserCreate, UserSummary, UserUpdate
 from app.application.protocols.database import UserDatabaseGateway, UoW
+from app.application.read_only import read_only
 
 
 async def add_user(
@@ -12,15 +14,49 @@ async def add_user(
     return created_user
 
 
+@read_only
 async def get_users_data(
         skip: int,
         limit: int,
+        include: FavoritesInclude,
         database: UserDatabaseGateway,
-) -> list[User]:
-    users = await database.get_users(skip, limit)
+) -> list[UserSummary]:
+    users = await database.get_users(skip, limit, include)
     return users
 
 
+@read_only
+async def count_users_data(
+        exact: bool,
+        database: UserDatabaseGateway,
+) -> int:
+    count = await database.count_users(exact)
+    return count
+
+
+@read_only
+async def get_users_page(
+        cursor: Optional[str],
+        limit: int,
+        include: FavoritesInclude,
+        database: UserDatabaseGateway,
+) -> list[UserSummary]:
+    after_id = decode_cursor(cursor) if cursor else None
+    users = await database.get_users_after(after_id, limit, include)
+    return users
+
+
+@read_only
+async def get_users_by_ids_data(
+        user_ids: list[int],
+        include: FavoritesInclude,
+        database: UserDatabaseGateway,
+) -> list[UserSummary]:
+    users = await database.get_users_by_ids(user_ids, include)
+    return users
+
+
+@read_only
 async def get_user_data(
         user_id: int,
         database: UserDatabaseGateway,
@@ -32,10 +68,11 @@ async def get_user_data(
 async def update_user(
         user_id: int,
         user_data: UserUpdate,
+        include: FavoritesInclude,
         database: UserDatabaseGateway,
         uow: UoW,
-) -> Optional[User]:
-    user = await database.update_user(user_id, user_data)
+) -> Optional[UserSummary]:
+    user = await database.update_user(user_id, user_data, include)
     if not user:
         return None
     await uow.commit()
@@ -46,7 +83,7 @@ async def delete_user_by_id(
         user_id: int,
         database: UserDatabaseGateway,
         uow: UoW,
-) -> Optional[User]:
+) -> Optional[UserSummary]:
     deleted_user = await database.delete_user_by_id(user_id)
     if not deleted_user:
         return None
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+from sqlalchemy.exc import IntegrityError
+
+from app.adapters.sqlalchemy_db.movie_stats import rebuild_movie_stats
+from app.main.config import load_settings
+from app.main.di import create_engine, create_session_maker
+from app.main.importer import ENTITIES, FORMATS, Checkpoint, ImportProgress, InvalidRecordError, detect_format, import_file
+
+
+async def rebuild_stats(args: argparse.Namespace) -> None:
+    engine = create_engine(load_settings().database)
+    session_maker = create_session_maker(engine)
+    async with session_maker() as session:
+        movies = await rebuild_movie_stats(session)
+        await session.commit()
+    await engine.dispose()
+    print(f"movie_stats rebuilt, {movies} movies have favorites")
+
+
+def format_progress(progress: ImportProgress) -> str:
+    return (
+        f"{progress.records} records, {progress.inserted} inserted, {progress.skipped} skipped "
+        f"in {progress.elapsed:.1f}s, {progress.rate:.0f} records/s"
+    )
+
+
+async def import_data(args: argparse.Namespace) -> None:
+    source: Path = args.file
+    checkpoint_path = args.checkpoint or source.with_name(source.name + ".checkpoint")
+    if args.restart:
+        checkpoint_path.unlink(missing_ok=True)
+    try:
+        file_format = args.format or detect_format(source)
+        checkpoint = Checkpoint.load(checkpoint_path, args.entity, source)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if checkpoint.resumed_from:
+        print(f"resuming after record {checkpoint.resumed_from} from {checkpoint_path}")
+
+    last_report = time.monotonic()
+
+    def report(progress: ImportProgress) -> None:
+        nonlocal last_report
+        if time.monotonic() - last_report >= 1:
+            last_report = time.monotonic()
+            print(format_progress(progress), flush=True)
+
+    engine = create_engine(load_settings().database)
+    try:
+        progress = await import_file(
+            create_session_maker(engine), args.entity, source, file_format, args.chunk_size, checkpoint, report,
+        )
+    except (InvalidRecordError, IntegrityError) as e:
+        reason = e.orig if isinstance(e, IntegrityError) else e
+        raise SystemExit(
+            f"import stopped after record {checkpoint.progress.records}: {reason}\n"
+            f"fix the file and run the same command again to resume"
+        )
+    finally:
+        await engine.dispose()
+    print(f"{args.entity} imported: {format_progress(progress)}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="film-library", description="Maintenance commands of the film library.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-movie-stats",
+        help="Recompute favorites counters of movie_stats from the favorites table.",
+    )
+    rebuild.set_defaults(handler=rebuild_stats)
+
+    importer = commands.add_parser(
+        "import",
+        help="Bulk insert movies, users or favorites from a CSV or JSONL file.",
+        description="Columns: movies - title, description, id; users - username, id; "
+                    "favorites - user_id, movie_id. ids are optional for movies and users.",
+    )
+    importer.add_argument("entity", choices=sorted(ENTITIES))
+    importer.add_argument("file", type=Path)
+    importer.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    importer.add_argument("--chunk-size", type=int, default=5000, help="Records per executemany and commit")
+    importer.add_argument("--checkpoint", type=Path, help="Defaults to <file>.checkpoint")
+    importer.add_argument("--restart", action="store_true", help="Ignore a saved checkpoint and start over")
+    importer.set_defaults(handler=import_data)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
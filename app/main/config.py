@@ -0,0 +1,105 @@
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+
+
+def env_list(name: str) -> tuple[str, ...]:
+    value = os.getenv(name, "")
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def sqlite_uri(name: str, uri: str) -> str:
+    # upserts, FTS5 search, PRAGMAs and migrations are written for SQLite only
+    backend = make_url(uri).get_backend_name()
+    if backend != "sqlite":
+        raise ValueError(f"{name} must point to a SQLite database, got {backend}")
+    return uri
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    uri: str
+    echo: bool = False
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    instrument: bool = True
+    replica_uris: tuple[str, ...] = ()
+    replica_strategy: str = "round_robin"
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    size: int = 10000
+    ttl: float = 30.0
+    count_ttl: float = 60.0
+
+
+@dataclass(frozen=True)
+class SimilaritySettings:
+    top_k: int = 50
+    refresh_interval: float = 5.0
+    rebuild_interval: float = 600.0
+
+
+@dataclass(frozen=True)
+class ServerSettings:
+    host: str = "127.0.0.1"
+    port: int = 8000
+    workers: int = 1
+
+
+@dataclass(frozen=True)
+class Settings:
+    database: DatabaseSettings
+    cache: CacheSettings
+    server: ServerSettings = ServerSettings()
+    similarity: SimilaritySettings = SimilaritySettings()
+
+
+def load_settings() -> Settings:
+    load_dotenv()
+    db_uri = os.getenv('DATABASE_URI')
+    if not db_uri:
+        raise ValueError("DB_URI env variable is not set")
+
+    return Settings(
+        database=DatabaseSettings(
+            uri=sqlite_uri("DATABASE_URI", db_uri),
+            echo=env_bool("DB_ECHO", False),
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "-1")),
+            pool_pre_ping=env_bool("DB_POOL_PRE_PING", False),
+            instrument=env_bool("DB_INSTRUMENT", True),
+            replica_uris=tuple(sqlite_uri("DATABASE_REPLICA_URIS", uri) for uri in env_list("DATABASE_REPLICA_URIS")),
+            replica_strategy=os.getenv("DB_REPLICA_STRATEGY", "round_robin"),
+        ),
+        cache=CacheSettings(
+            size=int(os.getenv("ENTITY_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("ENTITY_CACHE_TTL", "30")),
+            count_ttl=float(os.getenv("COUNT_CACHE_TTL", "60")),
+        ),
+        similarity=SimilaritySettings(
+            top_k=int(os.getenv("SIMILARITY_TOP_K", "50")),
+            refresh_interval=float(os.getenv("SIMILARITY_REFRESH_INTERVAL", "5")),
+            rebuild_interval=float(os.getenv("SIMILARITY_REBUILD_INTERVAL", "600")),
+        ),
+        server=ServerSettings(
+            host=os.getenv("SERVER_HOST", "127.0.0.1"),
+            port=int(os.getenv("SERVER_PORT", "8000")),
+            workers=int(os.getenv("SERVER_WORKERS") or os.cpu_count() or 1),
+        ),
+    )
@@ -1,32 +1,115 @@
-import os
+from contextlib import asynccontextmanager
+from dataclasses import replace
 from functools import partial
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, AsyncIterator, Optional
 
-from dotenv import load_dotenv
 from fastapi import FastAPI, Depends
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-
-from app.adapters.sqlalchemy_db.gateway import MovieSqlaGateway, UserSqlaGateway, FavoriteSqlaGateway
+from sqlalchemy import event, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+
+from app.adapters.cache import (
+    TTLCount,
+    TTLLRUCache,
+    CachedMovieGateway,
+    CachedUserGateway,
+    CachedFavoriteGateway,
+    SingleFlight,
+)
+from app.adapters.sqlalchemy_db.commit_hooks import SessionCommitHooks
+from app.adapters.sqlalchemy_db.gateway import (
+    MovieSqlaGateway,
+    MovieSqlaExportGateway,
+    UserSqlaGateway,
+    FavoriteSqlaGateway,
+)
+from app.adapters.sqlalchemy_db.instrumentation import instrument_engine
+from app.adapters.sqlalchemy_db.pool import InstrumentedQueuePool, SqlaPoolMonitor
+from app.adapters.sqlalchemy_db.routing import REPLICA_SELECTORS, ReplicaSelector, RoutingSession
+from app.adapters.similarity import (
+    SimilarityTrackingFavoriteGateway,
+    SimilarityTrackingMovieGateway,
+    SimilarityTrackingUserGateway,
+    TopKSimilarityIndex,
+)
+from app.adapters.similarity.refresher import SimilarityRefresher
+from app.adapters.sqlalchemy_db.search import MovieSqliteSearchGateway
 from app.api.depends_stub import Stub
-from app.application.protocols.database import UoW, MovieDatabaseGateway, UserDatabaseGateway, FavoriteDatabaseGateway
+from app.api.route import release_after_endpoint
+from app.application.models import Movie, User
+from app.application.protocols.cache import CountCache, EntityCache
+from app.application.protocols.coalescing import RequestCoalescer
+from app.application.protocols.database import (
+    CommitHooks,
+    UoW,
+    MovieDatabaseGateway,
+    MovieExportGateway,
+    MovieSearchGateway,
+    UserDatabaseGateway,
+    FavoriteDatabaseGateway,
+)
+from app.application.protocols.pool import PoolMonitor
+from app.application.protocols.similarity import SimilarityIndex
+from app.main.config import CacheSettings, DatabaseSettings, Settings
 
 
 async def new_movie_gateway(
+        session: AsyncSession = Depends(Stub(AsyncSession)),
+        movie_cache: EntityCache[Movie] = Depends(Stub(EntityCache, entity="movie")),
+        user_cache: EntityCache[User] = Depends(Stub(EntityCache, entity="user")),
+        movie_flights: RequestCoalescer = Depends(Stub(RequestCoalescer, entity="movie")),
+        user_flights: RequestCoalescer = Depends(Stub(RequestCoalescer, entity="user")),
+        movie_count: CountCache = Depends(Stub(CountCache, entity="movie")),
+        similarity_index: SimilarityIndex = Depends(Stub(SimilarityIndex)),
+        commit_hooks: CommitHooks = Depends(Stub(CommitHooks)),
+) -> AsyncGenerator[MovieDatabaseGateway, None]:
+    gateway = SimilarityTrackingMovieGateway(MovieSqlaGateway(session), similarity_index, commit_hooks)
+    yield CachedMovieGateway(
+        gateway, movie_cache, user_cache, movie_flights, user_flights, movie_count, commit_hooks,
+    )
+
+
+def new_movie_export_gateway(
+        session_maker: async_sessionmaker[AsyncSession],
+) -> MovieSqlaExportGateway:
+    return MovieSqlaExportGateway(session_maker)
+
+
+async def new_movie_search_gateway(
         session: AsyncSession = Depends(Stub(AsyncSession))
-) -> AsyncGenerator[MovieSqlaGateway, None]:
-    yield MovieSqlaGateway(session)
+) -> AsyncGenerator[MovieSqliteSearchGateway, None]:
+    yield MovieSqliteSearchGateway(session)
 
 
 async def new_user_gateway(
-        session: AsyncSession = Depends(Stub(AsyncSession))
-) -> AsyncGenerator[UserSqlaGateway, None]:
-    yield UserSqlaGateway(session)
+        session: AsyncSession = Depends(Stub(AsyncSession)),
+        user_cache: EntityCache[User] = Depends(Stub(EntityCache, entity="user")),
+        user_flights: RequestCoalescer = Depends(Stub(RequestCoalescer, entity="user")),
+        user_count: CountCache = Depends(Stub(CountCache, entity="user")),
+        similarity_index: SimilarityIndex = Depends(Stub(SimilarityIndex)),
+        commit_hooks: CommitHooks = Depends(Stub(CommitHooks)),
+) -> AsyncGenerator[UserDatabaseGateway, None]:
+    # favorites of a deleted user go with it, so the similarity of their movies changes
+    gateway = SimilarityTrackingUserGateway(
+        UserSqlaGateway(session), FavoriteSqlaGateway(session), similarity_index, commit_hooks,
+    )
+    yield CachedUserGateway(gateway, user_cache, user_flights, user_count, commit_hooks)
 
 
 async def new_favorite_gateway(
+        session: AsyncSession = Depends(Stub(AsyncSession)),
+        user_cache: EntityCache[User] = Depends(Stub(EntityCache, entity="user")),
+        user_flights: RequestCoalescer = Depends(Stub(RequestCoalescer, entity="user")),
+        similarity_index: SimilarityIndex = Depends(Stub(SimilarityIndex)),
+        commit_hooks: CommitHooks = Depends(Stub(CommitHooks)),
+) -> AsyncGenerator[FavoriteDatabaseGateway, None]:
+    gateway = SimilarityTrackingFavoriteGateway(FavoriteSqlaGateway(session), similarity_index, commit_hooks)
+    yield CachedFavoriteGateway(gateway, user_cache, user_flights, commit_hooks)
+
+
+def new_commit_hooks(
         session: AsyncSession = Depends(Stub(AsyncSession))
-) -> AsyncGenerator[FavoriteSqlaGateway, None]:
-    yield FavoriteSqlaGateway(session)
+) -> CommitHooks:
+    return SessionCommitHooks(session)
 
 
 async def new_uow(
@@ -35,34 +118,132 @@ async def new_uow(
     return session
 
 
-def create_session_maker() -> async_sessionmaker[AsyncSession]:
-    load_dotenv()
-    db_uri = os.getenv('DATABASE_URI')
-    if not db_uri:
-        raise ValueError("DB_URI env variable is not set")
-
-    engine = create_async_engine(
-        db_uri,
-        echo=True,
-        # pool_size=15,
-        # max_overflow=15,
-        # connect_args={
-        #     "connect_timeout": 5,
-        # },
+def enable_sqlite_foreign_keys(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def create_engine(settings: DatabaseSettings) -> AsyncEngine:
+    url = make_url(settings.uri)
+    options: dict[str, Any] = {
+        "echo": settings.echo,
+        "pool_pre_ping": settings.pool_pre_ping,
+        "pool_recycle": settings.pool_recycle,
+    }
+    # in-memory SQLite lives in a single connection, so it keeps its static pool
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+        )
+    engine = create_async_engine(url, **options)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", enable_sqlite_foreign_keys)
+    if settings.instrument:
+        instrument_engine(engine)
+    return engine
+
+
+def create_replica_selector(settings: DatabaseSettings) -> Optional[ReplicaSelector]:
+    if not settings.replica_uris:
+        return None
+    selector_class = REPLICA_SELECTORS.get(settings.replica_strategy)
+    if selector_class is None:
+        raise ValueError(f"Unknown replica strategy: {settings.replica_strategy}")
+    return selector_class([create_engine(replace(settings, uri=uri)) for uri in settings.replica_uris])
+
+
+def create_session_maker(
+        engine: AsyncEngine,
+        replicas: Optional[ReplicaSelector] = None,
+        read_only: bool = False,
+) -> async_sessionmaker[AsyncSession]:
+    if replicas is None:
+        return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    return async_sessionmaker(
+        engine,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        replicas=replicas,
+        read_only=read_only,
     )
-    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+def create_entity_cache(settings: CacheSettings) -> TTLLRUCache:
+    return TTLLRUCache(max_size=settings.size, ttl=settings.ttl)
 
 
 async def new_session(session_maker: async_sessionmaker[AsyncSession]) -> AsyncGenerator[AsyncSession, None]:
+    # the session checks a connection out on its first statement only;
+    # closing it once the endpoint returns hands the connection back before serialization
     async with session_maker() as session:
+        release_after_endpoint(session.close)
         yield session
 
 
-def init_dependencies(app: FastAPI) -> None:
-    session_maker = create_session_maker()
+def init_dependencies(
+        app: FastAPI,
+        settings: Settings,
+        engine: AsyncEngine,
+        replicas: Optional[ReplicaSelector],
+        similarity_index: SimilarityIndex,
+) -> None:
+    session_maker = create_session_maker(engine, replicas)
+    # the export is a read-only stream that outlives the request, so it goes to a replica directly
+    export_session_maker = create_session_maker(engine, replicas, read_only=True)
+    pool_monitor = SqlaPoolMonitor(engine)
+    movie_cache = create_entity_cache(settings.cache)
+    user_cache = create_entity_cache(settings.cache)
+    movie_flights = SingleFlight()
+    user_flights = SingleFlight()
+    movie_count = TTLCount(settings.cache.count_ttl)
+    user_count = TTLCount(settings.cache.count_ttl)
 
     app.dependency_overrides[AsyncSession] = partial(new_session, session_maker)
     app.dependency_overrides[MovieDatabaseGateway] = new_movie_gateway
+    app.dependency_overrides[MovieExportGateway] = partial(new_movie_export_gateway, export_session_maker)
+    app.dependency_overrides[MovieSearchGateway] = new_movie_search_gateway
     app.dependency_overrides[UserDatabaseGateway] = new_user_gateway
     app.dependency_overrides[FavoriteDatabaseGateway] = new_favorite_gateway
     app.dependency_overrides[UoW] = new_uow
+    app.dependency_overrides[CommitHooks] = new_commit_hooks
+    app.dependency_overrides[Stub(EntityCache, entity="movie")] = lambda: movie_cache
+    app.dependency_overrides[Stub(EntityCache, entity="user")] = lambda: user_cache
+    app.dependency_overrides[Stub(RequestCoalescer, entity="movie")] = lambda: movie_flights
+    app.dependency_overrides[Stub(RequestCoalescer, entity="user")] = lambda: user_flights
+    app.dependency_overrides[Stub(CountCache, entity="movie")] = lambda: movie_count
+    app.dependency_overrides[Stub(CountCache, entity="user")] = lambda: user_count
+    app.dependency_overrides[PoolMonitor] = lambda: pool_monitor
+    app.dependency_overrides[SimilarityIndex] = lambda: similarity_index
+
+
+@asynccontextmanager
+async def dependencies_lifespan(app: FastAPI, settings: Settings) -> AsyncIterator[None]:
+    """
+    Build the engines and their pools on server startup and dispose them on shutdown.
+
+    The lifespan runs inside the worker process, so every worker opens its own connections
+    instead of inheriting the ones of the process that created the app.
+    """
+    engine = create_engine(settings.database)
+    replicas = create_replica_selector(settings.database)
+    similarity_index = TopKSimilarityIndex(settings.similarity.top_k)
+    init_dependencies(app, settings, engine, replicas, similarity_index)
+    refresher = SimilarityRefresher(
+        similarity_index,
+        create_session_maker(engine),
+        settings.similarity.refresh_interval,
+        settings.similarity.rebuild_interval,
+    )
+    refresher.start()
+    try:
+        yield
+    finally:
+        await refresher.stop()
+        await engine.dispose()
+        for replica in replicas.replicas if replicas else ():
+            await replica.dispose()
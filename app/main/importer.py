@@ -0,0 +1,187 @@
+import csv
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from itertools import groupby, islice
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.movie_stats import rebuild_movie_stats
+
+FORMATS = ("csv", "jsonl")
+
+
+class InvalidRecordError(ValueError):
+    def __init__(self, number: int, reason: str):
+        super().__init__(f"record {number}: {reason}")
+        self.number = number
+
+
+def optional_text(value: Any) -> Optional[str]:
+    return str(value) if value not in (None, "") else None
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    model: type[models.Base]
+    fields: dict[str, Callable[[Any], Any]]
+    required: tuple[str, ...]
+    generated: tuple[str, ...] = ()
+
+
+ENTITIES: dict[str, EntitySpec] = {
+    "movies": EntitySpec(
+        models.Movie, {"id": int, "title": str, "description": optional_text}, ("title",), ("id",),
+    ),
+    "users": EntitySpec(models.User, {"id": int, "username": str}, ("username",), ("id",)),
+    "favorites": EntitySpec(models.Favorite, {"user_id": int, "movie_id": int}, ("user_id", "movie_id")),
+}
+
+
+@dataclass
+class ImportProgress:
+    entity: str
+    path: str
+    records: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class Checkpoint:
+    """
+    Import state saved after every committed chunk, so a failed import resumes after the last one.
+    """
+
+    path: Path
+    progress: ImportProgress
+    resumed_from: int = 0
+
+    @classmethod
+    def load(cls, path: Path, entity: str, source: Path) -> "Checkpoint":
+        progress = ImportProgress(entity=entity, path=str(source.resolve()))
+        if path.exists():
+            saved = ImportProgress(**json.loads(path.read_text()))
+            if (saved.entity, saved.path) != (progress.entity, progress.path):
+                raise ValueError(f"Checkpoint {path} belongs to the {saved.entity} import of {saved.path}")
+            progress = saved
+        return cls(path=path, progress=progress, resumed_from=progress.records)
+
+    def save(self) -> None:
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        temporary.write_text(json.dumps(asdict(self.progress)))
+        os.replace(temporary, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def detect_format(path: Path) -> str:
+    suffix = path.suffix.lower().lstrip(".")
+    if suffix in ("jsonl", "ndjson"):
+        return "jsonl"
+    if suffix == "csv":
+        return "csv"
+    raise ValueError(f"Can not tell the format of {path}, pass --format")
+
+
+def read_records(path: Path, file_format: str) -> Iterator[dict[str, Any]]:
+    with path.open(newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+            return
+        number = 0
+        for line in file:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise InvalidRecordError(number, f"invalid JSON, {e}")
+            if not isinstance(record, dict):
+                raise InvalidRecordError(number, f"expected a JSON object, got {type(record).__name__}")
+            yield record
+
+
+def normalize(spec: EntitySpec, record: dict[str, Any], number: int) -> dict[str, Any]:
+    row = {}
+    for name, convert in spec.fields.items():
+        value = record.get(name)
+        if value is None or value == "":
+            if name in spec.required:
+                raise InvalidRecordError(number, f"{name} is missing")
+            if name not in spec.generated:
+                row[name] = None
+            continue
+        try:
+            row[name] = convert(value)
+        except (TypeError, ValueError):
+            raise InvalidRecordError(number, f"{name} has invalid value {value!r}")
+    return row
+
+
+async def insert_chunk(session: AsyncSession, spec: EntitySpec, rows: list[dict[str, Any]]) -> int:
+    """
+    Insert one chunk with executemany, rows clashing with existing keys are skipped.
+
+    Rows with and without generated keys are sent as separate batches,
+    as one statement needs the same parameters for every row.
+    """
+    # a Core connection, as the ORM bulk insert of a session does not report the row count
+    connection = await session.connection()
+    query = sqlite_insert(spec.model).on_conflict_do_nothing()
+    inserted = 0
+    for _, group in groupby(rows, key=lambda row: tuple(row)):
+        result = await connection.execute(query, list(group))
+        inserted += result.rowcount
+    return inserted
+
+
+async def import_file(
+        session_maker: async_sessionmaker[AsyncSession],
+        entity: str,
+        source: Path,
+        file_format: str,
+        chunk_size: int,
+        checkpoint: Checkpoint,
+        report: Callable[[ImportProgress], None] = lambda progress: None,
+) -> ImportProgress:
+    """
+    Stream records of `source` into the database, committing and checkpointing every `chunk_size` records.
+
+    Records already covered by the checkpoint are skipped. Favorites counters of
+    movie_stats are rebuilt once all favorites are in.
+    """
+    spec = ENTITIES[entity]
+    progress = checkpoint.progress
+    started = time.perf_counter() - progress.elapsed
+    records = enumerate(read_records(source, file_format), start=1)
+    records = islice(records, checkpoint.resumed_from, None)
+    async with session_maker() as session:
+        while chunk := list(islice(records, chunk_size)):
+            rows = [normalize(spec, record, number) for number, record in chunk]
+            inserted = await insert_chunk(session, spec, rows)
+            await session.commit()
+            progress.records += len(rows)
+            progress.inserted += inserted
+            progress.skipped += len(rows) - inserted
+            progress.elapsed = time.perf_counter() - started
+            checkpoint.save()
+            report(progress)
+        if entity == "favorites":
+            await rebuild_movie_stats(session)
+            await session.commit()
+    progress.elapsed = time.perf_counter() - started
+    checkpoint.clear()
+    return progress
@@ -0,0 +1,60 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.adapters.sqlalchemy_db.instrumentation import QueryStats, query_stats
+
+access_logger = logging.getLogger("app.access")
+
+
+class ServerTimingMiddleware:
+    """
+    Reports database time of every request in a `Server-Timing` header and an access log line.
+
+    The header is sent with the response start, so for streamed
+    responses it only covers the work done before the first byte.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            access_logger.info(
+                "method=%s path=%s status=%s duration_ms=%.2f db_queries=%d db_ms=%.2f",
+                scope["method"],
+                scope["path"],
+                status_code,
+                (time.perf_counter() - started) * 1000,
+                stats.count,
+                stats.duration * 1000,
+            )
+
+
+def server_timing(stats: QueryStats, total: float) -> str:
+    return (
+        f'db;desc="{stats.count} queries";dur={stats.duration * 1000:.2f}, '
+        f'app;dur={total * 1000:.2f}'
+    )
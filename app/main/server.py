@@ -0,0 +1,25 @@
+import uvicorn
+
+from app.main.config import load_settings
+
+
+def main() -> None:
+    """
+    Serve the app with `SERVER_WORKERS` uvicorn worker processes.
+
+    Every worker calls the app factory itself and builds its engine in the app lifespan,
+    so pools are never shared between processes. Each worker holds up to
+    `DB_POOL_SIZE + DB_MAX_OVERFLOW` connections per database.
+    """
+    settings = load_settings().server
+    uvicorn.run(
+        "app.main:create_app",
+        factory=True,
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
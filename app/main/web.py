@@ -1,12 +1,35 @@
+import logging
+from functools import partial
+
 from fastapi import FastAPI
 
-from .di import init_dependencies
+from .config import load_settings
+from .di import dependencies_lifespan
+from .middleware import ServerTimingMiddleware
 from .routers import init_routers
 
 
+def configure_logging() -> None:
+    """
+    Print INFO records of the `app.*` loggers (access log, similarity index) to stderr.
+
+    uvicorn only sets up its own loggers, so without this they fall back to WARNING.
+    A logging setup that already has handlers on the root or `app` logger is left alone.
+    """
+    logger = logging.getLogger("app")
+    if logger.handlers or logging.getLogger().handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
 def create_app() -> FastAPI:
-    app = FastAPI()
+    settings = load_settings()
+    configure_logging()
+    app = FastAPI(lifespan=partial(dependencies_lifespan, settings=settings))
     init_routers(app)
-    init_dependencies(app)
+    if settings.database.instrument:
+        app.add_middleware(ServerTimingMiddleware)
     return app
-
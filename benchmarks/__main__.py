@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import dataclasses
+from pathlib import Path
+
+from benchmarks.driver import benchmark_data, create_benchmark_app, run_benchmark, uncovered_routes
+from benchmarks.report import environment, format_table, write_report
+from benchmarks.seed import SeedConfig, seed_database
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Seed an SQLite database and load test every API route in-process.",
+    )
+    parser.add_argument("--db", type=Path, default=Path("benchmark.db"), help="SQLite file to seed and query")
+    parser.add_argument("--output", type=Path, default=Path("benchmark.json"), help="JSON report path")
+    parser.add_argument("--movies", type=int, default=SeedConfig.movies)
+    parser.add_argument("--users", type=int, default=SeedConfig.users)
+    parser.add_argument("--favorites", type=int, default=SeedConfig.favorites)
+    parser.add_argument("--skew", type=float, default=SeedConfig.popularity_skew, help="Zipf exponent of popularity")
+    parser.add_argument("--seed", type=int, default=SeedConfig.seed, help="Random seed of data and requests")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent in-flight requests")
+    parser.add_argument("--label", default="", help="Free text stored in the report, e.g. a git revision")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = SeedConfig(
+        movies=args.movies,
+        users=args.users,
+        favorites=args.favorites,
+        popularity_skew=args.skew,
+        seed=args.seed,
+    )
+    if args.db.exists():
+        args.db.unlink()
+    db_uri = f"sqlite+aiosqlite:///{args.db}"
+    seeded = seed_database(db_uri, config)
+    print(f"seeded {seeded.movies} movies, {seeded.users} users, {seeded.favorites} favorites")
+
+    app = create_benchmark_app(db_uri)
+    missing = uncovered_routes(app)
+    if missing:
+        print("routes without a scenario: " + ", ".join(missing))
+    data = benchmark_data(seeded.movies, seeded.users, args.requests, args.seed)
+    routes = asyncio.run(run_benchmark(app, data, args.requests, args.concurrency))
+
+    write_report(args.output, {
+        "label": args.label,
+        "environment": environment(),
+        "seed": dataclasses.asdict(config),
+        "seeded": dataclasses.asdict(seeded),
+        "load": {"requests_per_route": args.requests, "concurrency": args.concurrency},
+        "uncovered_routes": missing,
+        "routes": routes,
+    })
+    print(format_table(routes))
+    print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+from typing import Any, Iterable
+
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from benchmarks.report import summarize
+from benchmarks.scenarios import BenchmarkData, Scenario, SCENARIOS
+
+
+def uncovered_routes(app: FastAPI, scenarios: Iterable[Scenario] = SCENARIOS) -> list[str]:
+    covered = {(scenario.method, scenario.route) for scenario in scenarios}
+    return sorted(
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+        if (method, route.path) not in covered
+    )
+
+
+async def run_scenario(
+        client: httpx.AsyncClient,
+        scenario: Scenario,
+        data: BenchmarkData,
+        requests: int,
+        concurrency: int,
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    pending = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in pending:
+            spec = scenario.build(data)
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, spec.path, json=spec.json)
+                statuses[response.status_code] += 1
+            except Exception:
+                statuses["error"] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+async def run_benchmark(
+        app: FastAPI,
+        data: BenchmarkData,
+        requests: int,
+        concurrency: int,
+        scenarios: Iterable[Scenario] = SCENARIOS,
+) -> dict[str, dict[str, Any]]:
+    """
+    Drive the app in-process through its ASGI interface, one scenario after another.
+    """
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for scenario in scenarios:
+                scenario_requests = min(requests, scenario.max_requests or requests)
+                results[scenario.name] = await run_scenario(
+                    client, scenario, data, scenario_requests, concurrency,
+                )
+    return results
+
+
+def create_benchmark_app(db_uri: str) -> FastAPI:
+    os.environ["DATABASE_URI"] = db_uri
+    from app.main import create_app
+    return create_app()
+
+
+def benchmark_data(movies: int, users: int, requests: int, seed: int) -> BenchmarkData:
+    return BenchmarkData(movies=movies, users=users, reserved=requests, rng=random.Random(seed))
@@ -0,0 +1,64 @@
+import json
+import math
+import platform
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Percentile with linear interpolation between closest ranks.
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def summarize(latencies: list[float], statuses: Counter, wall_time: float) -> dict[str, Any]:
+    values = sorted(latency * 1000 for latency in latencies)
+    errors = sum(count for status, count in statuses.items() if status == "error" or int(status) >= 500)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "wall_time_s": round(wall_time, 4),
+        "throughput_rps": round(len(values) / wall_time, 2) if wall_time else 0.0,
+        "latency_ms": {
+            "min": round(values[0], 3) if values else 0.0,
+            "mean": round(sum(values) / len(values), 3) if values else 0.0,
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+            "max": round(values[-1], 3) if values else 0.0,
+        },
+    }
+
+
+def environment() -> dict[str, str]:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def write_report(path: Path, report: dict[str, Any]) -> None:
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+
+
+def format_table(routes: dict[str, dict[str, Any]]) -> str:
+    header = f"{'route':<52} {'req':>6} {'err':>5} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}"
+    lines = [header, "-" * len(header)]
+    for name, result in routes.items():
+        latency = result["latency_ms"]
+        lines.append(
+            f"{name:<52} {result['requests']:>6} {result['errors']:>5} {result['throughput_rps']:>9.1f} "
+            f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+        )
+    return "\n".join(lines)
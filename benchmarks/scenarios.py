@@ -0,0 +1,146 @@
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from app.application.cursor import encode_cursor
+from benchmarks.seed import ADJECTIVES, GENRES, NOUNS
+
+
+@dataclass(frozen=True)
+class RequestSpec:
+    path: str
+    json: Any = None
+
+
+@dataclass
+class BenchmarkData:
+    """
+    What scenarios know about the seeded database.
+
+    The highest `reserved` movie and user ids are left alone by every
+    scenario except the deletes, which consume them one per request.
+    """
+
+    movies: int
+    users: int
+    reserved: int
+    rng: random.Random
+    added_favorites: list[tuple[int, int]] = field(default_factory=list)
+    deleted_movies: int = 0
+    deleted_users: int = 0
+
+    def movie_id(self) -> int:
+        return self.rng.randint(1, max(1, self.movies - self.reserved))
+
+    def user_id(self) -> int:
+        return self.rng.randint(1, max(1, self.users - self.reserved))
+
+    def next_deleted_movie_id(self) -> int:
+        self.deleted_movies += 1
+        return self.movies - self.deleted_movies + 1
+
+    def next_deleted_user_id(self) -> int:
+        self.deleted_users += 1
+        return self.users - self.deleted_users + 1
+
+    def search_word(self) -> str:
+        return self.rng.choice(ADJECTIVES + NOUNS + GENRES)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    method: str
+    route: str
+    build: Callable[[BenchmarkData], RequestSpec]
+    variant: str = ""
+    max_requests: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        name = f"{self.method} {self.route}"
+        return f"{name} [{self.variant}]" if self.variant else name
+
+
+def add_favorite(data: BenchmarkData) -> RequestSpec:
+    user_id, movie_id = data.user_id(), data.movie_id()
+    data.added_favorites.append((user_id, movie_id))
+    return RequestSpec(f"/users/{user_id}/favorites/{movie_id}")
+
+
+def delete_favorite(data: BenchmarkData) -> RequestSpec:
+    if data.added_favorites:
+        user_id, movie_id = data.added_favorites.pop()
+    else:
+        user_id, movie_id = data.user_id(), data.movie_id()
+    return RequestSpec(f"/users/{user_id}/favorites/{movie_id}")
+
+
+def patch_favorites(data: BenchmarkData) -> RequestSpec:
+    movie_ids = {data.movie_id() for _ in range(10)}
+    add = sorted(movie_ids)[::2]
+    remove = sorted(movie_ids.difference(add))
+    return RequestSpec(f"/users/{data.user_id()}/favorites", {"add": add, "remove": remove})
+
+
+def random_ids(next_id: Callable[[], int], count: int) -> str:
+    return ",".join(str(next_id()) for _ in range(count))
+
+
+# reads first, then writes; deletes run last so they never hide rows from other scenarios
+SCENARIOS: tuple[Scenario, ...] = (
+    Scenario("GET", "/", lambda d: RequestSpec("/")),
+    Scenario("GET", "/movies/", lambda d: RequestSpec(f"/movies/?skip={d.movie_id()}&limit=50"), "offset"),
+    Scenario("GET", "/movies/", lambda d: RequestSpec(f"/movies/?cursor={encode_cursor(d.movie_id())}&limit=50"),
+             "cursor"),
+    Scenario("GET", "/movies/",
+             lambda d: RequestSpec(f"/movies/?cursor={encode_cursor(d.movie_id())}&limit=50&total=true"),
+             "cursor with total"),
+    Scenario("GET", "/movies/",
+             lambda d: RequestSpec(f"/movies/?cursor={encode_cursor(d.movie_id())}&limit=50&exact=true"),
+             "cursor with exact total"),
+    Scenario("GET", "/movies/", lambda d: RequestSpec(f"/movies/?ids={random_ids(d.movie_id, 100)}"), "ids"),
+    Scenario("GET", "/movies/{movie_id}", lambda d: RequestSpec(f"/movies/{d.movie_id()}")),
+    Scenario("GET", "/movies/{movie_id}/similar", lambda d: RequestSpec(f"/movies/{d.movie_id()}/similar")),
+    Scenario("GET", "/movies/popular", lambda d: RequestSpec("/movies/popular?limit=20")),
+    Scenario("GET", "/movies/search", lambda d: RequestSpec(f"/movies/search?q={d.search_word()}&limit=20")),
+    Scenario("GET", "/movies/export", lambda d: RequestSpec("/movies/export"), max_requests=3),
+    Scenario("GET", "/users/", lambda d: RequestSpec(f"/users/?skip={d.user_id()}&limit=50"), "offset"),
+    Scenario("GET", "/users/", lambda d: RequestSpec(f"/users/?cursor={encode_cursor(d.user_id())}&limit=50"),
+             "cursor"),
+    Scenario("GET", "/users/",
+             lambda d: RequestSpec(f"/users/?cursor={encode_cursor(d.user_id())}&limit=50&total=true"),
+             "cursor with total"),
+    Scenario("GET", "/users/", lambda d: RequestSpec(f"/users/?skip={d.user_id()}&limit=50&include=ids"),
+             "favorite ids"),
+    Scenario("GET", "/users/", lambda d: RequestSpec(f"/users/?skip={d.user_id()}&limit=50&include=none"),
+             "no favorites"),
+    Scenario("GET", "/users/", lambda d: RequestSpec(f"/users/?ids={random_ids(d.user_id, 50)}"), "ids"),
+    Scenario("GET", "/users/{user_id}", lambda d: RequestSpec(f"/users/{d.user_id()}")),
+    Scenario("GET", "/users/{user_id}/recommendations",
+             lambda d: RequestSpec(f"/users/{d.user_id()}/recommendations")),
+    Scenario("GET", "/users/{user_id}/favorites", lambda d: RequestSpec(f"/users/{d.user_id()}/favorites")),
+    Scenario("GET", "/internal/cache", lambda d: RequestSpec("/internal/cache")),
+    Scenario("GET", "/internal/coalescing", lambda d: RequestSpec("/internal/coalescing")),
+    Scenario("GET", "/internal/similarity", lambda d: RequestSpec("/internal/similarity")),
+    Scenario("GET", "/internal/pool", lambda d: RequestSpec("/internal/pool")),
+    Scenario("POST", "/movies/", lambda d: RequestSpec("/movies/", {"title": f"Bench {uuid.uuid4().hex}"})),
+    Scenario("POST", "/movies/bulk", lambda d: RequestSpec(
+        "/movies/bulk", [{"title": f"Bench {uuid.uuid4().hex}"} for _ in range(100)],
+    )),
+    Scenario("PATCH", "/movies/{movie_id}", lambda d: RequestSpec(
+        f"/movies/{d.movie_id()}", {"description": f"A {d.search_word()} revisited."},
+    )),
+    Scenario("POST", "/users/", lambda d: RequestSpec("/users/", {"username": f"bench_{uuid.uuid4().hex}"})),
+    Scenario("PATCH", "/users/{user_id}", lambda d: RequestSpec(
+        f"/users/{d.user_id()}", {"username": f"bench_{uuid.uuid4().hex}"},
+    )),
+    Scenario("POST", "/users/{user_id}/favorites/{movie_id}", add_favorite),
+    Scenario("DELETE", "/users/{user_id}/favorites/{movie_id}", delete_favorite),
+    Scenario("PUT", "/users/{user_id}/favorites", lambda d: RequestSpec(
+        f"/users/{d.user_id()}/favorites", {"movie_ids": [d.movie_id() for _ in range(20)]},
+    )),
+    Scenario("PATCH", "/users/{user_id}/favorites", patch_favorites),
+    Scenario("DELETE", "/movies/{movie_id}", lambda d: RequestSpec(f"/movies/{d.next_deleted_movie_id()}")),
+    Scenario("DELETE", "/users/{user_id}", lambda d: RequestSpec(f"/users/{d.next_deleted_user_id()}")),
+)
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import random
+from collections import Counter
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.adapters.sqlalchemy_db import models
+
+ROOT = Path(__file__).resolve().parents[1]
+
+ADJECTIVES = (
+    "Silent", "Broken", "Golden", "Last", "Hidden", "Crimson", "Frozen", "Lost",
+    "Electric", "Midnight", "Wild", "Iron", "Paper", "Distant", "Burning", "Quiet",
+)
+NOUNS = (
+    "Harbor", "Empire", "River", "Garden", "Signal", "Kingdom", "Machine", "Horizon",
+    "Station", "Mirror", "Forest", "Winter", "Circuit", "Voyage", "Shadow", "Letter",
+)
+GENRES = ("thriller", "drama", "comedy", "documentary", "western", "romance", "sci-fi", "heist")
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    movies: int = 10_000
+    users: int = 1_000
+    favorites: int = 50_000
+    popularity_skew: float = 1.1
+    activity_sigma: float = 1.0
+    chunk_size: int = 1_000
+    seed: int = 42
+
+
+@dataclass(frozen=True)
+class SeedResult:
+    movies: int
+    users: int
+    favorites: int
+
+
+def migrate(db_uri: str) -> None:
+    os.environ["DATABASE_URI"] = db_uri
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "app/adapters/sqlalchemy_db/migrations"))
+    command.upgrade(config, "head")
+
+
+def movie_rows(config: SeedConfig, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "title": f"The {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {movie_number}",
+            "description": f"A {rng.choice(GENRES)} about the {rng.choice(ADJECTIVES).lower()} "
+                           f"{rng.choice(NOUNS).lower()}.",
+        }
+        for movie_number in range(1, config.movies + 1)
+    ]
+
+
+def user_rows(config: SeedConfig) -> list[dict]:
+    return [{"username": f"user_{user_number}"} for user_number in range(1, config.users + 1)]
+
+
+def movie_stats_rows(favorites: list[dict]) -> list[dict]:
+    counts = Counter(favorite["movie_id"] for favorite in favorites)
+    return [{"movie_id": movie_id, "favorites_count": count} for movie_id, count in sorted(counts.items())]
+
+
+def favorite_rows(config: SeedConfig, rng: random.Random) -> list[dict]:
+    """
+    Draw distinct (user, movie) pairs with realistic skew.
+
+    Movie popularity follows a Zipf law over a shuffled catalog and
+    user activity is log-normal, so a few titles and a few power
+    users account for most of the favorites. At most half of all
+    possible pairs are drawn, denser data would not be realistic anyway.
+    """
+    target = min(config.favorites, config.movies * config.users // 2)
+    if not target:
+        return []
+    movie_ids = list(range(1, config.movies + 1))
+    rng.shuffle(movie_ids)
+    movie_weights = list(accumulate(1 / rank ** config.popularity_skew for rank in range(1, config.movies + 1)))
+    user_ids = list(range(1, config.users + 1))
+    user_weights = list(accumulate(rng.lognormvariate(0, config.activity_sigma) for _ in user_ids))
+
+    pairs: set[tuple[int, int]] = set()
+    while len(pairs) < target:
+        batch = target - len(pairs)
+        users = rng.choices(user_ids, cum_weights=user_weights, k=batch)
+        movies = rng.choices(movie_ids, cum_weights=movie_weights, k=batch)
+        pairs.update(zip(users, movies))
+    return [{"user_id": user_id, "movie_id": movie_id} for user_id, movie_id in sorted(pairs)]
+
+
+async def insert_rows(db_uri: str, config: SeedConfig, rows_by_model: list[tuple[type, list[dict]]]) -> None:
+    engine = create_async_engine(db_uri)
+    async with engine.begin() as connection:
+        for model, rows in rows_by_model:
+            for start in range(0, len(rows), config.chunk_size):
+                await connection.execute(insert(model), rows[start:start + config.chunk_size])
+    await engine.dispose()
+
+
+def seed_database(db_uri: str, config: SeedConfig) -> SeedResult:
+    """
+    Create a fresh schema with alembic and fill it with generated data.
+
+    The generator is seeded, so the same config always produces the same database.
+    """
+    migrate(db_uri)
+    rng = random.Random(config.seed)
+    movies = movie_rows(config, rng)
+    users = user_rows(config)
+    favorites = favorite_rows(config, rng)
+    asyncio.run(insert_rows(db_uri, config, [
+        (models.Movie, movies),
+        (models.User, users),
+        (models.Favorite, favorites),
+        (models.MovieStats, movie_stats_rows(favorites)),
+    ]))
+    return SeedResult(movies=len(movies), users=len(users), favorites=len(favorites))
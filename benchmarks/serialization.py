@@ -0,0 +1,131 @@
+"""
+Micro-benchmark of the list endpoints serialization path.
+
+Compares the previous path of GET /movies and GET /users (ORM entities,
+`model_validate` per entity, then `response_model` validation and the
+default JSON encoder) with the current one (column rows, models built
+once, rendered by orjson) on one page of `--limit` items.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import MovieSqlaGateway, UserSqlaGateway
+from app.api.responses import ORJSONModelResponse
+from app.application.models import Movie, User
+from benchmarks.seed import SeedConfig, seed_database
+
+Render = Callable[[AsyncSession, int], Awaitable[bytes]]
+
+MOVIES_FIELD = create_model_field("response", list[Movie])
+USERS_FIELD = create_model_field("response", list[User])
+
+
+async def orm_movies(session: AsyncSession, limit: int) -> bytes:
+    result = await session.execute(select(models.Movie).order_by(models.Movie.id).limit(limit))
+    movies = [Movie.model_validate(movie) for movie in result.scalars().all()]
+    content = await serialize_response(field=MOVIES_FIELD, response_content=movies, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def row_movies(session: AsyncSession, limit: int) -> bytes:
+    movies = await MovieSqlaGateway(session).get_movies_after(None, limit)
+    return ORJSONModelResponse(movies).body
+
+
+async def orm_users(session: AsyncSession, limit: int) -> bytes:
+    result = await session.execute(
+        select(models.User).options(selectinload(models.User.favorites)).order_by(models.User.id).limit(limit)
+    )
+    users = [User.model_validate(user) for user in result.scalars().all()]
+    content = await serialize_response(field=USERS_FIELD, response_content=users, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def row_users(session: AsyncSession, limit: int) -> bytes:
+    users = await UserSqlaGateway(session).get_users_after(None, limit)
+    return ORJSONModelResponse(users).body
+
+
+PATHS: dict[str, tuple[Render, Render]] = {
+    "GET /movies": (orm_movies, row_movies),
+    "GET /users": (orm_users, row_users),
+}
+
+
+async def measure(session_maker: async_sessionmaker[AsyncSession], render: Render, limit: int, rounds: int) -> dict:
+    wall, cpu = [], []
+    for _ in range(rounds):
+        async with session_maker() as session:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            await render(session, limit)
+            wall.append(time.perf_counter() - wall_start)
+            cpu.append(time.process_time() - cpu_start)
+    return {"wall_ms": statistics.median(wall) * 1000, "cpu_ms": statistics.median(cpu) * 1000}
+
+
+async def run(db_uri: str, limit: int, rounds: int) -> dict[str, dict]:
+    engine = create_async_engine(db_uri)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    results = {}
+    for name, (before, after) in PATHS.items():
+        async with session_maker() as session:
+            if json.loads(await before(session, limit)) != json.loads(await after(session, limit)):
+                raise AssertionError(f"{name}: both paths must render the same document")
+        await measure(session_maker, before, limit, 1)
+        await measure(session_maker, after, limit, 1)
+        results[name] = {
+            "before": await measure(session_maker, before, limit, rounds),
+            "after": await measure(session_maker, after, limit, rounds),
+        }
+    await engine.dispose()
+    return results
+
+
+def format_results(results: dict[str, dict], limit: int) -> str:
+    lines = [f"{'path (limit=' + str(limit) + ')':<24}{'before cpu':>12}{'after cpu':>12}{'before wall':>13}"
+             f"{'after wall':>12}{'cpu ratio':>11}"]
+    for name, result in results.items():
+        before, after = result["before"], result["after"]
+        lines.append(
+            f"{name:<24}{before['cpu_ms']:>10.2f}ms{after['cpu_ms']:>10.2f}ms{before['wall_ms']:>11.2f}ms"
+            f"{after['wall_ms']:>10.2f}ms{before['cpu_ms'] / after['cpu_ms']:>10.1f}x"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.serialization",
+        description="Compare ORM + response_model serialization of list pages with the column rows + orjson path.",
+    )
+    parser.add_argument("--db", type=Path, default=Path("benchmark.db"), help="SQLite file to seed and query")
+    parser.add_argument("--movies", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--favorites", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=1000, help="Items per page")
+    parser.add_argument("--rounds", type=int, default=30, help="Measured pages per path")
+    args = parser.parse_args()
+
+    if args.db.exists():
+        args.db.unlink()
+    db_uri = f"sqlite+aiosqlite:///{args.db}"
+    seed_database(db_uri, SeedConfig(movies=args.movies, users=args.users, favorites=args.favorites))
+    results = asyncio.run(run(db_uri, args.limit, args.rounds))
+    print(format_results(results, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.application.models import Movie, MovieCreate, MovieUpdate, UserCreate, UserUpdate, User
-from app.application.protocols.database import UserDatabaseGateway, MovieDatabaseGateway, UoW, FavoriteDatabaseGateway
+from app.application.protocols.database import (
+    UserDatabaseGateway,
+    MovieDatabaseGateway,
+    MovieExportGateway,
+    MovieSearchGateway,
+    UoW,
+    FavoriteDatabaseGateway,
+)
+from app.application.protocols.similarity import SimilarityIndex
 from app.main import init_routers
 
 
@@ -51,6 +59,18 @@ def mock_movie_gateway() -> MovieDatabaseGateway:
     return mock
 
 
+@pytest.fixture
+def mock_movie_export_gateway() -> MovieExportGateway:
+    mock = AsyncMock(MovieExportGateway)
+    return mock
+
+
+@pytest.fixture
+def mock_movie_search_gateway() -> MovieSearchGateway:
+    mock = AsyncMock(MovieSearchGateway)
+    return mock
+
+
 @pytest.fixture
 def mock_favorite_gateway() -> FavoriteDatabaseGateway:
     mock = AsyncMock(FavoriteDatabaseGateway)
@@ -62,21 +82,35 @@ def mock_uow() -> UoW:
     uow = AsyncMock()
     uow.commit = AsyncMock()
     uow.flush = AsyncMock()
+    uow.rollback = AsyncMock()
     return uow
 
 
+@pytest.fixture
+def mock_similarity_index() -> SimilarityIndex:
+    mock = Mock(SimilarityIndex)
+    mock.neighbors.return_value = []
+    return mock
+
+
 @pytest.fixture
 def client(
         mock_user_gateway: AsyncMock,
         mock_movie_gateway: AsyncMock,
+        mock_movie_export_gateway: AsyncMock,
+        mock_movie_search_gateway: AsyncMock,
         mock_favorite_gateway: AsyncMock,
-        mock_uow: AsyncMock
+        mock_uow: AsyncMock,
+        mock_similarity_index: Mock,
 ) -> TestClient:
     app = FastAPI()
     init_routers(app)
     app.dependency_overrides[UserDatabaseGateway] = lambda: mock_user_gateway
     app.dependency_overrides[MovieDatabaseGateway] = lambda: mock_movie_gateway
+    app.dependency_overrides[MovieExportGateway] = lambda: mock_movie_export_gateway
+    app.dependency_overrides[MovieSearchGateway] = lambda: mock_movie_search_gateway
     app.dependency_overrides[FavoriteDatabaseGateway] = lambda: mock_favorite_gateway
     app.dependency_overrides[UoW] = lambda: mock_uow
+    app.dependency_overrides[SimilarityIndex] = lambda: mock_similarity_index
 
     return TestClient(app)
@@ -0,0 +1,31 @@
+from collections import Counter
+
+from fastapi import FastAPI
+
+from app.main import init_routers
+from benchmarks.driver import uncovered_routes
+from benchmarks.report import percentile, summarize
+
+
+def test_every_route_has_a_scenario() -> None:
+    app = FastAPI()
+    init_routers(app)
+
+    assert uncovered_routes(app) == []
+
+
+def test_percentile_interpolates() -> None:
+    values = [1.0, 2.0, 3.0, 4.0]
+
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 99) == 0.0
+
+
+def test_summarize_counts_server_errors() -> None:
+    summary = summarize([0.001, 0.002, 0.003], Counter({200: 1, 404: 1, 500: 1}), wall_time=0.5)
+
+    assert summary["requests"] == 3
+    assert summary["errors"] == 1
+    assert summary["throughput_rps"] == 6.0
+    assert summary["latency_ms"]["p50"] == 2.0
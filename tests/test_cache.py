@@ -0,0 +1,435 @@
+import asyncio
+from typing import Callable
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.adapters.cache import (
+    TTLCount,
+    TTLLRUCache,
+    CachedMovieGateway,
+    CachedUserGateway,
+    CachedFavoriteGateway,
+    SingleFlight,
+)
+from app.application.models import (
+    FavoritesInclude,
+    Movie,
+    MovieCreate,
+    MovieUpdate,
+    User,
+    UserCreate,
+    UserUpdate,
+    UserWithFavoriteIds,
+)
+from app.application.models.favorite import AddFavoriteResult
+from app.application.protocols.database import CommitHooks
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CommitHooksStub(CommitHooks):
+    """
+    Hooks of a transaction the test commits by hand.
+    """
+
+    def __init__(self) -> None:
+        self.callbacks: list[Callable[[], None]] = []
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self.callbacks.append(callback)
+
+    def commit(self) -> None:
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def rollback(self) -> None:
+        self.callbacks.clear()
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = TTLLRUCache(max_size=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+    cache.set(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    stats = cache.stats()
+    assert (stats.size, stats.hits, stats.misses, stats.evictions) == (2, 3, 1, 1)
+
+
+def test_cache_expires_entries() -> None:
+    clock = FakeClock()
+    cache = TTLLRUCache(max_size=10, ttl=5, clock=clock)
+    cache.set(1, "a")
+    clock.now = 5
+
+    assert cache.get(1) is None
+    assert cache.stats().expirations == 1
+
+
+def test_cache_skips_sets_after_invalidation() -> None:
+    cache = TTLLRUCache(max_size=10, ttl=60)
+    generation = cache.generation()
+    cache.invalidate(1)
+
+    cache.set(1, "stale", generation)
+    assert cache.get(1) is None
+    cache.set(1, "fresh", cache.generation())
+    assert cache.get(1) == "fresh"
+
+
+def test_cache_disabled_with_zero_size() -> None:
+    cache = TTLLRUCache(max_size=0, ttl=5)
+    cache.set(1, "a")
+
+    assert cache.get(1) is None
+    assert cache.stats().size == 0
+
+
+async def test_cached_movie_gateway_reads_through(
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    mock_movie_gateway.get_movie_by_id.return_value = sample_movie
+    gateway = CachedMovieGateway(
+        mock_movie_gateway, TTLLRUCache(10, 60), TTLLRUCache(10, 60), SingleFlight(), SingleFlight(), TTLCount(60),
+        CommitHooksStub(),
+    )
+
+    assert await gateway.get_movie_by_id(sample_movie.id) == sample_movie
+    assert await gateway.get_movie_by_id(sample_movie.id) == sample_movie
+    mock_movie_gateway.get_movie_by_id.assert_awaited_once_with(sample_movie.id)
+
+
+async def test_cached_movie_gateway_invalidates_on_update(
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie,
+        sample_movie_update: MovieUpdate,
+        sample_user: User
+) -> None:
+    movie_cache, user_cache = TTLLRUCache(10, 60), TTLLRUCache(10, 60)
+    movie_cache.set(sample_movie.id, sample_movie)
+    user_cache.set(sample_user.id, sample_user)
+    gateway = CachedMovieGateway(
+        mock_movie_gateway, movie_cache, user_cache, SingleFlight(), SingleFlight(), TTLCount(60),
+        CommitHooksStub(),
+    )
+
+    await gateway.update_movie(sample_movie.id, sample_movie_update)
+    assert movie_cache.get(sample_movie.id) is None
+    assert user_cache.get(sample_user.id) is None
+
+
+async def test_cached_movie_gateway_drops_rows_cached_before_commit(
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie,
+        sample_movie_update: MovieUpdate
+) -> None:
+    movie_cache = TTLLRUCache(10, 60)
+    commit_hooks = CommitHooksStub()
+    gateway = CachedMovieGateway(
+        mock_movie_gateway, movie_cache, TTLLRUCache(10, 60), SingleFlight(), SingleFlight(), TTLCount(60),
+        commit_hooks,
+    )
+
+    await gateway.update_movie(sample_movie.id, sample_movie_update)
+    # a concurrent request reads the row still committed before the update
+    movie_cache.set(sample_movie.id, sample_movie)
+    commit_hooks.commit()
+    assert movie_cache.get(sample_movie.id) is None
+
+
+async def test_load_overlapping_a_commit_is_not_cached(
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie,
+        sample_movie_update: MovieUpdate
+) -> None:
+    release = asyncio.Event()
+    updated = sample_movie.model_copy(update={"title": "new", "version": 2})
+
+    async def get_movie_by_id(movie_id: int) -> Movie:
+        await release.wait()
+        return sample_movie
+
+    mock_movie_gateway.get_movie_by_id.side_effect = get_movie_by_id
+    commit_hooks = CommitHooksStub()
+    gateway = CachedMovieGateway(
+        mock_movie_gateway, TTLLRUCache(10, 60), TTLLRUCache(10, 60), SingleFlight(), SingleFlight(), TTLCount(60),
+        commit_hooks,
+    )
+
+    load = asyncio.create_task(gateway.get_movie_by_id(sample_movie.id))
+    await asyncio.sleep(0)
+    await gateway.update_movie(sample_movie.id, sample_movie_update)
+    commit_hooks.commit()
+    release.set()
+    assert await load == sample_movie
+
+    mock_movie_gateway.get_movie_by_id.side_effect = None
+    mock_movie_gateway.get_movie_by_id.return_value = updated
+    assert await gateway.get_movie_by_id(sample_movie.id) == updated
+
+
+async def test_cached_user_gateway_invalidates_on_update(
+        mock_user_gateway: AsyncMock,
+        sample_user: User,
+        sample_user_update: UserUpdate
+) -> None:
+    mock_user_gateway.get_user_by_id.return_value = sample_user
+    user_cache = TTLLRUCache(10, 60)
+    gateway = CachedUserGateway(mock_user_gateway, user_cache, SingleFlight(), TTLCount(60), CommitHooksStub())
+
+    await gateway.get_user_by_id(sample_user.id)
+    await gateway.update_user(sample_user.id, sample_user_update)
+    await gateway.get_user_by_id(sample_user.id)
+    assert mock_user_gateway.get_user_by_id.await_count == 2
+
+
+async def test_cached_favorite_gateway_invalidates_user(
+        mock_favorite_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    mock_favorite_gateway.add_favorite_movie.return_value = AddFavoriteResult.ADDED
+    user_cache = TTLLRUCache(10, 60)
+    user_cache.set(sample_user.id, sample_user)
+    gateway = CachedFavoriteGateway(mock_favorite_gateway, user_cache, SingleFlight(), CommitHooksStub())
+
+    await gateway.add_favorite_movie(sample_user.id, 1)
+    assert user_cache.get(sample_user.id) is None
+
+
+async def test_single_flight_shares_one_load() -> None:
+    flights = SingleFlight()
+    release = asyncio.Event()
+    loads = 0
+
+    async def load() -> str:
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return "movie"
+
+    callers = [asyncio.create_task(flights.run(1, load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flights.stats().in_flight == 1
+    release.set()
+
+    assert await asyncio.gather(*callers) == ["movie"] * 5
+    assert loads == 1
+    assert flights.stats().model_dump() == {"in_flight": 0, "queries": 1, "coalesced": 4}
+
+
+async def test_single_flight_shares_errors() -> None:
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def load() -> str:
+        await release.wait()
+        raise LookupError("gone")
+
+    callers = [asyncio.create_task(flights.run(1, load)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert [str(result) for result in results] == ["gone", "gone"]
+    assert flights.stats().in_flight == 0
+
+
+async def test_single_flight_retries_when_leader_is_cancelled() -> None:
+    flights = SingleFlight()
+    release = asyncio.Event()
+    loads = 0
+
+    async def load() -> int:
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return loads
+
+    leader = asyncio.create_task(flights.run(1, load))
+    follower = asyncio.create_task(flights.run(1, load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert await follower == 2
+    assert flights.stats().coalesced == 0
+
+
+async def test_cached_user_gateway_coalesces_concurrent_misses(
+        mock_user_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    release = asyncio.Event()
+
+    async def get_user_by_id(user_id: int) -> User:
+        await release.wait()
+        return sample_user
+
+    mock_user_gateway.get_user_by_id.side_effect = get_user_by_id
+    user_flights = SingleFlight()
+    gateways = [
+        CachedUserGateway(mock_user_gateway, TTLLRUCache(10, 60), user_flights, TTLCount(60), CommitHooksStub())
+        for _ in range(3)
+    ]
+
+    callers = [asyncio.create_task(gateway.get_user_by_id(sample_user.id)) for gateway in gateways]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*callers) == [sample_user] * 3
+    mock_user_gateway.get_user_by_id.assert_awaited_once_with(sample_user.id)
+
+
+async def test_write_forgets_flights_in_progress(
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie,
+        sample_movie_update: MovieUpdate
+) -> None:
+    release = asyncio.Event()
+
+    async def get_movies(skip: int, limit: int) -> list[Movie]:
+        await release.wait()
+        return [sample_movie]
+
+    mock_movie_gateway.get_movies.side_effect = get_movies
+    gateway = CachedMovieGateway(
+        mock_movie_gateway, TTLLRUCache(10, 60), TTLLRUCache(10, 60), SingleFlight(), SingleFlight(), TTLCount(60),
+        CommitHooksStub(),
+    )
+
+    before_write = asyncio.create_task(gateway.get_movies(0, 10))
+    await asyncio.sleep(0)
+    await gateway.update_movie(sample_movie.id, sample_movie_update)
+    after_write = asyncio.create_task(gateway.get_movies(0, 10))
+    await asyncio.sleep(0)
+    release.set()
+
+    await asyncio.gather(before_write, after_write)
+    assert mock_movie_gateway.get_movies.await_count == 2
+
+
+async def test_commit_forgets_flights_started_before_it(
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie,
+        sample_movie_update: MovieUpdate
+) -> None:
+    release = asyncio.Event()
+
+    async def get_movies(skip: int, limit: int) -> list[Movie]:
+        await release.wait()
+        return [sample_movie]
+
+    mock_movie_gateway.get_movies.side_effect = get_movies
+    commit_hooks = CommitHooksStub()
+    gateway = CachedMovieGateway(
+        mock_movie_gateway, TTLLRUCache(10, 60), TTLLRUCache(10, 60), SingleFlight(), SingleFlight(), TTLCount(60),
+        commit_hooks,
+    )
+
+    await gateway.update_movie(sample_movie.id, sample_movie_update)
+    before_commit = asyncio.create_task(gateway.get_movies(0, 10))
+    await asyncio.sleep(0)
+    commit_hooks.commit()
+    after_commit = asyncio.create_task(gateway.get_movies(0, 10))
+    await asyncio.sleep(0)
+    release.set()
+
+    await asyncio.gather(before_commit, after_commit)
+    assert mock_movie_gateway.get_movies.await_count == 2
+
+
+async def test_cached_user_gateway_reads_only_missing_ids(
+        mock_user_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    other_user = UserWithFavoriteIds(id=2, username="other", favorite_ids=[])
+    mock_user_gateway.get_users_by_ids.return_value = [other_user]
+    user_cache = TTLLRUCache(10, 60)
+    user_cache.set(sample_user.id, sample_user)
+    gateway = CachedUserGateway(mock_user_gateway, user_cache, SingleFlight(), TTLCount(60), CommitHooksStub())
+
+    users = await gateway.get_users_by_ids([2, sample_user.id, 3], FavoritesInclude.IDS)
+
+    assert [user.id for user in users] == [2, sample_user.id]
+    assert users[1].favorite_ids == [1917]
+    mock_user_gateway.get_users_by_ids.assert_awaited_once_with([2, 3], FavoritesInclude.IDS)
+    assert user_cache.get(2) is None
+
+
+def test_count_expires() -> None:
+    clock = FakeClock()
+    count = TTLCount(ttl=60, clock=clock)
+    count.add(1)
+    assert count.get() is None
+
+    count.set(10)
+    count.add(2)
+    count.add(-1)
+    assert count.get() == 11
+    clock.now = 60
+    assert count.get() is None
+
+
+async def test_cached_movie_gateway_counts_with_deltas(
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie,
+        sample_movie_create: MovieCreate
+) -> None:
+    mock_movie_gateway.count_movies.return_value = 5
+    mock_movie_gateway.add_movies.return_value = [sample_movie, sample_movie]
+    mock_movie_gateway.delete_movie_by_id.side_effect = [sample_movie, None]
+    commit_hooks = CommitHooksStub()
+    gateway = CachedMovieGateway(
+        mock_movie_gateway, TTLLRUCache(10, 60), TTLLRUCache(10, 60), SingleFlight(), SingleFlight(), TTLCount(60),
+        commit_hooks,
+    )
+
+    assert await gateway.count_movies() == 5
+    await gateway.add_movies([sample_movie_create] * 2)
+    commit_hooks.rollback()
+    await gateway.add_movies([sample_movie_create] * 2)
+    await gateway.delete_movie_by_id(sample_movie.id)
+    await gateway.delete_movie_by_id(sample_movie.id)
+    assert await gateway.count_movies() == 5
+    commit_hooks.commit()
+    assert await gateway.count_movies() == 6
+    mock_movie_gateway.count_movies.assert_awaited_once_with(exact=True)
+
+    assert await gateway.count_movies(exact=True) == 5
+    assert await gateway.count_movies() == 5
+    assert mock_movie_gateway.count_movies.await_count == 2
+
+
+async def test_cached_user_gateway_counts_only_added_users(
+        mock_user_gateway: AsyncMock,
+        sample_user: User,
+        sample_user_create: UserCreate
+) -> None:
+    mock_user_gateway.count_users.return_value = 1
+    mock_user_gateway.add_user.side_effect = [sample_user, None]
+    commit_hooks = CommitHooksStub()
+    gateway = CachedUserGateway(
+        mock_user_gateway, TTLLRUCache(10, 60), SingleFlight(), TTLCount(60), commit_hooks,
+    )
+
+    await gateway.count_users()
+    await gateway.add_user(sample_user_create)
+    await gateway.add_user(sample_user_create)
+    commit_hooks.commit()
+    assert await gateway.count_users() == 2
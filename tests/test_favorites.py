@@ -2,7 +2,9 @@ from unittest.mock import AsyncMock
 
 from starlette.testclient import TestClient
 
+from app.application.cursor import encode_cursor
 from app.application.models import User, Movie
+from app.application.models.favorite import AddFavoriteResult
 
 
 def test_add_to_favorites_success(
@@ -13,23 +15,22 @@ def test_add_to_favorites_success(
         sample_user: User,
         sample_movie: Movie
 ) -> None:
-    mock_user_gateway.get_user_by_id.return_value = sample_user
-    mock_movie_gateway.get_movie_by_id.return_value = sample_movie
-    mock_favorite_gateway.add_favorite_movie.return_value = None
+    mock_favorite_gateway.add_favorite_movie.return_value = AddFavoriteResult.ADDED
 
     response = client.post(f"/users/{sample_user.id}/favorites/{sample_movie.id}")
+    mock_favorite_gateway.add_favorite_movie.assert_awaited_once_with(sample_user.id, sample_movie.id)
+    mock_user_gateway.get_user_by_id.assert_not_awaited()
+    mock_movie_gateway.get_movie_by_id.assert_not_awaited()
     assert response.status_code == 200
     assert response.json()["detail"] == "Movie added to favorites"
 
 
 def test_add_to_favorites_user_not_found(
         client: TestClient,
-        mock_user_gateway: AsyncMock,
-        mock_movie_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
         sample_movie: Movie
 ) -> None:
-    mock_user_gateway.get_user_by_id.return_value = None
-    mock_movie_gateway.get_movie_by_id.return_value = sample_movie
+    mock_favorite_gateway.add_favorite_movie.return_value = AddFavoriteResult.USER_NOT_FOUND
 
     response = client.post(f"/users/999/favorites/{sample_movie.id}")
     assert response.status_code == 404
@@ -38,12 +39,10 @@ def test_add_to_favorites_user_not_found(
 
 def test_add_to_favorites_movie_not_found(
         client: TestClient,
-        mock_user_gateway: AsyncMock,
-        mock_movie_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
         sample_user: User
 ) -> None:
-    mock_user_gateway.get_user_by_id.return_value = sample_user
-    mock_movie_gateway.get_movie_by_id.return_value = None
+    mock_favorite_gateway.add_favorite_movie.return_value = AddFavoriteResult.MOVIE_NOT_FOUND
 
     response = client.post(f"/users/{sample_user.id}/favorites/999")
     assert response.status_code == 404
@@ -52,13 +51,10 @@ def test_add_to_favorites_movie_not_found(
 
 def test_add_to_favorites_movie_already_exists(
         client: TestClient,
-        mock_user_gateway: AsyncMock,
-        mock_movie_gateway: AsyncMock,
         mock_favorite_gateway: AsyncMock,
         sample_user: User,
 ) -> None:
-    mock_user_gateway.get_user_by_id.return_value = sample_user
-    mock_movie_gateway.get_movie_by_id.return_value = sample_user.favorites[0]
+    mock_favorite_gateway.add_favorite_movie.return_value = AddFavoriteResult.ALREADY_PRESENT
 
     response = client.post(f"/users/{sample_user.id}/favorites/{sample_user.favorites[0].id}")
     assert response.status_code == 409
@@ -110,22 +106,56 @@ def test_delete_from_favorites_movie_not_in_favorites(
 def test_get_user_favorites_success(
         client: TestClient,
         mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
         sample_user: User
 ) -> None:
-    mock_user_gateway.get_user_by_id.return_value = sample_user
+    mock_favorite_gateway.get_favorites.return_value = sample_user.favorites
 
     response = client.get(f"/users/{sample_user.id}/favorites")
+    mock_favorite_gateway.get_favorites.assert_awaited_once_with(sample_user.id, None, 100)
+    mock_user_gateway.get_user_by_id.assert_not_awaited()
+    mock_user_gateway.user_exists.assert_not_awaited()
     assert response.status_code == 200
     assert response.json() == [sample_user.favorites[0].model_dump()]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_user_favorites_next_page(
+        client: TestClient,
+        mock_favorite_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    mock_favorite_gateway.get_favorites.return_value = sample_user.favorites
+
+    response = client.get(f"/users/{sample_user.id}/favorites?limit=1&cursor={encode_cursor(5)}")
+    mock_favorite_gateway.get_favorites.assert_awaited_once_with(sample_user.id, 5, 1)
+    assert response.status_code == 200
+    assert response.headers["X-Next-Cursor"] == encode_cursor(sample_user.favorites[0].id)
+
+
+def test_get_user_favorites_not_modified(
+        client: TestClient,
+        mock_favorite_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    mock_favorite_gateway.get_favorites.return_value = sample_user.favorites
+    etag = client.get(f"/users/{sample_user.id}/favorites").headers["ETag"]
+
+    response = client.get(f"/users/{sample_user.id}/favorites", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
 
 
 def test_get_user_favorites_user_not_found(
         client: TestClient,
-        mock_user_gateway: AsyncMock
+        mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock
 ) -> None:
-    mock_user_gateway.get_user_by_id.return_value = None
+    mock_favorite_gateway.get_favorites.return_value = []
+    mock_user_gateway.user_exists.return_value = False
 
     response = client.get("/users/999/favorites")
+    mock_user_gateway.user_exists.assert_awaited_once_with(999)
     assert response.status_code == 404
     assert response.json()["detail"] == "User not found for specified user_id."
 
@@ -133,11 +163,105 @@ def test_get_user_favorites_user_not_found(
 def test_get_user_favorites_no_movies(
         client: TestClient,
         mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
         sample_user: User
 ) -> None:
-    sample_user.favorites = []
-    mock_user_gateway.get_user_by_id.return_value = sample_user
+    mock_favorite_gateway.get_favorites.return_value = []
+    mock_user_gateway.user_exists.return_value = True
 
     response = client.get(f"/users/{sample_user.id}/favorites")
     assert response.status_code == 200
     assert response.json() == []
+
+
+def test_replace_favorites_applies_difference(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
+        mock_uow: AsyncMock,
+) -> None:
+    mock_user_gateway.user_exists.return_value = True
+    mock_favorite_gateway.get_favorite_ids.return_value = [1, 2, 3]
+    mock_favorite_gateway.add_favorite_movies.return_value = []
+
+    response = client.put("/users/1/favorites", json={"movie_ids": [5, 3, 4, 3]})
+    mock_favorite_gateway.add_favorite_movies.assert_awaited_once_with(1, [4, 5])
+    mock_favorite_gateway.delete_favorite_movies.assert_awaited_once_with(1, [1, 2])
+    mock_uow.commit.assert_awaited_once()
+    assert response.status_code == 200
+    assert response.json() == {"added": [4, 5], "removed": [1, 2]}
+
+
+def test_replace_favorites_movie_not_found(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
+        mock_uow: AsyncMock,
+) -> None:
+    mock_user_gateway.user_exists.return_value = True
+    mock_favorite_gateway.get_favorite_ids.return_value = []
+    mock_favorite_gateway.add_favorite_movies.return_value = [998, 999]
+
+    response = client.put("/users/1/favorites", json={"movie_ids": [1, 998, 999]})
+    mock_favorite_gateway.delete_favorite_movies.assert_not_awaited()
+    mock_uow.rollback.assert_awaited_once()
+    mock_uow.commit.assert_not_awaited()
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Movies not found for specified movie_ids: 998, 999."
+
+
+def test_replace_favorites_user_not_found(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
+) -> None:
+    mock_user_gateway.user_exists.return_value = False
+
+    response = client.put("/users/999/favorites", json={"movie_ids": [1]})
+    mock_favorite_gateway.add_favorite_movies.assert_not_awaited()
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found for specified user_id."
+
+
+def test_replace_favorites_user_deleted_meanwhile(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
+        mock_uow: AsyncMock,
+) -> None:
+    mock_user_gateway.user_exists.return_value = True
+    mock_favorite_gateway.get_favorite_ids.return_value = []
+    mock_favorite_gateway.add_favorite_movies.return_value = None
+
+    response = client.put("/users/1/favorites", json={"movie_ids": [1]})
+    mock_favorite_gateway.delete_favorite_movies.assert_not_awaited()
+    mock_uow.commit.assert_not_awaited()
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found for specified user_id."
+
+
+def test_patch_favorites_reports_actual_changes(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
+        mock_uow: AsyncMock,
+) -> None:
+    mock_user_gateway.user_exists.return_value = True
+    mock_favorite_gateway.get_favorite_ids.return_value = [1, 2]
+    mock_favorite_gateway.add_favorite_movies.return_value = []
+
+    response = client.patch("/users/1/favorites", json={"add": [2, 3], "remove": [1, 4]})
+    mock_favorite_gateway.add_favorite_movies.assert_awaited_once_with(1, [3])
+    mock_favorite_gateway.delete_favorite_movies.assert_awaited_once_with(1, [1])
+    mock_uow.commit.assert_awaited_once()
+    assert response.status_code == 200
+    assert response.json() == {"added": [3], "removed": [1]}
+
+
+def test_patch_favorites_rejects_overlap(
+        client: TestClient,
+        mock_favorite_gateway: AsyncMock,
+) -> None:
+    response = client.patch("/users/1/favorites", json={"add": [1, 2], "remove": [2]})
+    mock_favorite_gateway.get_favorite_ids.assert_not_awaited()
+    assert response.status_code == 422
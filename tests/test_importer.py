@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.sqlalchemy_db import models
+from app.main.config import DatabaseSettings
+from app.main.di import create_engine, create_session_maker
+from app.main.importer import Checkpoint, InvalidRecordError, import_file
+
+
+@pytest.fixture
+async def session_maker(tmp_path: Path) -> async_sessionmaker[AsyncSession]:
+    engine = create_engine(DatabaseSettings(uri=f"sqlite+aiosqlite:///{tmp_path / 'import.db'}", instrument=False))
+    async with engine.begin() as connection:
+        await connection.run_sync(models.Base.metadata.create_all)
+    yield create_session_maker(engine)
+    await engine.dispose()
+
+
+async def run_import(
+        session_maker: async_sessionmaker[AsyncSession],
+        entity: str,
+        source: Path,
+        file_format: str,
+        chunk_size: int = 2,
+):
+    checkpoint = Checkpoint.load(source.with_name(source.name + ".checkpoint"), entity, source)
+    return await import_file(session_maker, entity, source, file_format, chunk_size, checkpoint)
+
+
+async def count(session_maker: async_sessionmaker[AsyncSession], column) -> int:
+    async with session_maker() as session:
+        return await session.scalar(select(func.coalesce(func.sum(column), 0)))
+
+
+async def test_import_movies_and_users(session_maker: async_sessionmaker[AsyncSession], tmp_path: Path) -> None:
+    movies = tmp_path / "movies.csv"
+    movies.write_text("title,description\nHeat,\nAlien,A crew meets a creature\nBrazil,Satire\n")
+    users = tmp_path / "users.jsonl"
+    users.write_text('{"username": "ann"}\n\n{"username": "bob"}\n{"username": "ann"}\n')
+
+    movie_progress = await run_import(session_maker, "movies", movies, "csv")
+    user_progress = await run_import(session_maker, "users", users, "jsonl")
+
+    assert (movie_progress.records, movie_progress.inserted, movie_progress.skipped) == (3, 3, 0)
+    assert (user_progress.records, user_progress.inserted, user_progress.skipped) == (3, 2, 1)
+    async with session_maker() as session:
+        result = await session.execute(select(models.Movie.title, models.Movie.description).order_by(models.Movie.id))
+        assert result.all() == [("Heat", None), ("Alien", "A crew meets a creature"), ("Brazil", "Satire")]
+    assert not (tmp_path / "movies.csv.checkpoint").exists()
+
+
+async def test_failed_import_resumes_from_checkpoint(
+        session_maker: async_sessionmaker[AsyncSession],
+        tmp_path: Path,
+) -> None:
+    movies = tmp_path / "movies.jsonl"
+    movies.write_text("".join(f'{{"id": {movie_id}, "title": "Movie {movie_id}"}}\n' for movie_id in (1, 2)))
+    users = tmp_path / "users.csv"
+    users.write_text("id,username\n1,ann\n2,bob\n")
+    await run_import(session_maker, "movies", movies, "jsonl")
+    await run_import(session_maker, "users", users, "csv")
+    favorites = tmp_path / "favorites.csv"
+    favorites.write_text("user_id,movie_id\n1,1\n1,2\n2,1\n2,99\n")
+
+    with pytest.raises(IntegrityError):
+        await run_import(session_maker, "favorites", favorites, "csv")
+    checkpoint = Checkpoint.load(tmp_path / "favorites.csv.checkpoint", "favorites", favorites)
+    assert checkpoint.resumed_from == 2
+
+    favorites.write_text("user_id,movie_id\n1,1\n1,2\n2,1\n2,2\n")
+    progress = await run_import(session_maker, "favorites", favorites, "csv")
+    assert (progress.records, progress.inserted) == (4, 4)
+    assert await count(session_maker, models.MovieStats.favorites_count) == 4
+
+
+async def test_invalid_record_is_reported(session_maker: async_sessionmaker[AsyncSession], tmp_path: Path) -> None:
+    favorites = tmp_path / "favorites.csv"
+    favorites.write_text("user_id,movie_id\n1,\n")
+
+    with pytest.raises(InvalidRecordError, match="record 1: movie_id is missing"):
+        await run_import(session_maker, "favorites", favorites, "csv")
+
+
+async def test_jsonl_record_must_be_an_object(
+        session_maker: async_sessionmaker[AsyncSession],
+        tmp_path: Path
+) -> None:
+    movies = tmp_path / "movies.jsonl"
+    movies.write_text('{"title": "Heat"}\n[1, "Alien"]\n')
+
+    with pytest.raises(InvalidRecordError, match="record 2: expected a JSON object, got list"):
+        await run_import(session_maker, "movies", movies, "jsonl")
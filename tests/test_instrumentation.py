@@ -0,0 +1,87 @@
+import logging
+from typing import AsyncIterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.adapters.sqlalchemy_db.instrumentation import QueryStats, instrument_engine, query_stats
+from app.main.middleware import ServerTimingMiddleware
+from app.main.web import configure_logging
+
+
+@pytest.fixture
+async def engine() -> AsyncIterator[AsyncEngine]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+    yield engine
+    await engine.dispose()
+
+
+async def test_instrumented_engine_counts_queries(engine: AsyncEngine) -> None:
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            await connection.execute(text("SELECT 2"))
+    finally:
+        query_stats.reset(token)
+
+    assert stats.count == 2
+    assert stats.duration > 0
+
+
+async def test_instrumented_engine_ignores_queries_outside_requests(engine: AsyncEngine) -> None:
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+    assert query_stats.get() is None
+
+
+def test_server_timing_header() -> None:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.get("/")
+    async def index() -> dict:
+        stats = query_stats.get()
+        stats.count += 3
+        stats.duration += 0.0125
+        return {}
+
+    response = TestClient(app).get("/")
+    server_timing = response.headers["Server-Timing"]
+    assert server_timing.startswith('db;desc="3 queries";dur=12.50, app;dur=')
+
+
+def test_access_log_line(caplog: pytest.LogCaptureFixture) -> None:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.get("/movies/")
+    async def movies() -> list:
+        return []
+
+    with caplog.at_level(logging.INFO, logger="app.access"):
+        TestClient(app).get("/movies/")
+
+    record, = [record for record in caplog.records if record.name == "app.access"]
+    assert record.levelno == logging.INFO
+    assert record.getMessage().startswith("method=GET path=/movies/ status=200 duration_ms=")
+
+
+def test_configure_logging_enables_app_info(monkeypatch: pytest.MonkeyPatch) -> None:
+    logger = logging.getLogger("app")
+    monkeypatch.setattr(logging.getLogger(), "handlers", [])
+    monkeypatch.setattr(logger, "handlers", [])
+
+    try:
+        configure_logging()
+        assert logging.getLogger("app.access").isEnabledFor(logging.INFO)
+        handler, = logger.handlers
+        assert isinstance(handler, logging.StreamHandler)
+    finally:
+        logger.setLevel(logging.NOTSET)
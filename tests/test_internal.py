@@ -0,0 +1,49 @@
+from unittest.mock import Mock
+
+from fastapi.testclient import TestClient
+
+from app.adapters.cache import SingleFlight, TTLLRUCache
+from app.api.depends_stub import Stub
+from app.application.models.pool import PoolStats
+from app.application.protocols.cache import EntityCache
+from app.application.protocols.coalescing import RequestCoalescer
+from app.application.protocols.pool import PoolMonitor
+
+
+def test_get_cache_stats(client: TestClient) -> None:
+    movie_cache, user_cache = TTLLRUCache(10, 60), TTLLRUCache(20, 60)
+    movie_cache.get(1)
+    client.app.dependency_overrides[Stub(EntityCache, entity="movie")] = lambda: movie_cache
+    client.app.dependency_overrides[Stub(EntityCache, entity="user")] = lambda: user_cache
+
+    response = client.get("/internal/cache")
+    assert response.status_code == 200
+    assert response.json()["movies"]["misses"] == 1
+    assert response.json()["users"]["max_size"] == 20
+
+
+async def test_get_coalescing_stats(client: TestClient) -> None:
+    movie_flights, user_flights = SingleFlight(), SingleFlight()
+
+    async def load() -> None:
+        return None
+
+    await movie_flights.run(1, load)
+    client.app.dependency_overrides[Stub(RequestCoalescer, entity="movie")] = lambda: movie_flights
+    client.app.dependency_overrides[Stub(RequestCoalescer, entity="user")] = lambda: user_flights
+
+    response = client.get("/internal/coalescing")
+    assert response.status_code == 200
+    assert response.json()["movies"] == {"in_flight": 0, "queries": 1, "coalesced": 0}
+    assert response.json()["users"]["queries"] == 0
+
+
+def test_get_pool_stats(client: TestClient) -> None:
+    pool_stats = PoolStats(pool_class="InstrumentedQueuePool", size=5, checked_out=2, checkouts=10)
+    pool_monitor = Mock(PoolMonitor)
+    pool_monitor.stats.return_value = pool_stats
+    client.app.dependency_overrides[PoolMonitor] = lambda: pool_monitor
+
+    response = client.get("/internal/pool")
+    assert response.status_code == 200
+    assert response.json() == pool_stats.model_dump()
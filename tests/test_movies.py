@@ -1,9 +1,12 @@
-from unittest.mock import AsyncMock
+import json
+from typing import AsyncIterator
+from unittest.mock import AsyncMock, Mock
 
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from app.application.models import Movie, MovieCreate, MovieUpdate
+from app.application.cursor import encode_cursor
+from app.application.models import Movie, MovieCreate, MovieUpdate, PopularMovie
 
 
 def test_create_new_movie(
@@ -19,6 +22,22 @@ def test_create_new_movie(
     assert response.json() == sample_movie.model_dump()
 
 
+def test_create_new_movies(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        mock_uow: AsyncMock,
+        sample_movie: Movie,
+        sample_movie_create: MovieCreate
+) -> None:
+    mock_movie_gateway.add_movies.return_value = [sample_movie, sample_movie]
+
+    response = client.post("/movies/bulk", json=[sample_movie_create.model_dump()] * 2)
+    mock_movie_gateway.add_movies.assert_awaited_once_with([sample_movie_create] * 2)
+    mock_uow.commit.assert_awaited_once()
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [sample_movie.model_dump()] * 2
+
+
 def test_get_movies(
         client: TestClient,
         mock_movie_gateway: AsyncMock,
@@ -44,6 +63,174 @@ def test_get_movies_empty(
     assert response.json() == []
 
 
+def test_get_movies_full_page_returns_next_cursor(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    mock_movie_gateway.get_movies.return_value = [sample_movie]
+
+    response = client.get("/movies/?limit=1")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Next-Cursor"] == encode_cursor(sample_movie.id)
+
+
+def test_get_movies_total_count(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    mock_movie_gateway.get_movies.return_value = [sample_movie]
+    mock_movie_gateway.count_movies.return_value = 42
+
+    response = client.get("/movies/?total=true")
+    mock_movie_gateway.count_movies.assert_awaited_once_with(False)
+    assert response.headers["X-Total-Count"] == "42"
+
+    response = client.get("/movies/?exact=true")
+    mock_movie_gateway.count_movies.assert_awaited_with(True)
+    assert response.headers["X-Total-Count"] == "42"
+
+
+def test_get_movies_without_total(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    mock_movie_gateway.get_movies.return_value = [sample_movie]
+
+    response = client.get("/movies/")
+    mock_movie_gateway.count_movies.assert_not_awaited()
+    assert "X-Total-Count" not in response.headers
+
+
+def test_get_movies_by_cursor(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    mock_movie_gateway.get_movies_after.return_value = [sample_movie]
+
+    response = client.get(f"/movies/?cursor={encode_cursor(100)}&limit=5")
+    mock_movie_gateway.get_movies_after.assert_awaited_once_with(100, 5)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [sample_movie.model_dump()]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_movies_by_ids(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    other_movie = Movie(id=7, title="Other Movie")
+    mock_movie_gateway.get_movies_by_ids.return_value = [other_movie, sample_movie]
+
+    response = client.get(f"/movies/?ids=7,404,{sample_movie.id},7&limit=1")
+    mock_movie_gateway.get_movies_by_ids.assert_awaited_once_with([7, 404, sample_movie.id])
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [other_movie.model_dump(), sample_movie.model_dump()]
+    assert response.headers["X-Missing-Ids"] == "404"
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_movies_by_invalid_ids(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock
+) -> None:
+    for query in ("ids=1,two", "ids=", f"ids={','.join(map(str, range(1001)))}"):
+        response = client.get(f"/movies/?{query}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "Ids must be 1 to 1000 comma separated integers."
+    response = client.get("/movies/?ids=1&skip=5")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Ids can not be combined with skip or cursor."
+    mock_movie_gateway.get_movies_by_ids.assert_not_awaited()
+
+
+def test_get_movies_invalid_cursor(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock
+) -> None:
+    response = client.get("/movies/?cursor=not-a-cursor")
+    mock_movie_gateway.get_movies_after.assert_not_awaited()
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Invalid cursor."
+
+
+def test_get_movies_cursor_with_skip(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock
+) -> None:
+    response = client.get(f"/movies/?cursor={encode_cursor(100)}&skip=10")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Cursor can not be combined with skip."
+
+
+def test_export_movies(
+        client: TestClient,
+        mock_movie_export_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    async def stream_movies(chunk_size: int) -> AsyncIterator[list[Movie]]:
+        yield [sample_movie, sample_movie]
+        yield [sample_movie]
+
+    mock_movie_export_gateway.stream_movies.side_effect = stream_movies
+
+    response = client.get("/movies/export?chunk_size=2")
+    mock_movie_export_gateway.stream_movies.assert_called_once_with(2)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == [sample_movie.model_dump()] * 3
+
+
+def test_export_movies_invalid_chunk_size(
+        client: TestClient,
+        mock_movie_export_gateway: AsyncMock
+) -> None:
+    response = client.get("/movies/export?chunk_size=0")
+    mock_movie_export_gateway.stream_movies.assert_not_called()
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_popular_movies(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    popular_movie = PopularMovie(**sample_movie.model_dump(), favorites_count=3)
+    mock_movie_gateway.get_popular_movies.return_value = [popular_movie]
+
+    response = client.get("/movies/popular?limit=5")
+    mock_movie_gateway.get_popular_movies.assert_awaited_once_with(0, 5)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{**sample_movie.model_dump(), "favorites_count": 3}]
+
+
+def test_search_movies(
+        client: TestClient,
+        mock_movie_search_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    mock_movie_search_gateway.search_movies.return_value = [sample_movie]
+
+    response = client.get("/movies/search?q=sample&skip=5&limit=20")
+    mock_movie_search_gateway.search_movies.assert_awaited_once_with("sample", 5, 20)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [sample_movie.model_dump()]
+
+
+def test_search_movies_empty_query(
+        client: TestClient,
+        mock_movie_search_gateway: AsyncMock
+) -> None:
+    response = client.get("/movies/search?q=")
+    mock_movie_search_gateway.search_movies.assert_not_awaited()
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 def test_get_movie_by_id(
         client: TestClient,
         mock_movie_gateway: AsyncMock,
@@ -56,6 +243,52 @@ def test_get_movie_by_id(
     assert response.json() == sample_movie.model_dump()
 
 
+def test_get_movie_etag(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    mock_movie_gateway.get_movie_by_id.return_value = sample_movie
+
+    response = client.get(f"/movies/{sample_movie.id}")
+    etag = response.headers["ETag"]
+    assert etag == f'"movie-{sample_movie.id}-{sample_movie.version}"'
+
+    response = client.get(f"/movies/{sample_movie.id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_get_movie_etag_changes_with_version(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    mock_movie_gateway.get_movie_by_id.return_value = sample_movie
+    etag = client.get(f"/movies/{sample_movie.id}").headers["ETag"]
+    mock_movie_gateway.get_movie_by_id.return_value = sample_movie.model_copy(update={"version": 2})
+
+    response = client.get(f"/movies/{sample_movie.id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == sample_movie.model_dump()
+
+
+def test_get_movies_weak_etag(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    mock_movie_gateway.get_movies.return_value = [sample_movie]
+
+    etag = client.get("/movies/?limit=1").headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get("/movies/?limit=1", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["X-Next-Cursor"] == encode_cursor(sample_movie.id)
+
+
 def test_get_movie_not_found(
         client: TestClient,
         mock_movie_gateway: AsyncMock
@@ -67,6 +300,52 @@ def test_get_movie_not_found(
     assert response.json()["detail"] == "Movie not found for specified movie_id."
 
 
+def test_get_similar_movies(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        mock_similarity_index: Mock,
+        sample_movie: Movie
+) -> None:
+    other = sample_movie.model_copy(update={"id": 2, "title": "Other"})
+    mock_movie_gateway.get_movie_by_id.return_value = sample_movie
+    mock_movie_gateway.get_movies_by_ids.return_value = [other]
+    mock_similarity_index.neighbors.return_value = [(2, 0.5), (3, 0.25)]
+
+    response = client.get(f"/movies/{sample_movie.id}/similar?limit=1")
+    mock_similarity_index.neighbors.assert_called_once_with(sample_movie.id)
+    mock_movie_gateway.get_movies_by_ids.assert_awaited_once_with([2])
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{**other.model_dump(), "score": 0.5}]
+
+
+def test_get_similar_movies_skips_deleted_movies(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        mock_similarity_index: Mock,
+        sample_movie: Movie
+) -> None:
+    movies = {movie_id: sample_movie.model_copy(update={"id": movie_id}) for movie_id in (3, 4)}
+    mock_movie_gateway.get_movie_by_id.return_value = sample_movie
+    mock_movie_gateway.get_movies_by_ids.side_effect = lambda ids: [movies[i] for i in ids if i in movies]
+    mock_similarity_index.neighbors.return_value = [(2, 0.5), (3, 0.4), (4, 0.3), (5, 0.2)]
+
+    response = client.get(f"/movies/{sample_movie.id}/similar?limit=2")
+    assert [call.args[0] for call in mock_movie_gateway.get_movies_by_ids.await_args_list] == [[2, 3], [4]]
+    assert [(movie["id"], movie["score"]) for movie in response.json()] == [(3, 0.4), (4, 0.3)]
+
+
+def test_get_similar_movies_not_found(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        mock_similarity_index: Mock
+) -> None:
+    mock_movie_gateway.get_movie_by_id.return_value = None
+
+    response = client.get("/movies/999/similar")
+    mock_similarity_index.neighbors.assert_not_called()
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 def test_update_movie(
         client: TestClient,
         mock_movie_gateway: AsyncMock,
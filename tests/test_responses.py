@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_model_field
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.gateway import MovieSqlaGateway, UserSqlaGateway
+from app.api.responses import ORJSONModelResponse
+from app.application.cursor import encode_cursor
+from app.application.models import Movie, User
+from app.main.config import DatabaseSettings
+from app.main.di import create_engine, create_session_maker
+
+
+@pytest.fixture
+async def session_maker(tmp_path: Path) -> async_sessionmaker[AsyncSession]:
+    engine = create_engine(DatabaseSettings(uri=f"sqlite+aiosqlite:///{tmp_path / 'responses.db'}", instrument=False))
+    async with engine.begin() as connection:
+        await connection.run_sync(models.Base.metadata.create_all)
+        await connection.execute(insert(models.Movie), [
+            {"id": 1, "title": "Heat", "description": "Crime"},
+            {"id": 2, "title": "Амели", "description": None},
+            {"id": 3, "title": 'The "Thing"', "description": "Line\nbreak"},
+        ])
+        await connection.execute(insert(models.User), [{"id": 1, "username": "ann"}, {"id": 2, "username": "bob"}])
+        await connection.execute(insert(models.Favorite), [
+            {"user_id": 1, "movie_id": 2}, {"user_id": 1, "movie_id": 3},
+        ])
+    yield create_session_maker(engine)
+    await engine.dispose()
+
+
+async def response_model_body(response_model: Any, content: list) -> bytes:
+    """
+    Render `content` the way FastAPI does for an endpoint with `response_model`.
+    """
+    field = create_model_field("response", response_model)
+    return JSONResponse(await serialize_response(field=field, response_content=content, is_coroutine=True)).body
+
+
+async def test_movie_rows_render_like_response_model(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        result = await session.execute(select(models.Movie).order_by(models.Movie.id))
+        entities = [Movie.model_validate(movie) for movie in result.scalars().all()]
+        rows = await MovieSqlaGateway(session).get_movies(0, 10)
+
+    assert rows == entities
+    assert ORJSONModelResponse(rows).body == await response_model_body(list[Movie], entities)
+
+
+async def test_user_rows_render_like_response_model(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        result = await session.execute(
+            select(models.User).options(selectinload(models.User.favorites)).order_by(models.User.id)
+        )
+        entities = [User.model_validate(user) for user in result.scalars().all()]
+        rows = await UserSqlaGateway(session).get_users_after(None, 10)
+
+    assert ORJSONModelResponse(rows).body == await response_model_body(list[User], entities)
+
+
+def test_list_endpoint_keeps_headers(
+        client: TestClient,
+        mock_movie_gateway: AsyncMock,
+        sample_movie: Movie
+) -> None:
+    movie = sample_movie.model_copy(update={"description": None})
+    mock_movie_gateway.get_movies.return_value = [movie]
+    mock_movie_gateway.count_movies.return_value = 3
+
+    response = client.get("/movies/?limit=1&total=true")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["X-Next-Cursor"] == encode_cursor(movie.id)
+    assert response.headers["X-Total-Count"] == "3"
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.json() == [{"id": movie.id, "title": movie.title, "description": None}]
@@ -0,0 +1,48 @@
+from typing import AsyncGenerator
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.route import ReleasingRoute, release_after_endpoint
+
+
+def create_test_client(events: list[str]) -> TestClient:
+    async def resource() -> AsyncGenerator[None, None]:
+        async def release() -> None:
+            events.append("released")
+
+        release_after_endpoint(release)
+        yield
+        events.append("teardown")
+
+    router = APIRouter(route_class=ReleasingRoute)
+
+    @router.get("/ok", dependencies=[Depends(resource)])
+    async def ok() -> dict:
+        events.append("endpoint")
+        return {"ok": True}
+
+    @router.get("/fail", dependencies=[Depends(resource)])
+    async def fail() -> dict:
+        events.append("endpoint")
+        raise HTTPException(status_code=404, detail="Not found")
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_resources_released_before_teardown() -> None:
+    events: list[str] = []
+    response = create_test_client(events).get("/ok")
+
+    assert response.status_code == 200
+    assert events == ["endpoint", "released", "teardown"]
+
+
+def test_resources_released_when_endpoint_raises() -> None:
+    events: list[str] = []
+    response = create_test_client(events).get("/fail")
+
+    assert response.status_code == 404
+    assert events[:2] == ["endpoint", "released"]
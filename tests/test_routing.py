@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.adapters.cache import CachedMovieGateway, SingleFlight, TTLCount, TTLLRUCache
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.commit_hooks import SessionCommitHooks
+from app.adapters.sqlalchemy_db.gateway import MovieSqlaGateway
+from app.application.models import MovieUpdate
+from app.application.movie import get_movie_data, get_movies_by_ids_data, update_movie
+from app.main.config import DatabaseSettings
+from app.main.di import create_engine, create_replica_selector, create_session_maker
+
+
+async def seed(engine: AsyncEngine, title: str) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(models.Base.metadata.create_all)
+        await connection.execute(insert(models.Movie).values(id=1, title=title))
+
+
+@pytest.fixture
+async def settings(tmp_path: Path) -> DatabaseSettings:
+    names = ["primary", "replica-1", "replica-2"]
+    uris = [f"sqlite+aiosqlite:///{tmp_path / name}.db" for name in names]
+    for uri, name in zip(uris, names):
+        engine = create_engine(DatabaseSettings(uri=uri, instrument=False))
+        await seed(engine, name)
+        await engine.dispose()
+    return DatabaseSettings(uri=uris[0], instrument=False, replica_uris=tuple(uris[1:]))
+
+
+@pytest.fixture
+async def session_maker(settings: DatabaseSettings) -> async_sessionmaker[AsyncSession]:
+    engine = create_engine(settings)
+    replicas = create_replica_selector(settings)
+    yield create_session_maker(engine, replicas)
+    for routed_engine in [engine, *replicas.replicas]:
+        await routed_engine.dispose()
+
+
+async def read_title(session_maker: async_sessionmaker[AsyncSession]) -> str:
+    async with session_maker() as session:
+        movie = await get_movie_data(1, MovieSqlaGateway(session))
+        return movie.title
+
+
+async def test_read_only_use_cases_round_robin_replicas(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    assert [await read_title(session_maker) for _ in range(3)] == ["replica-1", "replica-2", "replica-1"]
+
+
+async def test_other_calls_use_primary(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        movie = await MovieSqlaGateway(session).get_movie_by_id(1)
+    assert movie.title == "primary"
+
+
+async def test_reads_after_write_stay_on_primary(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        gateway = MovieSqlaGateway(session)
+        await update_movie(1, MovieUpdate(description="edited"), gateway, session)
+        movie = await get_movie_data(1, gateway)
+    assert (movie.title, movie.description) == ("primary", "edited")
+
+
+async def test_cache_fills_read_primary(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    movie_cache = TTLLRUCache(max_size=10, ttl=60)
+
+    async with session_maker() as session:
+        gateway = CachedMovieGateway(
+            MovieSqlaGateway(session), movie_cache, TTLLRUCache(max_size=10, ttl=60), SingleFlight(), SingleFlight(),
+            TTLCount(ttl=60), SessionCommitHooks(session),
+        )
+        movies = await get_movies_by_ids_data([1], gateway)
+        assert [movie.title for movie in movies] == ["primary"]
+        movie_cache.clear()
+        movie = await get_movie_data(1, gateway)
+
+    assert movie.title == "primary"
+    assert movie_cache.get(1).title == "primary"
+
+
+async def test_least_connections_skips_busy_replica(settings: DatabaseSettings) -> None:
+    selector = create_replica_selector(DatabaseSettings(
+        uri=settings.uri,
+        replica_uris=settings.replica_uris,
+        replica_strategy="least_connections",
+    ))
+    busy = selector.replicas[0]
+
+    async with busy.connect():
+        assert selector.choose() is selector.replicas[1]
+    assert selector.choose() is busy
+    for replica in selector.replicas:
+        await replica.dispose()
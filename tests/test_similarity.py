@@ -0,0 +1,170 @@
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.similarity import (
+    SimilarityTrackingFavoriteGateway,
+    SimilarityTrackingUserGateway,
+    TopKSimilarityIndex,
+)
+from app.adapters.similarity.matrix import FavoritesMatrix, top_neighbors
+from app.adapters.similarity import refresher as refresher_module
+from app.adapters.similarity.refresher import SimilarityRefresher
+from app.adapters.sqlalchemy_db import models
+from app.adapters.sqlalchemy_db.movie_stats import rebuild_movie_stats
+from app.application.models import UserSummary
+from app.application.protocols.database import CommitHooks
+from app.application.protocols.similarity import SimilarityIndex
+from app.application.recommendation import recommend
+from app.main.config import DatabaseSettings
+from app.main.di import create_engine, create_session_maker
+
+# user 1 likes movies 1 and 2, user 2 likes 1, 2 and 3, user 3 likes 3
+FAVORITES = [(1, 1), (1, 2), (2, 1), (2, 2), (2, 3), (3, 3)]
+
+
+def rows(index: SimilarityIndex, movie_id: int) -> list[tuple[int, float]]:
+    return [(neighbor_id, round(score, 4)) for neighbor_id, score in index.neighbors(movie_id)]
+
+
+def test_top_neighbors() -> None:
+    neighbors = top_neighbors(FavoritesMatrix.from_pairs(FAVORITES), k=1)
+    index = TopKSimilarityIndex(top_k=1)
+    index.replace(neighbors, 0.0)
+
+    assert rows(index, 1) == [(2, 1.0)]
+    assert rows(index, 3) == [(1, 0.5)]
+    assert index.neighbors(4) == []
+
+
+def test_set_similarity_patches_row() -> None:
+    index = TopKSimilarityIndex(top_k=2)
+    index.replace(top_neighbors(FavoritesMatrix.from_pairs(FAVORITES), k=2), 0.0)
+
+    index.set_similarity(1, 4, 0.7)
+    assert rows(index, 1) == [(2, 1.0), (4, 0.7)]
+    index.set_similarity(1, 2, 0)
+    assert rows(index, 1) == [(4, 0.7)]
+
+
+def test_recommend_sums_similarities_without_favorites() -> None:
+    neighbors = {1: [(2, 0.5), (3, 0.4)], 2: [(1, 0.5), (3, 0.3), (4, 0.6)]}
+    index = Mock(SimilarityIndex)
+    index.neighbors.side_effect = lambda movie_id: neighbors[movie_id]
+
+    assert [movie_id for movie_id, _ in recommend([1, 2], index)] == [3, 4]
+
+
+async def test_tracking_gateway_marks_existing_movies_after_commit(mock_favorite_gateway: AsyncMock) -> None:
+    mock_favorite_gateway.add_favorite_movies.return_value = [9]
+    index = TopKSimilarityIndex(top_k=2)
+    commit_hooks = Mock(CommitHooks)
+    gateway = SimilarityTrackingFavoriteGateway(mock_favorite_gateway, index, commit_hooks)
+
+    assert await gateway.add_favorite_movies(1, [1, 2, 9]) == [9]
+    assert index.stats().pending_movies == 0
+    callback, = commit_hooks.after_commit.call_args.args
+    callback()
+    assert index.take_changed() == {1, 2}
+
+
+async def test_tracking_gateway_marks_favorites_of_deleted_user(
+        mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
+        sample_user: UserSummary
+) -> None:
+    mock_favorite_gateway.get_favorite_ids.return_value = [1, 2]
+    mock_user_gateway.delete_user_by_id.return_value = sample_user
+    index = TopKSimilarityIndex(top_k=2)
+    commit_hooks = Mock(CommitHooks)
+    gateway = SimilarityTrackingUserGateway(mock_user_gateway, mock_favorite_gateway, index, commit_hooks)
+
+    await gateway.delete_user_by_id(sample_user.id)
+    callback, = commit_hooks.after_commit.call_args.args
+    callback()
+    assert index.take_changed() == {1, 2}
+
+
+@pytest.fixture
+async def session_maker(tmp_path: Path) -> async_sessionmaker[AsyncSession]:
+    engine = create_engine(DatabaseSettings(uri=f"sqlite+aiosqlite:///{tmp_path / 'similarity.db'}", instrument=False))
+    async with engine.begin() as connection:
+        await connection.run_sync(models.Base.metadata.create_all)
+    async with create_session_maker(engine)() as session:
+        session.add_all([models.Movie(id=movie_id, title=f"Movie {movie_id}") for movie_id in (1, 2, 3)])
+        session.add_all([models.User(id=user_id, username=f"user{user_id}") for user_id in (1, 2, 3)])
+        await session.flush()
+        await session.execute(insert(models.Favorite), [{"user_id": u, "movie_id": m} for u, m in FAVORITES])
+        await rebuild_movie_stats(session)
+        await session.commit()
+    yield create_session_maker(engine)
+    await engine.dispose()
+
+
+async def test_refresh_recomputes_changed_movies(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    index = TopKSimilarityIndex(top_k=2)
+    refresher = SimilarityRefresher(index, session_maker, refresh_interval=1, rebuild_interval=60)
+    index.replace(top_neighbors(FavoritesMatrix.from_pairs(FAVORITES), k=2), 0.0)
+    async with session_maker() as session:
+        await session.execute(insert(models.Favorite).values(user_id=3, movie_id=1))
+        await rebuild_movie_stats(session)
+        await session.commit()
+
+    index.mark_changed([1])
+    await refresher.refresh()
+
+    assert rows(index, 1) == [(2, 0.8165), (3, 0.8165)]
+    assert rows(index, 3) == [(1, 0.8165), (2, 0.5)]
+    assert index.stats().pending_movies == 0
+
+
+async def test_refresh_drops_deleted_movie_from_every_row(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    index = TopKSimilarityIndex(top_k=2)
+    refresher = SimilarityRefresher(index, session_maker, refresh_interval=1, rebuild_interval=60)
+    index.replace(top_neighbors(FavoritesMatrix.from_pairs(FAVORITES), k=2), 0.0)
+    async with session_maker() as session:
+        await session.execute(delete(models.Movie).where(models.Movie.id == 3))
+        await session.commit()
+
+    index.mark_changed([3])
+    await refresher.refresh()
+
+    assert index.neighbors(3) == []
+    assert rows(index, 1) == [(2, 1.0)]
+    assert rows(index, 2) == [(1, 1.0)]
+
+
+class BrokenExecutor(Executor):
+    def __init__(self) -> None:
+        self.shut_down = False
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self.shut_down = True
+
+
+async def test_rebuild_replaces_broken_process_pool(
+        session_maker: async_sessionmaker[AsyncSession],
+        monkeypatch: pytest.MonkeyPatch
+) -> None:
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(refresher_module, "new_executor", lambda: executor)
+    index = TopKSimilarityIndex(top_k=2)
+    refresher = SimilarityRefresher(index, session_maker, refresh_interval=1, rebuild_interval=60)
+    broken = refresher._executor = BrokenExecutor()
+
+    await refresher.rebuild()
+
+    assert broken.shut_down
+    assert refresher._executor is executor
+    assert rows(index, 1) == [(2, 1.0), (3, 0.5)]
+    executor.shutdown()
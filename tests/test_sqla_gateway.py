@@ -0,0 +1,135 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.adapters.sqlalchemy_db import gateway, models
+from app.adapters.sqlalchemy_db.commit_hooks import SessionCommitHooks
+from app.adapters.sqlalchemy_db.gateway import FavoriteSqlaGateway, MovieSqlaGateway, UserSqlaGateway
+from app.application.models import FavoritesInclude, Movie, MovieUpdate, UserSummary, UserUpdate, UserWithFavoriteIds
+from app.application.protocols.database import UsernameTakenError
+from app.main.config import DatabaseSettings
+from app.main.di import create_engine, create_session_maker
+
+
+@pytest.fixture
+async def session_maker(tmp_path: Path) -> async_sessionmaker[AsyncSession]:
+    engine = create_engine(DatabaseSettings(uri=f"sqlite+aiosqlite:///{tmp_path / 'gateway.db'}", instrument=False))
+    async with engine.begin() as connection:
+        await connection.run_sync(models.Base.metadata.create_all)
+        await connection.execute(insert(models.Movie), [
+            {"id": 1, "title": "Heat", "description": "Crime"},
+            {"id": 2, "title": "Alien", "description": None},
+            {"id": 3, "title": "Brazil", "description": None},
+        ])
+        await connection.execute(insert(models.User), [{"id": 1, "username": "ann"}, {"id": 2, "username": "bob"}])
+        await connection.execute(insert(models.Favorite), [{"user_id": 1, "movie_id": 1}])
+        await connection.execute(insert(models.MovieStats), [{"movie_id": 1, "favorites_count": 1}])
+    yield create_session_maker(engine)
+    await engine.dispose()
+
+
+async def test_update_movie_keeps_unset_fields(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        movie = await MovieSqlaGateway(session).update_movie(1, MovieUpdate(title="Heat 2"))
+        await session.commit()
+        missing = await MovieSqlaGateway(session).update_movie(99, MovieUpdate(title="Nope"))
+
+    assert movie == Movie(id=1, title="Heat 2", description="Crime", version=2)
+    assert missing is None
+
+
+async def test_update_user_loads_requested_favorites(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        gateway = UserSqlaGateway(session)
+        summary = await gateway.update_user(1, UserUpdate(username="anna"), FavoritesInclude.NONE)
+        with_ids = await gateway.update_user(1, UserUpdate(username="anne"), FavoritesInclude.IDS)
+        await session.commit()
+
+    assert summary == UserSummary(id=1, username="anna", version=2)
+    assert with_ids == UserWithFavoriteIds(id=1, username="anne", version=3, favorite_ids=[1])
+
+
+async def test_update_user_to_taken_username(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        with pytest.raises(UsernameTakenError):
+            await UserSqlaGateway(session).update_user(2, UserUpdate(username="ann"))
+        user = await UserSqlaGateway(session).get_user_by_id(2)
+
+    assert (user.username, user.version) == ("bob", 1)
+
+
+async def table_rows(session: AsyncSession, *columns) -> list[tuple]:
+    result = await session.execute(select(*columns))
+    return [tuple(row) for row in result.all()]
+
+
+async def test_delete_movie_cascades_to_favorites(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        movie = await MovieSqlaGateway(session).delete_movie_by_id(1)
+        await session.commit()
+
+        assert movie == Movie(id=1, title="Heat", description="Crime")
+        assert await table_rows(session, models.Favorite.user_id) == []
+        assert await table_rows(session, models.MovieStats.movie_id) == []
+        assert await MovieSqlaGateway(session).delete_movie_by_id(1) is None
+
+
+async def test_delete_user_takes_back_favorites(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        user = await UserSqlaGateway(session).delete_user_by_id(1)
+        await session.commit()
+
+        assert user == UserSummary(id=1, username="ann")
+        assert await table_rows(session, models.Favorite.movie_id) == []
+        assert await table_rows(session, models.MovieStats.movie_id, models.MovieStats.favorites_count) == [(1, 0)]
+        assert await UserSqlaGateway(session).delete_user_by_id(1) is None
+
+
+async def test_add_favorites_of_deleted_user(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        await UserSqlaGateway(session).delete_user_by_id(2)
+        await session.commit()
+
+        assert await FavoriteSqlaGateway(session).add_favorite_movies(2, [2, 3]) is None
+        assert await table_rows(session, models.Favorite.user_id, models.Favorite.movie_id) == [(1, 1)]
+        assert await table_rows(session, models.MovieStats.movie_id) == [(1,)]
+
+
+async def test_get_by_ids_keeps_requested_order_across_chunks(
+        session_maker: async_sessionmaker[AsyncSession],
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(gateway, "ID_LOOKUP_CHUNK_SIZE", 2)
+    async with session_maker() as session:
+        movies = await MovieSqlaGateway(session).get_movies_by_ids([3, 99, 1, 2])
+        users = await UserSqlaGateway(session).get_users_by_ids([2, 1], FavoritesInclude.IDS)
+
+    assert [movie.title for movie in movies] == ["Brazil", "Heat", "Alien"]
+    assert users == [
+        UserWithFavoriteIds(id=2, username="bob", favorite_ids=[]),
+        UserWithFavoriteIds(id=1, username="ann", favorite_ids=[1]),
+    ]
+
+
+async def test_count_rows(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        assert await MovieSqlaGateway(session).count_movies() == 3
+        assert await UserSqlaGateway(session).count_users() == 2
+
+
+async def test_commit_hooks_run_after_commit_only(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    calls = []
+    async with session_maker() as session:
+        hooks = SessionCommitHooks(session)
+        hooks.after_commit(lambda: calls.append("idle"))
+        await MovieSqlaGateway(session).update_movie(1, MovieUpdate(title="Heat 2"))
+        hooks.after_commit(lambda: calls.append("rolled back"))
+        await session.rollback()
+        await MovieSqlaGateway(session).update_movie(1, MovieUpdate(title="Heat 3"))
+        hooks.after_commit(lambda: calls.append("committed"))
+        assert calls == ["idle"]
+        await session.commit()
+
+    assert calls == ["idle", "committed"]
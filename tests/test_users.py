@@ -1,9 +1,19 @@
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from app.application.models import UserCreate, UserUpdate, User
+from app.application.cursor import encode_cursor
+from app.application.models import (
+    FavoritesInclude,
+    Movie,
+    UserCreate,
+    UserUpdate,
+    User,
+    UserSummary,
+    UserWithFavoriteIds,
+)
+from app.application.protocols.database import UsernameTakenError
 
 
 def test_create_new_user_success(
@@ -39,7 +49,7 @@ def test_get_users(
     mock_user_gateway.get_users.return_value = [sample_user]
 
     response = client.get("/users/?skip=1&limit=11")
-    mock_user_gateway.get_users.assert_awaited_once_with(1, 11)
+    mock_user_gateway.get_users.assert_awaited_once_with(1, 11, FavoritesInclude.FULL)
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == [sample_user.model_dump()]
 
@@ -51,11 +61,49 @@ def test_get_users_empty(
     mock_user_gateway.get_users.return_value = []
 
     response = client.get("/users/")
-    mock_user_gateway.get_users.assert_awaited_once_with(0, 10)
+    mock_user_gateway.get_users.assert_awaited_once_with(0, 10, FavoritesInclude.FULL)
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == []
 
 
+def test_get_users_by_cursor(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    mock_user_gateway.get_users_after.return_value = [sample_user]
+
+    response = client.get(f"/users/?cursor={encode_cursor(7)}&limit=1")
+    mock_user_gateway.get_users_after.assert_awaited_once_with(7, 1, FavoritesInclude.FULL)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [sample_user.model_dump()]
+    assert response.headers["X-Next-Cursor"] == encode_cursor(sample_user.id)
+
+
+def test_get_users_total_count_on_not_modified(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    mock_user_gateway.get_users.return_value = [sample_user]
+    mock_user_gateway.count_users.return_value = 7
+
+    etag = client.get("/users/?total=true").headers["ETag"]
+    response = client.get("/users/?total=true", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["X-Total-Count"] == "7"
+
+
+def test_get_users_invalid_cursor(
+        client: TestClient,
+        mock_user_gateway: AsyncMock
+) -> None:
+    response = client.get("/users/?cursor=bad")
+    mock_user_gateway.get_users_after.assert_not_awaited()
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Invalid cursor."
+
+
 def test_get_user(
         client: TestClient,
         mock_user_gateway: AsyncMock,
@@ -68,6 +116,68 @@ def test_get_user(
     assert response.json() == sample_user.model_dump()
 
 
+def test_get_users_favorite_ids(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+) -> None:
+    mock_user_gateway.get_users.return_value = [
+        UserWithFavoriteIds(id=1, username="testuser", favorite_ids=[1917]),
+    ]
+
+    response = client.get("/users/?include=ids")
+    mock_user_gateway.get_users.assert_awaited_once_with(0, 10, FavoritesInclude.IDS)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"id": 1, "username": "testuser", "favorite_ids": [1917]}]
+
+
+def test_get_users_without_favorites(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+) -> None:
+    mock_user_gateway.get_users.return_value = [UserSummary(id=1, username="testuser")]
+
+    response = client.get("/users/?include=none")
+    mock_user_gateway.get_users.assert_awaited_once_with(0, 10, FavoritesInclude.NONE)
+    assert response.json() == [{"id": 1, "username": "testuser"}]
+
+
+def test_get_user_favorite_ids(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    mock_user_gateway.get_user_by_id.return_value = sample_user
+
+    response = client.get(f"/users/{sample_user.id}?include=ids")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"id": sample_user.id, "username": sample_user.username, "favorite_ids": [1917]}
+
+
+def test_get_user_not_modified(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    mock_user_gateway.get_user_by_id.return_value = sample_user
+    etag = client.get(f"/users/{sample_user.id}").headers["ETag"]
+
+    response = client.get(f"/users/{sample_user.id}", headers={"If-None-Match": f'"other", {etag}'})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_get_user_etag_covers_favorites(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        sample_user: User
+) -> None:
+    mock_user_gateway.get_user_by_id.return_value = sample_user
+    etag = client.get(f"/users/{sample_user.id}").headers["ETag"]
+    sample_user.favorites[0].version = 2
+
+    response = client.get(f"/users/{sample_user.id}", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+
+
 def test_get_user_not_found(
         client: TestClient,
         mock_user_gateway: AsyncMock
@@ -79,6 +189,52 @@ def test_get_user_not_found(
     assert response.json()["detail"] == "User not found for specified user_id."
 
 
+def test_get_users_by_ids(
+        client: TestClient,
+        mock_user_gateway: AsyncMock
+) -> None:
+    users = [UserSummary(id=3, username="c"), UserSummary(id=1, username="a")]
+    mock_user_gateway.get_users_by_ids.return_value = users
+
+    response = client.get("/users/?ids=3,2,1&include=none")
+    mock_user_gateway.get_users_by_ids.assert_awaited_once_with([3, 2, 1], FavoritesInclude.NONE)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"id": 3, "username": "c"}, {"id": 1, "username": "a"}]
+    assert response.headers["X-Missing-Ids"] == "2"
+
+
+def test_get_user_recommendations(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock,
+        mock_movie_gateway: AsyncMock,
+        mock_similarity_index: Mock
+) -> None:
+    neighbors = {1: [(2, 0.5), (3, 0.4)], 2: [(1, 0.5), (3, 0.3)]}
+    mock_user_gateway.user_exists.return_value = True
+    mock_favorite_gateway.get_favorite_ids.return_value = [1, 2]
+    mock_similarity_index.neighbors.side_effect = lambda movie_id: neighbors[movie_id]
+    mock_movie_gateway.get_movies_by_ids.return_value = [Movie(id=3, title="Heat", description=None)]
+
+    response = client.get("/users/1/recommendations")
+    mock_movie_gateway.get_movies_by_ids.assert_awaited_once_with([3])
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"id": 3, "title": "Heat", "description": None, "score": 0.7}]
+
+
+def test_get_user_recommendations_not_found(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        mock_favorite_gateway: AsyncMock
+) -> None:
+    mock_user_gateway.user_exists.return_value = False
+
+    response = client.get("/users/999/recommendations")
+    mock_favorite_gateway.get_favorite_ids.assert_not_awaited()
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "User not found for specified user_id."
+
+
 def test_update_user_data(
         client: TestClient,
         mock_user_gateway: AsyncMock,
@@ -91,6 +247,35 @@ def test_update_user_data(
     response = client.patch(f"/users/{sample_user.id}", json=sample_user_update.model_dump())
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == sample_user.model_dump()
+    mock_user_gateway.update_user.assert_awaited_once_with(sample_user.id, sample_user_update, FavoritesInclude.FULL)
+
+
+def test_update_user_data_without_favorites(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        mock_uow: AsyncMock,
+        sample_user_update: UserUpdate
+) -> None:
+    mock_user_gateway.update_user.return_value = UserSummary(id=1, username="updateduser", version=2)
+
+    response = client.patch("/users/1", params={"include": "none"}, json=sample_user_update.model_dump())
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"id": 1, "username": "updateduser"}
+    mock_user_gateway.update_user.assert_awaited_once_with(1, sample_user_update, FavoritesInclude.NONE)
+
+
+def test_update_user_data_username_taken(
+        client: TestClient,
+        mock_user_gateway: AsyncMock,
+        mock_uow: AsyncMock,
+        sample_user_update: UserUpdate
+) -> None:
+    mock_user_gateway.update_user.side_effect = UsernameTakenError(sample_user_update.username)
+
+    response = client.patch("/users/1", json=sample_user_update.model_dump())
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json()["detail"] == "User with that username already exists."
+    mock_uow.commit.assert_not_awaited()
 
 
 def test_update_user_data_not_found(
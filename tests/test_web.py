@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.protocols.pool import PoolMonitor
+from app.main import create_app
+from app.main.config import load_settings
+
+
+@pytest.fixture
+def app(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> FastAPI:
+    monkeypatch.setenv("DATABASE_URI", f"sqlite+aiosqlite:///{tmp_path / 'web.db'}")
+    return create_app()
+
+
+def test_engine_lives_in_lifespan(app: FastAPI) -> None:
+    assert AsyncSession not in app.dependency_overrides
+
+    with TestClient(app) as client:
+        engine = app.dependency_overrides[PoolMonitor]().engine
+        pool = engine.pool
+        response = client.get("/internal/pool")
+        assert response.status_code == 200
+        assert response.json()["pool_class"] == "InstrumentedQueuePool"
+
+    assert engine.pool is not pool
+
+
+def test_server_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATABASE_URI", "sqlite+aiosqlite:///test.db")
+    monkeypatch.setenv("SERVER_PORT", "9000")
+    monkeypatch.setenv("SERVER_WORKERS", "3")
+
+    settings = load_settings().server
+
+    assert (settings.port, settings.workers) == (9000, 3)
+
+
+@pytest.mark.parametrize("name", ["DATABASE_URI", "DATABASE_REPLICA_URIS"])
+def test_non_sqlite_database_is_rejected(name: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATABASE_URI", "sqlite+aiosqlite:///test.db")
+    monkeypatch.setenv(name, "postgresql+asyncpg://user:secret@db/movies")
+
+    with pytest.raises(ValueError, match=f"{name} must point to a SQLite database, got postgresql"):
+        load_settings()